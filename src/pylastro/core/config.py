@@ -59,10 +59,108 @@ SUPRIMENTOS = {
 
 LABEL_FRAUDES = ['Nenhuma','Duplicatas Falsas','Duplicatas Duplicadas','Endosso Indevido']
 
+# Endossatário com um destes termos é tratado como banco (endosso legítimo)
+BANCOS_KEYWORDS = ['Banco', 'S.A.', 'Unibanco', 'Bradesco', 'Itaú', 'Santander', 'BTG']
+
 #---5. CAMINHO DO BANCO
 
 BASE_PATH = Path(__file__).resolve().parent.parent.parent 
 
-DB_PATH = BASE_PATH / "data" / "duplicatas.duckdb"
+# PYLASTRO_DB_PATH aponta a API para outro arquivo (ex: bancos semeados dos benchmarks)
+DB_PATH = Path(os.getenv("PYLASTRO_DB_PATH", BASE_PATH / "data" / "duplicatas.duckdb"))
+
+# Abre o banco em modo somente leitura: permite vários workers do uvicorn no mesmo
+# arquivo (o DuckDB só aceita um processo com escrita). Sem população nem fila
+DB_SOMENTE_LEITURA = os.getenv("PYLASTRO_DB_SOMENTE_LEITURA", "false").lower() in ("1", "true", "sim", "yes")
+
+GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+
+#---6. BACKEND DO LLM (gemini | fake)
+
+LLM_BACKEND = os.getenv("PYLASTRO_LLM_BACKEND", "gemini")
+
+# Parâmetros do modelo fake (benchmark/offline)
+LLM_FAKE_LATENCIA_MS = float(os.getenv("PYLASTRO_LLM_FAKE_LATENCIA_MS", "0"))
+LLM_FAKE_JITTER_MS = float(os.getenv("PYLASTRO_LLM_FAKE_JITTER_MS", "0"))
+LLM_FAKE_DISTRIBUICAO = os.getenv("PYLASTRO_LLM_FAKE_DISTRIBUICAO", "uniforme")  # fixa | uniforme | lognormal
+LLM_FAKE_FALHAS = os.getenv("PYLASTRO_LLM_FAKE_FALHAS", "")  # ex: "throttle=0.02,erro=0.01,json_invalido=0.01"
+LLM_FAKE_SEED = int(os.getenv("PYLASTRO_LLM_FAKE_SEED", "42"))
+
+# Papel do worker: com "false", o processo não carrega o agente (LangChain/LangGraph),
+# não sobe a fila de investigações e as rotas do agente respondem 503 (ex: réplicas só de leitura)
+AGENTE_HABILITADO = os.getenv("PYLASTRO_AGENTE_HABILITADO", "true").lower() in ("1", "true", "sim", "yes")
+
+#---7. FILA DE INVESTIGAÇÕES
+
+FILA_WORKERS = int(os.getenv("PYLASTRO_FILA_WORKERS", "2"))
+FILA_MAX_TENTATIVAS = int(os.getenv("PYLASTRO_FILA_MAX_TENTATIVAS", "3"))
+# Prazo de um caso reservado: passado o lease sem resultado (worker morto ou
+# reiniciado), o caso volta a ser reservável por qualquer worker
+FILA_LEASE_S = float(os.getenv("PYLASTRO_FILA_LEASE_S", "600"))
+# Jobs com a base de verdade pré-carregada mantidos em memória por worker
+FILA_JOBS_EM_CACHE = int(os.getenv("PYLASTRO_FILA_JOBS_EM_CACHE", "8"))
+
+#---8. CONTROLE DE TAXA DO LLM
+
+LLM_RPM = float(os.getenv("PYLASTRO_LLM_RPM", "300"))
+LLM_TPM = float(os.getenv("PYLASTRO_LLM_TPM", "1000000"))
+LLM_CONCORRENCIA_INICIAL = int(os.getenv("PYLASTRO_LLM_CONCORRENCIA_INICIAL", "4"))
+LLM_CONCORRENCIA_MAX = int(os.getenv("PYLASTRO_LLM_CONCORRENCIA_MAX", "32"))
+LLM_LATENCIA_ALVO_S = float(os.getenv("PYLASTRO_LLM_LATENCIA_ALVO_S", "20"))
+LLM_MAX_TENTATIVAS = int(os.getenv("PYLASTRO_LLM_MAX_TENTATIVAS", "4"))
+LLM_CIRCUITO_LIMIAR_FALHAS = int(os.getenv("PYLASTRO_LLM_CIRCUITO_LIMIAR_FALHAS", "5"))
+LLM_CIRCUITO_TEMPO_ABERTO_S = float(os.getenv("PYLASTRO_LLM_CIRCUITO_TEMPO_ABERTO_S", "30"))
+
+#---9. PERFIS DE ESCALA (população além dos limites de ConfigPopulacao)
+
+PERFIS_ESCALA = {
+    "10k": {"qtd_cedentes": 50, "qtd_sacados": 200, "qtd_duplicatas": 10_000, "tamanho_lote": 10_000, "concentracao": 0.0},
+    "pequeno": {"qtd_cedentes": 50, "qtd_sacados": 200, "qtd_duplicatas": 50_000, "tamanho_lote": 10_000, "concentracao": 0.0},
+    "medio": {"qtd_cedentes": 500, "qtd_sacados": 5_000, "qtd_duplicatas": 1_000_000, "tamanho_lote": 50_000, "concentracao": 0.8},
+    "10m": {"qtd_cedentes": 5_000, "qtd_sacados": 50_000, "qtd_duplicatas": 10_000_000, "tamanho_lote": 200_000, "concentracao": 0.8},
+    "100m": {"qtd_cedentes": 20_000, "qtd_sacados": 500_000, "qtd_duplicatas": 100_000_000, "tamanho_lote": 500_000, "concentracao": 0.8},
+}
+
+#---10. OBSERVABILIDADE
+
+# Histogramas de latência (rotas, etapas do scoring, DuckDB, agente) expostos em /metrics
+METRICAS_HABILITADO = os.getenv("PYLASTRO_METRICAS_HABILITADO", "true").lower() in ("1", "true", "sim", "yes")
+
+# Perfilamento sob demanda: desligado (sem custo) enquanto o token não for definido.
+# Com o token, o header X-Pylastro-Perfil ou /admin/perfis/armar perfilam requisições
+PERFILAMENTO_TOKEN = os.getenv("PYLASTRO_PERFILAMENTO_TOKEN")
+PERFILAMENTO_INTERVALO_AMOSTRAGEM_MS = float(os.getenv("PYLASTRO_PERFILAMENTO_INTERVALO_AMOSTRAGEM_MS", "5"))
+PERFIS_PATH = BASE_PATH / "data" / "perfis"
+# Retenção: acima disso, os perfis mais antigos em PERFIS_PATH são apagados
+PERFIS_MAX = int(os.getenv("PYLASTRO_PERFIS_MAX", "200"))
+
+#---11. BENCHMARKS
+
+# Faixa de escala -> perfil de população (PERFIS_ESCALA) usado para semear o banco
+FAIXAS_BENCHMARK = {"10k": "10k", "1m": "medio", "10m": "10m"}
+BENCHMARKS_PATH = BASE_PATH / "data" / "benchmarks"
+# Tolerância antes de acusar regressão em relação ao baseline (0.2 = 20% mais lento)
+BENCHMARK_TOLERANCIA = float(os.getenv("PYLASTRO_BENCHMARK_TOLERANCIA", "0.2"))
+
+#---12. INGESTÃO EM TEMPO REAL (POST /duplicatas)
+
+# Micro-lote: grava quando juntar INGESTAO_LOTE_MAX linhas ou após INGESTAO_JANELA_MS
+INGESTAO_LOTE_MAX = int(os.getenv("PYLASTRO_INGESTAO_LOTE_MAX", "2000"))
+INGESTAO_JANELA_MS = float(os.getenv("PYLASTRO_INGESTAO_JANELA_MS", "50"))
+# Backpressure: acima disso de linhas aguardando gravação, a API responde 429
+INGESTAO_PENDENTES_MAX = int(os.getenv("PYLASTRO_INGESTAO_PENDENTES_MAX", "20000"))
+# Validade das estatísticas de referência (média/desvio por setor, p75 do valor)
+INGESTAO_TTL_REFERENCIA_S = float(os.getenv("PYLASTRO_INGESTAO_TTL_REFERENCIA_S", "60"))
+
+#---13. ALERTAS CONTÍNUOS (regras avaliadas a cada micro-lote ingerido)
 
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
\ No newline at end of file
+ALERTAS_HABILITADO = os.getenv("PYLASTRO_ALERTAS_HABILITADO", "true").lower() in ("1", "true", "sim", "yes")
+# Regras: classificação mínima que gera alerta e valor mínimo do endosso não bancário
+ALERTAS_CLASSIFICACAO_MINIMA = os.getenv("PYLASTRO_ALERTAS_CLASSIFICACAO_MINIMA", "ALTO")
+ALERTAS_ENDOSSO_VALOR_MIN = float(os.getenv("PYLASTRO_ALERTAS_ENDOSSO_VALOR_MIN", "10000"))
+# Destinos além da tabela `alertas`, separados por vírgula: fila | webhook
+ALERTAS_SINKS = [s.strip() for s in os.getenv("PYLASTRO_ALERTAS_SINKS", "fila").split(",") if s.strip()]
+ALERTAS_WEBHOOK_URL = os.getenv("PYLASTRO_ALERTAS_WEBHOOK_URL", "http://127.0.0.1:8000/mocks/webhook/alertas")
+ALERTAS_FILA_MAX = int(os.getenv("PYLASTRO_ALERTAS_FILA_MAX", "10000"))
+# Enfileira os casos alertados na fila de investigações do agente
+ALERTAS_INVESTIGAR = os.getenv("PYLASTRO_ALERTAS_INVESTIGAR", "false").lower() in ("1", "true", "sim", "yes")
@@ -0,0 +1,296 @@
+import random
+import threading
+import time
+
+from .config import (
+    LLM_RPM,
+    LLM_TPM,
+    LLM_CONCORRENCIA_INICIAL,
+    LLM_CONCORRENCIA_MAX,
+    LLM_LATENCIA_ALVO_S,
+    LLM_MAX_TENTATIVAS,
+    LLM_CIRCUITO_LIMIAR_FALHAS,
+    LLM_CIRCUITO_TEMPO_ABERTO_S,
+)
+
+
+class ProvedorIndisponivel(Exception):
+    """Circuito aberto: o provedor do LLM está degradado e a chamada foi recusada"""
+
+
+def eh_throttle(erro: Exception) -> bool:
+    """429 / RESOURCE_EXHAUSTED do provedor"""
+    if getattr(erro, "status_code", None) == 429 or getattr(erro, "code", None) == 429:
+        return True
+    texto = str(erro)
+    return "429" in texto or "RESOURCE_EXHAUSTED" in texto or "rate limit" in texto.lower()
+
+
+def eh_transitorio(erro: Exception) -> bool:
+    """Erros que valem nova tentativa: throttle, 5xx e timeouts"""
+    if eh_throttle(erro):
+        return True
+    status = getattr(erro, "status_code", None) or getattr(erro, "code", None)
+    if isinstance(status, int) and status >= 500:
+        return True
+    texto = str(erro)
+    return any(sinal in texto for sinal in ("503", "UNAVAILABLE", "DEADLINE_EXCEEDED", "Timeout", "timed out"))
+
+
+class TokenBucket:
+    """
+    Balde de fichas: `capacidade` fichas, reabastecido a `taxa` fichas/segundo.
+    Usado tanto para requisições/minuto quanto para tokens/minuto.
+    Capacidade ou taxa <= 0 desliga o limite (ex: PYLASTRO_LLM_RPM=0).
+    """
+
+    def __init__(self, capacidade: float, taxa: float):
+        self.capacidade = capacidade
+        self.taxa = taxa
+        self.ilimitado = capacidade <= 0 or taxa <= 0
+        self._fichas = capacidade
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reabastecer(self):
+        agora = time.monotonic()
+        self._fichas = min(self.capacidade, self._fichas + (agora - self._ultimo) * self.taxa)
+        self._ultimo = agora
+
+    def adquirir(self, quantidade: float = 1) -> float:
+        """Bloqueia até haver fichas suficientes. Retorna o tempo esperado (s)."""
+        if self.ilimitado:
+            return 0.0
+        quantidade = min(quantidade, self.capacidade)
+        esperado = 0.0
+        while True:
+            with self._lock:
+                self._reabastecer()
+                if self._fichas >= quantidade:
+                    self._fichas -= quantidade
+                    return esperado
+                falta = (quantidade - self._fichas) / self.taxa
+            time.sleep(falta)
+            esperado += falta
+
+    def debitar(self, quantidade: float):
+        """Ajuste após a chamada (ex: tokens reais acima da estimativa); pode ficar negativo"""
+        if self.ilimitado:
+            return
+        with self._lock:
+            self._reabastecer()
+            self._fichas -= quantidade
+
+
+class ConcorrenciaAdaptativa:
+    """
+    Limite de chamadas simultâneas com controle AIMD:
+    - sucesso dentro da latência alvo: aumento aditivo (+1 por janela cheia)
+    - 429: redução multiplicativa (metade)
+    - latência acima do alvo: redução suave (10%)
+    """
+
+    def __init__(self, inicial: int, minimo: int = 1, maximo: int = 32, latencia_alvo_s: float = 20.0):
+        self.limite = float(inicial)
+        self.minimo = minimo
+        self.maximo = maximo
+        self.latencia_alvo_s = latencia_alvo_s
+        self.em_uso = 0
+        self._cond = threading.Condition()
+
+    def adquirir(self):
+        with self._cond:
+            while self.em_uso >= int(self.limite):
+                self._cond.wait()
+            self.em_uso += 1
+
+    def liberar(self, latencia_s: float, throttled: bool = False):
+        with self._cond:
+            self.em_uso -= 1
+            if throttled:
+                self.limite = max(self.minimo, self.limite * 0.5)
+            elif latencia_s > self.latencia_alvo_s:
+                self.limite = max(self.minimo, self.limite * 0.9)
+            else:
+                self.limite = min(self.maximo, self.limite + 1 / self.limite)
+            self._cond.notify_all()
+
+
+class CircuitBreaker:
+    """
+    FECHADO -> ABERTO após `limiar_falhas` falhas consecutivas do provedor.
+    ABERTO recusa chamadas por `tempo_aberto_s`; depois SEMI_ABERTO libera uma
+    chamada de teste: sucesso fecha o circuito, falha reabre. Um erro que não
+    diz nada sobre a saúde do provedor só libera o teste (`liberar_teste`).
+    """
+
+    FECHADO, ABERTO, SEMI_ABERTO = "FECHADO", "ABERTO", "SEMI_ABERTO"
+
+    def __init__(self, limiar_falhas: int = 5, tempo_aberto_s: float = 30.0):
+        self.limiar_falhas = limiar_falhas
+        self.tempo_aberto_s = tempo_aberto_s
+        self.estado = self.FECHADO
+        self._falhas = 0
+        self._aberto_em = 0.0
+        self._teste_em_andamento = False
+        self._lock = threading.Lock()
+
+    def permitir(self) -> bool:
+        with self._lock:
+            if self.estado == self.FECHADO:
+                return True
+            if self.estado == self.ABERTO and time.monotonic() - self._aberto_em >= self.tempo_aberto_s:
+                self.estado = self.SEMI_ABERTO
+                self._teste_em_andamento = False
+            if self.estado == self.SEMI_ABERTO and not self._teste_em_andamento:
+                self._teste_em_andamento = True
+                return True
+            return False
+
+    def registrar_sucesso(self):
+        with self._lock:
+            self._falhas = 0
+            self.estado = self.FECHADO
+            self._teste_em_andamento = False
+
+    def liberar_teste(self):
+        """Encerra a chamada de teste sem mudar o estado: a próxima chamada testa de novo"""
+        with self._lock:
+            self._teste_em_andamento = False
+
+    def registrar_falha(self):
+        with self._lock:
+            self._falhas += 1
+            if self.estado == self.SEMI_ABERTO or self._falhas >= self.limiar_falhas:
+                self.estado = self.ABERTO
+                self._aberto_em = time.monotonic()
+                self._teste_em_andamento = False
+
+
+class ControladorLLM:
+    """
+    Ponto único de controle das chamadas ao provedor do LLM, compartilhado por
+    todas as investigações do processo: rate limit (RPM/TPM), concorrência
+    adaptativa, retries com backoff exponencial + jitter e circuit breaker.
+    """
+
+    def __init__(
+        self,
+        rpm: float = LLM_RPM,
+        tpm: float = LLM_TPM,
+        concorrencia_inicial: int = LLM_CONCORRENCIA_INICIAL,
+        concorrencia_max: int = LLM_CONCORRENCIA_MAX,
+        latencia_alvo_s: float = LLM_LATENCIA_ALVO_S,
+        max_tentativas: int = LLM_MAX_TENTATIVAS,
+        limiar_falhas: int = LLM_CIRCUITO_LIMIAR_FALHAS,
+        tempo_aberto_s: float = LLM_CIRCUITO_TEMPO_ABERTO_S,
+        backoff_base_s: float = 0.5,
+        backoff_max_s: float = 20.0
+    ):
+        self.requisicoes = TokenBucket(capacidade=rpm, taxa=rpm / 60)
+        self.tokens = TokenBucket(capacidade=tpm, taxa=tpm / 60)
+        self.concorrencia = ConcorrenciaAdaptativa(
+            inicial=concorrencia_inicial,
+            maximo=concorrencia_max,
+            latencia_alvo_s=latencia_alvo_s
+        )
+        self.circuito = CircuitBreaker(limiar_falhas=limiar_falhas, tempo_aberto_s=tempo_aberto_s)
+        self.max_tentativas = max(1, max_tentativas)
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+
+        self._lock = threading.Lock()
+        self._contadores = {
+            "chamadas": 0,
+            "sucessos": 0,
+            "throttles_429": 0,
+            "erros_transitorios": 0,
+            "erros_definitivos": 0,
+            "retries": 0,
+            "rejeitadas_circuito_aberto": 0,
+            "espera_rate_limit_s": 0.0,
+            "latencia_total_s": 0.0
+        }
+
+    def _incrementar(self, chave: str, valor: float = 1):
+        with self._lock:
+            self._contadores[chave] += valor
+
+    def _backoff(self, tentativa: int) -> float:
+        """Full jitter: evita que as retries de vários casos saiam sincronizadas"""
+        return random.uniform(0, min(self.backoff_max_s, self.backoff_base_s * 2 ** tentativa))
+
+    def executar(self, funcao, tokens_estimados: int = 0):
+        """
+        Executa `funcao` (a chamada ao LLM) respeitando os limites.
+
+        Raises:
+            ProvedorIndisponivel: circuito aberto
+            Exception: erro definitivo ou esgotadas as tentativas
+        """
+        for tentativa in range(self.max_tentativas):
+            if not self.circuito.permitir():
+                self._incrementar("rejeitadas_circuito_aberto")
+                raise ProvedorIndisponivel("Circuito aberto: provedor do LLM degradado, tente novamente mais tarde")
+
+            espera = self.requisicoes.adquirir(1)
+            espera += self.tokens.adquirir(tokens_estimados)
+            self._incrementar("espera_rate_limit_s", espera)
+
+            self.concorrencia.adquirir()
+            self._incrementar("chamadas")
+            inicio = time.perf_counter()
+            try:
+                resposta = funcao()
+            except Exception as e:
+                latencia = time.perf_counter() - inicio
+                throttled = eh_throttle(e)
+                self.concorrencia.liberar(latencia, throttled=throttled)
+
+                if not eh_transitorio(e):
+                    self._incrementar("erros_definitivos")
+                    # Erro da requisição, não do provedor: não conta como falha,
+                    # mas a chamada de teste (SEMI_ABERTO) precisa ser liberada
+                    self.circuito.liberar_teste()
+                    raise
+
+                self._incrementar("throttles_429" if throttled else "erros_transitorios")
+                self.circuito.registrar_falha()
+
+                if tentativa == self.max_tentativas - 1:
+                    raise
+                self._incrementar("retries")
+                time.sleep(self._backoff(tentativa))
+                continue
+
+            latencia = time.perf_counter() - inicio
+            self.concorrencia.liberar(latencia)
+            self.circuito.registrar_sucesso()
+            self._incrementar("sucessos")
+            self._incrementar("latencia_total_s", latencia)
+
+            # Corrige o balde de tokens com o consumo real informado pelo provedor
+            uso = getattr(resposta, "usage_metadata", None) or {}
+            tokens_reais = uso.get("total_tokens", 0)
+            if tokens_reais > tokens_estimados:
+                self.tokens.debitar(tokens_reais - tokens_estimados)
+
+            return resposta
+
+    def metricas(self) -> dict:
+        with self._lock:
+            contadores = dict(self._contadores)
+        sucessos = contadores["sucessos"]
+        return {
+            **contadores,
+            "espera_rate_limit_s": round(contadores["espera_rate_limit_s"], 3),
+            "latencia_total_s": round(contadores["latencia_total_s"], 3),
+            "latencia_media_s": round(contadores["latencia_total_s"] / sucessos, 3) if sucessos else 0,
+            "limite_concorrencia": round(self.concorrencia.limite, 2),
+            "chamadas_em_andamento": self.concorrencia.em_uso,
+            "estado_circuito": self.circuito.estado
+        }
+
+
+# Instância compartilhada pelo processo (todas as investigações usam o mesmo limite)
+controlador_llm = ControladorLLM()
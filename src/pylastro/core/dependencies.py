@@ -1,11 +1,29 @@
-from .config import DB_PATH
+import secrets
+from fastapi import Header, HTTPException
+
+from .config import DB_PATH, DB_SOMENTE_LEITURA, AGENTE_HABILITADO, PERFILAMENTO_TOKEN
 from ..db.duckdb import DuckDBManager
 
 def get_db_manager():
-    dudck_db_mamnager = DuckDBManager(DB_PATH)
+    dudck_db_mamnager = DuckDBManager(DB_PATH, somente_leitura=DB_SOMENTE_LEITURA)
     return dudck_db_mamnager
 
 def get_db_connection():
     return get_db_manager().get_connection()
 
+def exigir_agente():
+    """Dependency das rotas do agente: 503 nos workers com o agente desabilitado"""
+    if not AGENTE_HABILITADO:
+        raise HTTPException(status_code=503, detail="Agente desabilitado neste worker (PYLASTRO_AGENTE_HABILITADO=false)")
+
+def exigir_escrita():
+    """Dependency das rotas que gravam no banco: 503 nos workers em modo somente leitura"""
+    if DB_SOMENTE_LEITURA:
+        raise HTTPException(status_code=503, detail="Banco em modo somente leitura neste worker (PYLASTRO_DB_SOMENTE_LEITURA=true)")
 
+def exigir_token_perfilamento(x_pylastro_token: str = Header(default=None)):
+    """Dependency das rotas admin de perfilamento: 404 sem token configurado, 403 com token errado"""
+    if not PERFILAMENTO_TOKEN:
+        raise HTTPException(status_code=404, detail="Perfilamento desabilitado (defina PYLASTRO_PERFILAMENTO_TOKEN)")
+    if not x_pylastro_token or not secrets.compare_digest(x_pylastro_token, PERFILAMENTO_TOKEN):
+        raise HTTPException(status_code=403, detail="Token de perfilamento inválido")
@@ -0,0 +1,169 @@
+import bisect
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+from .config import METRICAS_HABILITADO
+
+# Limites (s) dos buckets, os mesmos do cliente oficial do Prometheus
+BUCKETS_PADRAO = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+BUCKETS_AGENTE = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+# Histogramas expostos em /metrics: nome -> (descrição, labels, buckets)
+HISTOGRAMAS = {
+    "pylastro_http_requisicao_segundos": (
+        "Latência das requisições HTTP por rota", ("metodo", "rota", "status"), BUCKETS_PADRAO),
+    "pylastro_detector_etapa_segundos": (
+        "Duração de cada etapa do pipeline de scoring", ("etapa",), BUCKETS_PADRAO),
+    "pylastro_duckdb_consulta_segundos": (
+        "Duração das consultas ao DuckDB por comando SQL", ("comando",), BUCKETS_PADRAO),
+    "pylastro_ingestao_etapa_segundos": (
+        "Duração das etapas de cada micro-lote do POST /duplicatas", ("etapa",), BUCKETS_PADRAO),
+    "pylastro_agente_no_segundos": (
+        "Duração dos nós do grafo do agente", ("no",), BUCKETS_AGENTE),
+    "pylastro_agente_tool_segundos": (
+        "Duração das tools do agente", ("tool",), BUCKETS_AGENTE),
+}
+
+_SEM_MEDICAO = nullcontext()
+
+
+class _Serie:
+    __slots__ = ("contagens", "soma", "total")
+
+    def __init__(self, n_buckets: int):
+        self.contagens = [0] * n_buckets
+        self.soma = 0.0
+        self.total = 0
+
+
+class RegistroMetricas:
+    """
+    Histogramas de latência exportados no formato texto do Prometheus.
+
+    Cada série é identificada pelo nome do histograma e pelos valores dos seus
+    labels. Thread-safe: as rotas síncronas, a fila de investigações e a carga
+    do banco registram de threads distintas.
+
+    Desabilitado (PYLASTRO_METRICAS_HABILITADO=false), `cronometrar` devolve um
+    contexto vazio e `observar` retorna de imediato.
+    """
+
+    def __init__(self, habilitado: bool = True):
+        self.habilitado = habilitado
+        self._lock = threading.Lock()
+        self._series = defaultdict(dict)
+
+    def observar(self, nome: str, segundos: float, **labels):
+        if not self.habilitado:
+            return
+        _, nomes_labels, buckets = HISTOGRAMAS[nome]
+        chave = tuple(str(labels.get(label, "")) for label in nomes_labels)
+        posicao = bisect.bisect_left(buckets, segundos)
+
+        with self._lock:
+            serie = self._series[nome].get(chave)
+            if serie is None:
+                serie = self._series[nome][chave] = _Serie(len(buckets))
+            if posicao < len(buckets):
+                serie.contagens[posicao] += 1
+            serie.soma += segundos
+            serie.total += 1
+
+    def cronometrar(self, nome: str, **labels):
+        """Context manager que observa o tempo do bloco em `nome`"""
+        if not self.habilitado:
+            return _SEM_MEDICAO
+        return self._cronometro(nome, labels)
+
+    @contextmanager
+    def _cronometro(self, nome: str, labels: dict):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(nome, time.perf_counter() - inicio, **labels)
+
+    def exportar_prometheus(self) -> str:
+        """Texto no formato de exposição do Prometheus (version=0.0.4)"""
+        linhas = []
+        with self._lock:
+            for nome, (descricao, nomes_labels, buckets) in HISTOGRAMAS.items():
+                linhas.append(f"# HELP {nome} {descricao}")
+                linhas.append(f"# TYPE {nome} histogram")
+
+                for chave, serie in sorted(self._series.get(nome, {}).items()):
+                    rotulos = ",".join(f'{label}="{_escapar(valor)}"' for label, valor in zip(nomes_labels, chave))
+                    separador = "," if rotulos else ""
+
+                    acumulado = 0
+                    for limite, contagem in zip(buckets, serie.contagens):
+                        acumulado += contagem
+                        linhas.append(f'{nome}_bucket{{{rotulos}{separador}le="{limite}"}} {acumulado}')
+                    linhas.append(f'{nome}_bucket{{{rotulos}{separador}le="+Inf"}} {serie.total}')
+                    linhas.append(f"{nome}_sum{{{rotulos}}} {serie.soma}")
+                    linhas.append(f"{nome}_count{{{rotulos}}} {serie.total}")
+        return "\n".join(linhas) + "\n"
+
+    def limpar(self):
+        with self._lock:
+            self._series.clear()
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Instância compartilhada pelo processo
+metricas = RegistroMetricas(habilitado=METRICAS_HABILITADO)
+
+
+def cronometrar_funcao(nome: str, **labels):
+    """Decorator: observa a duração de cada chamada da função em `nome`"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with metricas.cronometrar(nome, **labels):
+                return func(*args, **kwargs)
+        return wrapper if metricas.habilitado else func
+    return decorator
+
+
+class ConexaoCronometrada:
+    """
+    Proxy de uma conexão DuckDB que mede `execute`/`sql` por comando SQL
+    (primeira palavra: SELECT, INSERT, CREATE...). O restante da interface é
+    repassado à conexão original.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def execute(self, query, *args, **kwargs):
+        with metricas.cronometrar("pylastro_duckdb_consulta_segundos", comando=_comando_sql(query)):
+            return self._conn.execute(query, *args, **kwargs)
+
+    def sql(self, query, *args, **kwargs):
+        with metricas.cronometrar("pylastro_duckdb_consulta_segundos", comando=_comando_sql(query)):
+            return self._conn.sql(query, *args, **kwargs)
+
+    def __getattr__(self, nome):
+        return getattr(self._conn, nome)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._conn.close()
+
+
+def _comando_sql(query) -> str:
+    partes = str(query).split(None, 1)
+    return partes[0].upper() if partes else "VAZIO"
+
+
+def instrumentar_conexao(conn):
+    """Envolve a conexão no proxy cronometrado quando as métricas estão habilitadas"""
+    return ConexaoCronometrada(conn) if metricas.habilitado else conn
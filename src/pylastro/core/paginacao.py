@@ -0,0 +1,57 @@
+import base64
+import json
+from datetime import date
+from typing import Callable, Optional, Sequence
+
+
+def codificar_cursor(valores: list) -> str:
+    """Serializa a chave da última linha da página em um cursor opaco (base64 url-safe)"""
+    bruto = json.dumps(valores, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(bruto.encode()).decode().rstrip("=")
+
+
+def cursor_numero(valor) -> float:
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+        raise ValueError(f"esperado número, recebido {valor!r}")
+    return float(valor)
+
+
+def cursor_texto(valor) -> str:
+    if not isinstance(valor, str):
+        raise ValueError(f"esperado texto, recebido {valor!r}")
+    return valor
+
+
+def cursor_data(valor) -> date:
+    """Data ISO (AAAA-MM-DD)"""
+    return date.fromisoformat(cursor_texto(valor))
+
+
+def decodificar_cursor(cursor: str, tipos: Optional[Sequence[Callable]] = None) -> list:
+    """
+    Reverte codificar_cursor.
+
+    Args:
+        tipos: um conversor por posição da chave (ex: cursor_numero,
+            cursor_texto); a lista precisa ter exatamente esse tamanho
+
+    Raises:
+        ValueError: cursor malformado ou fora do formato de `tipos`
+    """
+    try:
+        preenchimento = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + preenchimento))
+    except Exception as e:
+        raise ValueError(f"Cursor inválido: {e}")
+
+    if not isinstance(valores, list):
+        raise ValueError("Cursor inválido")
+    if tipos is None:
+        return valores
+
+    if len(valores) != len(tipos):
+        raise ValueError(f"Cursor inválido: esperados {len(tipos)} valores, recebidos {len(valores)}")
+    try:
+        return [converter(valor) for converter, valor in zip(tipos, valores)]
+    except ValueError as e:
+        raise ValueError(f"Cursor inválido: {e}")
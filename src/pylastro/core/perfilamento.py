@@ -0,0 +1,374 @@
+import asyncio
+import contextvars
+import cProfile
+import io
+import itertools
+import json
+import logging
+import pstats
+import shutil
+import sys
+import threading
+import time
+import uuid
+import zipfile
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+from typing import Optional
+
+from .config import PERFILAMENTO_TOKEN, PERFIS_PATH, PERFIS_MAX, PERFILAMENTO_INTERVALO_AMOSTRAGEM_MS
+
+MODOS = ("amostragem", "deterministico")
+
+# Observabilidade, probes e documentação: não consomem os perfis armados
+ROTAS_SEM_PERFIL_ARMADO = (
+    "/metrics", "/populacao/pronto", "/populacao/status", "/alertas/estado",
+    "/admin/perfis", "/docs", "/redoc", "/openapi.json"
+)
+
+# Mesmo logger das mensagens do uvicorn sobre as requisições
+logger = logging.getLogger("uvicorn.error")
+
+# Só existe com PYLASTRO_PERFILAMENTO_TOKEN definido: sem ele, nada é instalado
+PERFILAMENTO_HABILITADO = bool(PERFILAMENTO_TOKEN)
+
+# Um cProfile ativo por processo: no Python >= 3.12 (sys.monitoring) um segundo
+# enable() simultâneo levanta ValueError, e o perfil ativo vê todas as threads
+_lock_cprofile = threading.Lock()
+
+# Sessão da requisição em andamento (propaga para a thread das rotas síncronas)
+_sessao_atual: contextvars.ContextVar[Optional["SessaoPerfil"]] = contextvars.ContextVar("sessao_perfil", default=None)
+
+
+class AmostradorPilhas:
+    """
+    Profiler por amostragem: uma thread lê as pilhas das threads observadas
+    (sys._current_frames) a cada `intervalo_s` e conta as pilhas no formato
+    "folded" (func;func;func N), pronto para flamegraph.pl/speedscope.
+    """
+
+    def __init__(self, intervalo_s: float, threads: set):
+        self.intervalo_s = intervalo_s
+        self.threads = threads
+        self.pilhas = Counter()
+        self.amostras = 0
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._amostrar, name="perfil-amostrador", daemon=True)
+
+    def iniciar(self):
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+        self._thread.join(timeout=1)
+
+    def _amostrar(self):
+        while not self._parar.wait(self.intervalo_s):
+            for id_thread, frame in sys._current_frames().items():
+                if id_thread not in self.threads:
+                    continue
+                pilha = []
+                while frame is not None:
+                    codigo = frame.f_code
+                    pilha.append(f"{codigo.co_name} ({Path(codigo.co_filename).name}:{frame.f_lineno})")
+                    frame = frame.f_back
+                self.pilhas[";".join(reversed(pilha))] += 1
+            self.amostras += 1
+
+    def folded(self) -> str:
+        return "\n".join(f"{pilha} {n}" for pilha, n in self.pilhas.most_common())
+
+
+class SessaoPerfil:
+    """
+    Perfil de uma requisição. Artefatos em PERFIS_PATH/<id>/:
+
+    - meta.json: rota, modo, duração, status e arquivos gerados
+    - amostras.folded: pilhas amostradas (modo amostragem)
+    - python.prof / python.txt: cProfile das funções @perfilavel (modo deterministico).
+      Com outro cProfile ativo no processo, a thread cai para amostragem e o
+      motivo fica em `avisos` no meta.json
+    - duckdb/consulta-NNN.json / .sql: EXPLAIN ANALYZE (JSON) de cada consulta
+      de leitura, com tempos e cardinalidades por operador
+    """
+
+    def __init__(self, modo: str, metodo: str, rota: str, origem: str):
+        self.id = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{uuid.uuid4().hex[:4]}"
+        self.modo = modo
+        self.metodo = metodo
+        self.rota = rota
+        self.origem = origem
+        self.diretorio = PERFIS_PATH / self.id
+        self.diretorio_duckdb = self.diretorio / "duckdb"
+        self.diretorio_duckdb.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._consultas = itertools.count(1)
+        self._stats: Optional[pstats.Stats] = None
+        self._inicio = time.perf_counter()
+        self._amostrador: Optional[AmostradorPilhas] = None
+        self._threads_cprofile = set()
+        self.avisos = []
+
+        # Thread do event loop: rotas async e middlewares
+        self.threads = {threading.get_ident()}
+        if modo == "amostragem":
+            self._amostrador = AmostradorPilhas(PERFILAMENTO_INTERVALO_AMOSTRAGEM_MS / 1000, self.threads)
+            self._amostrador.iniciar()
+
+    def proximo_arquivo_consulta(self) -> Path:
+        return self.diretorio_duckdb / f"consulta-{next(self._consultas):03d}.json"
+
+    @contextmanager
+    def perfilar_thread(self):
+        """Chamado por @perfilavel na thread que executa a rota"""
+        id_thread = threading.get_ident()
+        self.threads.add(id_thread)
+        # Chamada @perfilavel aninhada: o cProfile de fora já está medindo
+        if self.modo != "deterministico" or id_thread in self._threads_cprofile:
+            yield
+            return
+
+        if not _lock_cprofile.acquire(blocking=False):
+            self._cair_para_amostragem("outro cProfile ativo no processo")
+            yield
+            return
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            _lock_cprofile.release()
+            self._cair_para_amostragem(f"cProfile.enable() falhou: {e}")
+            yield
+            return
+
+        self._threads_cprofile.add(id_thread)
+        try:
+            yield
+        finally:
+            profiler.disable()
+            self._threads_cprofile.discard(id_thread)
+            _lock_cprofile.release()
+            with self._lock:
+                if self._stats is None:
+                    self._stats = pstats.Stats(profiler)
+                else:
+                    self._stats.add(profiler)
+
+    def _cair_para_amostragem(self, motivo: str):
+        """Sem cProfile disponível, a sessão deterministica passa a ser amostrada"""
+        with self._lock:
+            self.avisos.append(f"{motivo}: amostragem no lugar do cProfile")
+            if self._amostrador is None:
+                self._amostrador = AmostradorPilhas(PERFILAMENTO_INTERVALO_AMOSTRAGEM_MS / 1000, self.threads)
+                self._amostrador.iniciar()
+
+    def finalizar(self, status: int) -> dict:
+        duracao = time.perf_counter() - self._inicio
+        arquivos = []
+
+        if self._amostrador is not None:
+            self._amostrador.parar()
+            (self.diretorio / "amostras.folded").write_text(self._amostrador.folded(), encoding="utf-8")
+            arquivos.append("amostras.folded")
+
+        if self._stats is not None:
+            self._stats.dump_stats(self.diretorio / "python.prof")
+            texto = io.StringIO()
+            pstats.Stats(str(self.diretorio / "python.prof"), stream=texto).sort_stats("cumulative").print_stats(50)
+            (self.diretorio / "python.txt").write_text(texto.getvalue(), encoding="utf-8")
+            arquivos.extend(["python.prof", "python.txt"])
+
+        arquivos.extend(f"duckdb/{p.name}" for p in sorted(self.diretorio_duckdb.glob("*.json")))
+
+        meta = {
+            "id": self.id,
+            "modo": self.modo,
+            "metodo": self.metodo,
+            "rota": self.rota,
+            "origem": self.origem,
+            "status": status,
+            "duracao_s": round(duracao, 4),
+            "amostras": self._amostrador.amostras if self._amostrador else None,
+            "avisos": self.avisos,
+            "criado_em": datetime.now().isoformat(timespec="seconds"),
+            "arquivos": arquivos
+        }
+        (self.diretorio / "meta.json").write_text(json.dumps(meta, indent=2, ensure_ascii=False), encoding="utf-8")
+        return meta
+
+
+class GerenciadorPerfis:
+    """
+    Decide quais requisições são perfiladas: as que trazem o header
+    X-Pylastro-Perfil (com o token) ou as próximas N armadas pelo endpoint admin,
+    opcionalmente só de uma rota. Thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._restantes = 0
+        self._modo = "amostragem"
+        self._prefixo_rota: Optional[str] = None
+
+    def armar(self, quantidade: int, modo: str = "amostragem", prefixo_rota: Optional[str] = None):
+        with self._lock:
+            self._restantes = quantidade
+            self._modo = modo
+            self._prefixo_rota = prefixo_rota
+
+    def desarmar(self):
+        self.armar(0)
+
+    def situacao(self) -> dict:
+        with self._lock:
+            return {"restantes": self._restantes, "modo": self._modo, "prefixo_rota": self._prefixo_rota}
+
+    def consumir(self, path: str) -> Optional[str]:
+        """Modo de perfil para a requisição armada em `path`, ou None"""
+        if not self._restantes or path.startswith(ROTAS_SEM_PERFIL_ARMADO):
+            return None
+        with self._lock:
+            if self._restantes <= 0 or (self._prefixo_rota and not path.startswith(self._prefixo_rota)):
+                return None
+            self._restantes -= 1
+            return self._modo
+
+    def iniciar_sessao(self, modo: str, metodo: str, rota: str, origem: str):
+        """Cria a sessão e a torna a atual no contexto da requisição"""
+        sessao = SessaoPerfil(modo, metodo, rota, origem)
+        return sessao, _sessao_atual.set(sessao)
+
+    def encerrar_sessao(self, token):
+        """Desliga a sessão do contexto da requisição (artefatos: finalizar_sessao)"""
+        _sessao_atual.reset(token)
+
+    def finalizar_sessao(self, sessao: "SessaoPerfil", status: int) -> dict:
+        """Grava os artefatos da sessão e aplica a retenção (fora do event loop)"""
+        meta = sessao.finalizar(status)
+        self.aplicar_retencao()
+        logger.info(
+            "🔬 Perfil %s gravado (%s, %s, %ss)", meta["id"], meta["modo"], meta["rota"], meta["duracao_s"]
+        )
+        return meta
+
+    def aplicar_retencao(self, maximo: int = PERFIS_MAX):
+        """Apaga os perfis concluídos mais antigos além dos `maximo` mais recentes"""
+        if not PERFIS_PATH.exists():
+            return
+        # O id começa pelo timestamp: ordem alfabética = ordem de criação
+        concluidos = sorted(arquivo.parent for arquivo in PERFIS_PATH.glob("*/meta.json"))
+        for diretorio in concluidos[:max(len(concluidos) - maximo, 0)]:
+            shutil.rmtree(diretorio, ignore_errors=True)
+
+    def listar(self) -> list:
+        if not PERFIS_PATH.exists():
+            return []
+        metas = []
+        for arquivo in sorted(PERFIS_PATH.glob("*/meta.json"), reverse=True):
+            metas.append(json.loads(arquivo.read_text(encoding="utf-8")))
+        return metas
+
+    def compactar(self, id_perfil: str) -> Optional[bytes]:
+        """Zip com todos os artefatos do perfil"""
+        diretorio = PERFIS_PATH / id_perfil
+        if not (diretorio / "meta.json").exists() or diretorio.resolve().parent != PERFIS_PATH.resolve():
+            return None
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as arquivo_zip:
+            for caminho in sorted(diretorio.rglob("*")):
+                if caminho.is_file():
+                    arquivo_zip.write(caminho, caminho.relative_to(diretorio))
+        return buffer.getvalue()
+
+
+# Instância compartilhada pelo processo
+gerenciador_perfis = GerenciadorPerfis()
+
+
+def perfilavel(func):
+    """
+    Marca uma rota (ou função quente) para o perfil deterministico: quando a
+    requisição está sendo perfilada, a chamada roda sob cProfile na thread que
+    a executa. Fora disso custa uma leitura de ContextVar; sem token
+    configurado, devolve a própria função.
+    """
+    if not PERFILAMENTO_HABILITADO:
+        return func
+
+    if asyncio.iscoroutinefunction(func):
+        @wraps(func)
+        async def wrapper_async(*args, **kwargs):
+            sessao = _sessao_atual.get()
+            if sessao is None:
+                return await func(*args, **kwargs)
+            # No event loop, o cProfile também vê as outras tarefas ativas no período
+            with sessao.perfilar_thread():
+                return await func(*args, **kwargs)
+        return wrapper_async
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        sessao = _sessao_atual.get()
+        if sessao is None:
+            return func(*args, **kwargs)
+        with sessao.perfilar_thread():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class ConexaoPerfilada:
+    """
+    Proxy de uma conexão DuckDB aberta durante uma requisição perfilada: antes
+    de cada consulta de leitura (SELECT/WITH), roda a mesma consulta com
+    EXPLAIN (ANALYZE, FORMAT JSON) e grava o plano executado na sessão.
+
+    A consulta é executada duas vezes, só nas requisições perfiladas. Comandos
+    que escrevem (INSERT, UPDATE...) não são repetidos.
+    """
+
+    COMANDOS_LEITURA = ("SELECT", "WITH", "FROM")
+
+    def __init__(self, conn, sessao: SessaoPerfil):
+        self._conn = conn
+        self._sessao = sessao
+
+    def _registrar_plano(self, query, parametros):
+        texto = str(query)
+        partes = texto.split(None, 1)
+        if not partes or partes[0].upper() not in self.COMANDOS_LEITURA:
+            return
+        try:
+            plano = self._conn.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {texto}", parametros).fetchall()[0][1]
+        except Exception as e:
+            plano = json.dumps({"erro": str(e)}, ensure_ascii=False)
+        arquivo = self._sessao.proximo_arquivo_consulta()
+        arquivo.write_text(plano, encoding="utf-8")
+        arquivo.with_suffix(".sql").write_text(texto, encoding="utf-8")
+
+    def execute(self, query, parameters=None):
+        self._registrar_plano(query, parameters)
+        return self._conn.execute(query, parameters)
+
+    def sql(self, query, *args, **kwargs):
+        self._registrar_plano(query, kwargs.get("params"))
+        return self._conn.sql(query, *args, **kwargs)
+
+    def __getattr__(self, nome):
+        return getattr(self._conn, nome)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._conn.close()
+
+
+def perfilar_conexao(conn):
+    """Registra os planos das consultas se a requisição atual estiver sendo perfilada"""
+    sessao = _sessao_atual.get()
+    return conn if sessao is None else ConexaoPerfilada(conn, sessao)
@@ -0,0 +1,87 @@
+import threading
+import time
+from typing import Optional
+
+
+class ProgressoPopulacao:
+    """
+    Estado da população do banco, atualizado pela thread da carga e lido
+    pelas rotas de status. Thread-safe.
+
+    Fases: AGUARDANDO -> PREPARANDO -> GERANDO -> FINALIZANDO -> CONCLUIDO
+    (ou IGNORADO, quando o banco já tem dados, ou ERRO)
+    """
+
+    FASES_FINAIS = ("CONCLUIDO", "IGNORADO", "ERRO")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.limpar()
+
+    def limpar(self):
+        with self._lock:
+            self.fase = "AGUARDANDO"
+            self.total_previsto = 0
+            self.registros_gerados = 0
+            self.registros_inseridos = 0
+            self.erro: Optional[str] = None
+            self._inicio: Optional[float] = None
+            self._fim: Optional[float] = None
+
+    def iniciar(self, total_previsto: int):
+        with self._lock:
+            self.fase = "PREPARANDO"
+            self.total_previsto = total_previsto
+            self.registros_gerados = 0
+            self.registros_inseridos = 0
+            self.erro = None
+            self._inicio = time.monotonic()
+            self._fim = None
+
+    def mudar_fase(self, fase: str, erro: str = None):
+        with self._lock:
+            self.fase = fase
+            if erro is not None:
+                self.erro = erro
+            if fase in self.FASES_FINAIS:
+                self._fim = time.monotonic()
+
+    def registrar_gerados(self, quantidade: int):
+        with self._lock:
+            self.registros_gerados += quantidade
+
+    def registrar_inseridos(self, total: int):
+        with self._lock:
+            self.registros_inseridos = total
+
+    @property
+    def em_andamento(self) -> bool:
+        return self.fase not in self.FASES_FINAIS and self.fase != "AGUARDANDO"
+
+    def resumo(self) -> dict:
+        """Fase, contadores, vazão (linhas/s) e ETA estimado pela vazão de inserção"""
+        with self._lock:
+            decorrido = 0.0
+            if self._inicio is not None:
+                decorrido = (self._fim or time.monotonic()) - self._inicio
+
+            linhas_por_segundo = self.registros_inseridos / decorrido if decorrido > 0 else 0.0
+            restantes = max(0, self.total_previsto - self.registros_inseridos)
+            eta = None
+            if self.fase == "GERANDO" and linhas_por_segundo > 0:
+                eta = round(restantes / linhas_por_segundo, 1)
+
+            return {
+                "fase": self.fase,
+                "total_previsto": self.total_previsto,
+                "registros_gerados": self.registros_gerados,
+                "registros_inseridos": self.registros_inseridos,
+                "linhas_por_segundo": round(linhas_por_segundo, 1),
+                "eta_segundos": eta,
+                "tempo_decorrido_s": round(decorrido, 1),
+                "erro": self.erro
+            }
+
+
+# Instância compartilhada pelo processo
+progresso_populacao = ProgressoPopulacao()
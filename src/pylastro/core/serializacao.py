@@ -0,0 +1,168 @@
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional
+
+import pandas as pd
+from fastapi import HTTPException, Query, Request
+from fastapi.responses import Response
+
+# Dependências opcionais (extra "colunar"): sem elas só o JSON fica disponível
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# OpenAPI das rotas com negociar_formato: além do JSON do response_model, o 200
+# pode vir como Arrow ou Parquet
+RESPOSTAS_COLUNARES = {
+    200: {
+        "description": "JSON (padrão), ou a tabela em Arrow IPC / Parquet conforme `formato` ou Accept",
+        "content": {MEDIA_TYPES["arrow"]: {}, MEDIA_TYPES["parquet"]: {}},
+    }
+}
+
+
+def negociar_formato(
+    request: Request,
+    formato: Optional[str] = Query(default=None, description="json | arrow | parquet (tem prioridade sobre o header Accept)")
+) -> str:
+    """
+    Dependency FastAPI: escolhe o formato da resposta pelo parâmetro `formato`
+    ou pelo header Accept (maior `q` entre os formatos conhecidos; no empate,
+    o primeiro do header). Padrão: JSON.
+    """
+    if formato is None:
+        formato = _formato_do_accept(request.headers.get("accept", ""))
+
+    if formato not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Formato inválido: {formato}")
+    if formato != "json" and pa is None:
+        raise HTTPException(status_code=406, detail="Formato colunar indisponível: instale pyarrow")
+    return formato
+
+
+def _formato_do_accept(accept: str) -> str:
+    por_media_type = {media_type: nome for nome, media_type in MEDIA_TYPES.items()}
+    melhor, melhor_q = "json", 0.0
+    for item in accept.split(","):
+        media_type, *parametros = [parte.strip() for parte in item.split(";")]
+        if media_type.lower() not in por_media_type:
+            continue
+        q = 1.0
+        for parametro in parametros:
+            chave, _, valor = parametro.partition("=")
+            if chave.strip() == "q":
+                try:
+                    q = float(valor)
+                except ValueError:
+                    q = 0.0
+        if q > melhor_q:
+            melhor, melhor_q = por_media_type[media_type.lower()], q
+    return melhor
+
+
+def consultar(conn, query: str, params: Optional[list] = None):
+    """Executa a consulta e materializa direto em Arrow (ou pandas, sem pyarrow)"""
+    cursor = conn.execute(query, params or [])
+    if pa is not None:
+        return cursor.to_arrow_table()
+    return cursor.df()
+
+
+def _padrao_json(valor):
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, pd.Timestamp):
+        return valor.isoformat()
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    if hasattr(valor, "item"):
+        # escalares numpy
+        return valor.item()
+    raise TypeError(f"Tipo não serializável: {type(valor)}")
+
+
+def dumps_json(conteudo) -> bytes:
+    """Encoder JSON rápido (orjson quando disponível)"""
+    if orjson is not None:
+        return orjson.dumps(
+            conteudo,
+            default=_padrao_json,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(conteudo, default=_padrao_json, ensure_ascii=False).encode()
+
+
+def linhas(tabela) -> list:
+    """Tabela Arrow ou DataFrame -> lista de dicts"""
+    if _eh_arrow(tabela):
+        return tabela.to_pylist()
+    return tabela.to_dict(orient="records")
+
+
+def _eh_arrow(tabela) -> bool:
+    return pa is not None and isinstance(tabela, pa.Table)
+
+
+def n_linhas(tabela) -> int:
+    return tabela.num_rows if _eh_arrow(tabela) else len(tabela)
+
+
+def primeiras_linhas(tabela, n: int):
+    return tabela.slice(0, n) if _eh_arrow(tabela) else tabela.iloc[:n]
+
+
+def ultima_linha(tabela) -> dict:
+    return linhas(tabela.slice(tabela.num_rows - 1, 1) if _eh_arrow(tabela) else tabela.iloc[-1:])[0]
+
+
+def selecionar_colunas(tabela, colunas: list):
+    return tabela.select(colunas) if _eh_arrow(tabela) else tabela[colunas]
+
+
+def responder_tabela(tabela, formato: str, envelope: Optional[dict] = None, headers: Optional[dict] = None) -> Response:
+    """
+    Serializa um resultado tabular no formato negociado.
+
+    - json: lista de registros, ou `envelope` com os registros em "itens"
+    - arrow: stream IPC do Arrow (sem passar por pandas quando vem do DuckDB)
+    - parquet: arquivo Parquet em memória
+
+    Nos formatos colunares os metadados do envelope (ex: cursor) vão nos `headers`.
+
+    Devolve um Response pronto: o FastAPI não valida nem reserializa o corpo
+    pelo `response_model` da rota, que passa só a documentar o JSON. No Arrow e
+    no Parquet o corpo é a tabela pura, fora do envelope `Pagina`.
+    """
+    if formato == "json":
+        registros = linhas(tabela)
+        corpo = {**envelope, "itens": registros} if envelope is not None else registros
+        return Response(dumps_json(corpo), media_type=MEDIA_TYPES["json"], headers=headers)
+
+    if not isinstance(tabela, pa.Table):
+        tabela = pa.Table.from_pandas(tabela, preserve_index=False)
+
+    buffer = io.BytesIO()
+    if formato == "arrow":
+        with pa.ipc.new_stream(buffer, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+    else:
+        pq.write_table(tabela, buffer)
+
+    return Response(buffer.getvalue(), media_type=MEDIA_TYPES[formato], headers=headers)
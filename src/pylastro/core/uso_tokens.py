@@ -0,0 +1,49 @@
+import threading
+from collections import defaultdict
+
+
+class ContadorTokens:
+    """
+    Acumula o consumo de tokens do LLM por rota.
+
+    Cada chamada ao modelo registra os tokens de entrada e saída informados
+    no `usage_metadata` da resposta. Thread-safe: as investigações rodam em
+    threads distintas.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._por_rota = defaultdict(lambda: {
+            "chamadas_llm": 0,
+            "tokens_entrada": 0,
+            "tokens_saida": 0
+        })
+
+    def registrar(self, rota: str, tokens_entrada: int, tokens_saida: int):
+        with self._lock:
+            uso = self._por_rota[rota]
+            uso["chamadas_llm"] += 1
+            uso["tokens_entrada"] += tokens_entrada
+            uso["tokens_saida"] += tokens_saida
+
+    def resumo(self) -> dict:
+        """Retorna o consumo por rota, com médias por chamada"""
+        with self._lock:
+            resumo = {}
+            for rota, uso in self._por_rota.items():
+                chamadas = uso["chamadas_llm"]
+                resumo[rota] = {
+                    **uso,
+                    "tokens_total": uso["tokens_entrada"] + uso["tokens_saida"],
+                    "media_entrada_por_chamada": round(uso["tokens_entrada"] / chamadas, 1) if chamadas else 0,
+                    "media_saida_por_chamada": round(uso["tokens_saida"] / chamadas, 1) if chamadas else 0
+                }
+            return resumo
+
+    def limpar(self):
+        with self._lock:
+            self._por_rota.clear()
+
+
+# Instância compartilhada pelo processo
+contador_tokens = ContadorTokens()
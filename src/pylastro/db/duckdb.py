@@ -1,20 +1,42 @@
+import threading
 from typing import List
 from pathlib import Path
 from datetime import datetime
 import duckdb
 import pandas as pd
 
+from ..core.config import BANCOS_KEYWORDS
+from ..core.metricas import instrumentar_conexao
+from ..core.perfilamento import perfilar_conexao
+
+TABELAS_PERFIL = ["perfil_cedente", "perfil_sacado", "perfil_par", "perfil_cedente_endossatario"]
+
+# Mesma regra do RATIO 8 do DetectorFraudeRatios: endossatário presente e sem termo de banco
+_ENDOSSO_NAO_BANCARIO = "endossatario IS NOT NULL AND NOT ({})".format(
+    " OR ".join(f"contains(lower(endossatario), '{termo.lower()}')" for termo in BANCOS_KEYWORDS)
+)
+
 class DuckDBManager:
     """Gerenciador de conexão e operações com DuckDB"""
+
+    # Toda escrita em `duplicatas` também faz upsert nos perfis: duas threads
+    # somando ao mesmo cedente/sacado conflitam no DuckDB ("Duplicate key" ou
+    # "Conflict on update"). As escritas do processo passam uma de cada vez.
+    _lock_escrita = threading.Lock()
     
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, somente_leitura: bool = False):
         self.db_path = db_path
+        # Somente leitura: vários processos (workers do uvicorn) abrem o mesmo arquivo
+        self.somente_leitura = somente_leitura
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
     
     def get_connection(self):
-        """Retorna conexão com o DuckDB"""
-        return duckdb.connect(self.db_path)
+        """
+        Retorna conexão com o DuckDB (cronometrada quando as métricas estão
+        habilitadas, com profiling quando a requisição está sendo perfilada)
+        """
+        return instrumentar_conexao(perfilar_conexao(duckdb.connect(self.db_path, read_only=self.somente_leitura)))
     
     def tabela_existe(self) -> bool:
         """Verifica se a tabela duplicatas existe"""
@@ -58,10 +80,12 @@ class DuckDBManager:
             conn.close()
     
     def limpar_tabela(self):
-        """Remove a tabela duplicatas"""
+        """Remove a tabela duplicatas (e os perfis derivados dela)"""
         conn = self.get_connection()
         try:
             conn.execute("DROP TABLE IF EXISTS duplicatas")
+            for tabela in TABELAS_PERFIL:
+                conn.execute(f"DROP TABLE IF EXISTS {tabela}")
             conn.commit()
         finally:
             conn.close()
@@ -106,24 +130,506 @@ class DuckDBManager:
             conn.commit()
         finally:
             conn.close()
+
+        self.criar_tabelas_perfil()
+
+    def criar_tabelas_perfil(self):
+        """
+        Perfis de risco por cedente, sacado e par (cedente, sacado), mantidos a
+        cada inserção (ver _atualizar_perfis). Em um banco que já tem duplicatas
+        e ainda não tem perfis, calcula os perfis uma vez sobre a tabela inteira.
+        """
+        conn = self.get_connection()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS perfil_cedente (
+                    id_cedente VARCHAR PRIMARY KEY,
+                    qtd_duplicatas BIGINT,
+                    valor_total DOUBLE,
+                    qtd_sem_aceite BIGINT,
+                    qtd_endosso_nao_bancario BIGINT,
+                    qtd_sacados BIGINT,
+                    qtd_endossatarios BIGINT,
+                    primeira_emissao DATE,
+                    ultima_emissao DATE,
+                    atualizado_em TIMESTAMP
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS perfil_sacado (
+                    id_sacado VARCHAR PRIMARY KEY,
+                    qtd_duplicatas BIGINT,
+                    valor_total DOUBLE,
+                    qtd_sem_aceite BIGINT,
+                    qtd_cedentes BIGINT,
+                    atualizado_em TIMESTAMP
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS perfil_par (
+                    id_cedente VARCHAR,
+                    id_sacado VARCHAR,
+                    qtd_duplicatas BIGINT,
+                    valor_total DOUBLE,
+                    qtd_sem_aceite BIGINT,
+                    primeira_emissao DATE,
+                    ultima_emissao DATE,
+                    atualizado_em TIMESTAMP,
+                    PRIMARY KEY (id_cedente, id_sacado)
+                )
+            """)
+            # Base da diversidade de endossatários (contagem distinta incremental)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS perfil_cedente_endossatario (
+                    id_cedente VARCHAR,
+                    endossatario VARCHAR,
+                    qtd_duplicatas BIGINT,
+                    PRIMARY KEY (id_cedente, endossatario)
+                )
+            """)
+            conn.commit()
+
+            sem_perfis = conn.execute("SELECT COUNT(*) FROM perfil_cedente").fetchone()[0] == 0
+            tem_duplicatas = conn.execute(
+                "SELECT COUNT(*) FROM information_schema.tables WHERE table_name = 'duplicatas'"
+            ).fetchone()[0] > 0 and conn.execute("SELECT COUNT(*) FROM duplicatas").fetchone()[0] > 0
+            if sem_perfis and tem_duplicatas:
+                print("🧮 Calculando perfis de cedentes/sacados sobre a base existente...")
+                with self._lock_escrita:
+                    conn.execute("BEGIN TRANSACTION")
+                    self._atualizar_perfis(conn, "duplicatas")
+                    conn.execute("COMMIT")
+        finally:
+            conn.close()
     
+    def criar_tabelas_investigacao(self):
+        """Cria as tabelas da fila durável de investigações do agente"""
+        conn = self.get_connection()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS investigacao_jobs (
+                    id_job VARCHAR PRIMARY KEY,
+                    status VARCHAR,
+                    total_casos INTEGER,
+                    criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS investigacao_casos (
+                    id_job VARCHAR,
+                    posicao INTEGER,
+                    id_duplicata VARCHAR,
+                    evento VARCHAR,
+                    status VARCHAR,
+                    tentativas INTEGER DEFAULT 0,
+                    resultado VARCHAR,
+                    erro VARCHAR,
+                    disponivel_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (id_job, posicao)
+                )
+            """)
+            # Bancos criados antes do lease: dono/lease_ate entram como colunas novas
+            conn.execute("ALTER TABLE investigacao_casos ADD COLUMN IF NOT EXISTS dono VARCHAR")
+            conn.execute("ALTER TABLE investigacao_casos ADD COLUMN IF NOT EXISTS lease_ate TIMESTAMP")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_casos_status ON investigacao_casos(status)")
+
+            conn.commit()
+        finally:
+            conn.close()
+
+    def criar_tabela_instituicoes(self, entidades_iniciais: List[dict] = None):
+        """
+        Cria o cadastro de instituições e, se estiver vazio, popula com
+        `entidades_iniciais` (nome_exato, tipo_instituicao)
+        """
+        conn = self.get_connection()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS instituicoes (
+                    nome_exato VARCHAR PRIMARY KEY,
+                    tipo_instituicao VARCHAR
+                )
+            """)
+            vazia = conn.execute("SELECT COUNT(*) FROM instituicoes").fetchone()[0] == 0
+            if vazia and entidades_iniciais:
+                conn.executemany(
+                    "INSERT INTO instituicoes (nome_exato, tipo_instituicao) VALUES (?, ?)",
+                    [[e["nome_exato"], e["tipo_instituicao"]] for e in entidades_iniciais]
+                )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def carregar_instituicoes(self) -> List[dict]:
+        """Lê todo o cadastro de instituições"""
+        conn = self.get_connection()
+        try:
+            linhas = conn.execute("SELECT nome_exato, tipo_instituicao FROM instituicoes").fetchall()
+            return [{"nome_exato": nome, "tipo_instituicao": tipo} for nome, tipo in linhas]
+        finally:
+            conn.close()
+
     def inserir_lote(self, duplicatas: List[dict]):
         """Insere um lote de duplicatas"""
         if not duplicatas:
             return
         
-        df = pd.DataFrame(duplicatas)
-        
+        self.inserir_dataframe(pd.DataFrame(duplicatas))
+
+    def inserir_dataframe(self, df: pd.DataFrame):
+        """Insere um lote já colunar (ex: DuplicataFactory.gerar_lote_vetorizado)"""
+        if df.empty:
+            return
+
+        with self._lock_escrita:
+            conn = self.get_connection()
+            try:
+                self._inserir_dataframe(conn, df)
+                conn.commit()
+            finally:
+                conn.close()
+
+    def _inserir_dataframe(self, conn, df: pd.DataFrame):
         # Garante que a coluna endossatario existe
         if 'endossatario' not in df.columns:
             df['endossatario'] = None
         
         df['data_insercao'] = datetime.now()
         
+        conn.register('lote', df)
+        conn.execute("INSERT INTO duplicatas BY NAME SELECT * FROM lote")
+        self._atualizar_perfis(conn, "lote")
+        conn.unregister('lote')
+
+    def _atualizar_perfis(self, conn, origem: str):
+        """
+        Soma as duplicatas de `origem` (tabela/view com as linhas novas) aos
+        perfis. Custo proporcional ao lote: só as entidades do lote são
+        tocadas. As contagens distintas (sacados do cedente, cedentes do sacado,
+        endossatários) somam só os pares que o lote traz pela primeira vez,
+        achados com ANTI JOIN contra as tabelas de par antes do upsert.
+        """
+        conn.execute(f"""
+            CREATE OR REPLACE TEMP TABLE pares_novos AS
+            SELECT DISTINCT o.id_cedente, o.id_sacado
+            FROM {origem} o
+            ANTI JOIN perfil_par p ON p.id_cedente = o.id_cedente AND p.id_sacado = o.id_sacado
+        """)
+        conn.execute(f"""
+            CREATE OR REPLACE TEMP TABLE endossatarios_novos AS
+            SELECT DISTINCT o.id_cedente, o.endossatario
+            FROM {origem} o
+            ANTI JOIN perfil_cedente_endossatario e
+                ON e.id_cedente = o.id_cedente AND e.endossatario = o.endossatario
+            WHERE o.endossatario IS NOT NULL
+        """)
+        conn.execute(f"""
+            INSERT INTO perfil_par
+            SELECT
+                id_cedente, id_sacado,
+                COUNT(*), SUM(valor), COUNT(*) FILTER (WHERE NOT aceite_sacado),
+                MIN(data_emissao), MAX(data_emissao), now()
+            FROM {origem}
+            GROUP BY id_cedente, id_sacado
+            ON CONFLICT (id_cedente, id_sacado) DO UPDATE SET
+                qtd_duplicatas = perfil_par.qtd_duplicatas + excluded.qtd_duplicatas,
+                valor_total = perfil_par.valor_total + excluded.valor_total,
+                qtd_sem_aceite = perfil_par.qtd_sem_aceite + excluded.qtd_sem_aceite,
+                primeira_emissao = least(perfil_par.primeira_emissao, excluded.primeira_emissao),
+                ultima_emissao = greatest(perfil_par.ultima_emissao, excluded.ultima_emissao),
+                atualizado_em = excluded.atualizado_em
+        """)
+        conn.execute(f"""
+            INSERT INTO perfil_cedente_endossatario
+            SELECT id_cedente, endossatario, COUNT(*)
+            FROM {origem}
+            WHERE endossatario IS NOT NULL
+            GROUP BY id_cedente, endossatario
+            ON CONFLICT (id_cedente, endossatario) DO UPDATE SET
+                qtd_duplicatas = perfil_cedente_endossatario.qtd_duplicatas + excluded.qtd_duplicatas
+        """)
+        conn.execute(f"""
+            INSERT INTO perfil_cedente
+            WITH lote_cedente AS (
+                SELECT
+                    id_cedente,
+                    COUNT(*) AS qtd_duplicatas,
+                    SUM(valor) AS valor_total,
+                    COUNT(*) FILTER (WHERE NOT aceite_sacado) AS qtd_sem_aceite,
+                    COUNT(*) FILTER (WHERE {_ENDOSSO_NAO_BANCARIO}) AS qtd_endosso_nao_bancario,
+                    MIN(data_emissao) AS primeira_emissao,
+                    MAX(data_emissao) AS ultima_emissao
+                FROM {origem}
+                GROUP BY id_cedente
+            ),
+            sacados_novos AS (
+                SELECT id_cedente, COUNT(*) AS qtd FROM pares_novos GROUP BY id_cedente
+            ),
+            endossos_novos AS (
+                SELECT id_cedente, COUNT(*) AS qtd FROM endossatarios_novos GROUP BY id_cedente
+            )
+            SELECT
+                l.id_cedente, l.qtd_duplicatas, l.valor_total, l.qtd_sem_aceite, l.qtd_endosso_nao_bancario,
+                COALESCE(s.qtd, 0), COALESCE(e.qtd, 0),
+                l.primeira_emissao, l.ultima_emissao, now()
+            FROM lote_cedente l
+            LEFT JOIN sacados_novos s ON s.id_cedente = l.id_cedente
+            LEFT JOIN endossos_novos e ON e.id_cedente = l.id_cedente
+            ON CONFLICT (id_cedente) DO UPDATE SET
+                qtd_duplicatas = perfil_cedente.qtd_duplicatas + excluded.qtd_duplicatas,
+                valor_total = perfil_cedente.valor_total + excluded.valor_total,
+                qtd_sem_aceite = perfil_cedente.qtd_sem_aceite + excluded.qtd_sem_aceite,
+                qtd_endosso_nao_bancario = perfil_cedente.qtd_endosso_nao_bancario + excluded.qtd_endosso_nao_bancario,
+                qtd_sacados = perfil_cedente.qtd_sacados + excluded.qtd_sacados,
+                qtd_endossatarios = perfil_cedente.qtd_endossatarios + excluded.qtd_endossatarios,
+                primeira_emissao = least(perfil_cedente.primeira_emissao, excluded.primeira_emissao),
+                ultima_emissao = greatest(perfil_cedente.ultima_emissao, excluded.ultima_emissao),
+                atualizado_em = excluded.atualizado_em
+        """)
+        conn.execute(f"""
+            INSERT INTO perfil_sacado
+            WITH lote_sacado AS (
+                SELECT
+                    id_sacado,
+                    COUNT(*) AS qtd_duplicatas,
+                    SUM(valor) AS valor_total,
+                    COUNT(*) FILTER (WHERE NOT aceite_sacado) AS qtd_sem_aceite
+                FROM {origem}
+                GROUP BY id_sacado
+            ),
+            cedentes_novos AS (
+                SELECT id_sacado, COUNT(*) AS qtd FROM pares_novos GROUP BY id_sacado
+            )
+            SELECT
+                l.id_sacado, l.qtd_duplicatas, l.valor_total, l.qtd_sem_aceite,
+                COALESCE(c.qtd, 0),
+                now()
+            FROM lote_sacado l
+            LEFT JOIN cedentes_novos c ON c.id_sacado = l.id_sacado
+            ON CONFLICT (id_sacado) DO UPDATE SET
+                qtd_duplicatas = perfil_sacado.qtd_duplicatas + excluded.qtd_duplicatas,
+                valor_total = perfil_sacado.valor_total + excluded.valor_total,
+                qtd_sem_aceite = perfil_sacado.qtd_sem_aceite + excluded.qtd_sem_aceite,
+                qtd_cedentes = perfil_sacado.qtd_cedentes + excluded.qtd_cedentes,
+                atualizado_em = excluded.atualizado_em
+        """)
+        conn.execute("DROP TABLE pares_novos")
+        conn.execute("DROP TABLE endossatarios_novos")
+
+    def perfis_entidades(self, df: pd.DataFrame) -> dict:
+        """
+        Perfis só das entidades presentes em `df` (entrada de
+        DetectorFraudeRatios.calcular_ratios_entidades): 'cedentes', 'sacados'
+        e 'pares', indexados pelas chaves da entidade
+        """
         conn = self.get_connection()
         try:
-            conn.register('lote',df)
-            conn.execute("INSERT INTO duplicatas BY NAME SELECT * FROM lote")
+            conn.register('entidades_lote', df[['id_cedente', 'id_sacado']].drop_duplicates())
+            cedentes = conn.execute("""
+                SELECT id_cedente, qtd_duplicatas, valor_total, qtd_sem_aceite,
+                       qtd_endosso_nao_bancario, qtd_sacados, qtd_endossatarios
+                FROM perfil_cedente
+                WHERE id_cedente IN (SELECT id_cedente FROM entidades_lote)
+            """).df().set_index('id_cedente')
+            sacados = conn.execute("""
+                SELECT id_sacado, qtd_duplicatas, valor_total, qtd_sem_aceite, qtd_cedentes
+                FROM perfil_sacado
+                WHERE id_sacado IN (SELECT id_sacado FROM entidades_lote)
+            """).df().set_index('id_sacado')
+            pares = conn.execute("""
+                SELECT p.id_cedente, p.id_sacado, p.qtd_duplicatas, p.valor_total
+                FROM perfil_par p
+                SEMI JOIN entidades_lote e ON p.id_cedente = e.id_cedente AND p.id_sacado = e.id_sacado
+            """).df().set_index(['id_cedente', 'id_sacado'])
+            conn.unregister('entidades_lote')
+            return {"cedentes": cedentes, "sacados": sacados, "pares": pares}
+        finally:
+            conn.close()
+
+    def inserir_e_contar_chaves(self, df: pd.DataFrame) -> pd.Series:
+        """
+        Insere o lote e, na mesma transação, conta as ocorrências na tabela
+        (já com o lote) de cada chave_nfe do lote. Base do score na chegada.
+        """
+        with self._lock_escrita:
+            conn = self.get_connection()
+            try:
+                conn.execute("BEGIN TRANSACTION")
+                self._inserir_dataframe(conn, df)
+                conn.register('chaves_lote', df[['chave_nfe']].drop_duplicates())
+                contagem = conn.execute("""
+                    SELECT d.chave_nfe, COUNT(*) AS ocorrencias
+                    FROM duplicatas d
+                    SEMI JOIN chaves_lote c ON d.chave_nfe = c.chave_nfe
+                    GROUP BY d.chave_nfe
+                """).df()
+                conn.unregister('chaves_lote')
+                conn.execute("COMMIT")
+                return contagem.set_index('chave_nfe')['ocorrencias']
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            finally:
+                conn.close()
+
+    def estatisticas_valor(self) -> dict:
+        """Média/desvio do valor por setor e 3º quartil geral (os mesmos do DetectorFraudeRatios)"""
+        conn = self.get_connection()
+        try:
+            setores = conn.execute("""
+                SELECT setor_cedente, AVG(valor) AS mean, COALESCE(STDDEV_SAMP(valor), 1) AS std
+                FROM duplicatas
+                GROUP BY setor_cedente
+            """).df().set_index('setor_cedente')
+            valor_p75 = conn.execute("SELECT QUANTILE_CONT(valor, 0.75) FROM duplicatas").fetchone()[0]
+            return {"setores": setores, "valor_p75": valor_p75}
+        finally:
+            conn.close()
+
+    def criar_tabela_alertas(self):
+        """Alertas das regras contínuas; a PK (regra:chave) deduplica entre lotes"""
+        conn = self.get_connection()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS alertas (
+                    id_alerta VARCHAR PRIMARY KEY,
+                    regra VARCHAR,
+                    severidade VARCHAR,
+                    id_duplicata VARCHAR,
+                    chave_nfe VARCHAR,
+                    id_cedente VARCHAR,
+                    valor DECIMAL(18,2),
+                    risk_score DOUBLE,
+                    classificacao VARCHAR,
+                    detalhe VARCHAR,
+                    criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
             conn.commit()
         finally:
             conn.close()
+
+    def inserir_alertas(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Grava os alertas ignorando os já existentes; retorna só os novos"""
+        conn = self.get_connection()
+        try:
+            conn.register('alertas_lote', df)
+            novos = conn.execute("""
+                INSERT OR IGNORE INTO alertas BY NAME
+                SELECT *, now() AS criado_em FROM alertas_lote
+                RETURNING *
+            """).df()
+            conn.unregister('alertas_lote')
+            conn.commit()
+            return novos
+        finally:
+            conn.close()
+
+    def listar_alertas(self, regra: str = None, severidade: str = None, limite: int = 100) -> List[dict]:
+        """Alertas mais recentes primeiro"""
+        filtros, params = [], []
+        if regra:
+            filtros.append("regra = ?")
+            params.append(regra)
+        if severidade:
+            filtros.append("severidade = ?")
+            params.append(severidade)
+        where = f"WHERE {' AND '.join(filtros)}" if filtros else ""
+
+        conn = self.get_connection()
+        try:
+            cursor = conn.execute(f"""
+                SELECT * FROM alertas {where}
+                ORDER BY criado_em DESC, id_alerta
+                LIMIT ?
+            """, params + [limite])
+            colunas = [c[0] for c in cursor.description]
+            return [dict(zip(colunas, linha)) for linha in cursor.fetchall()]
+        finally:
+            conn.close()
+
+    def criar_tabela_checkpoint(self):
+        """Progresso das cargas em larga escala (retomada após interrupção)"""
+        conn = self.get_connection()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS carga_checkpoint (
+                    id_carga VARCHAR PRIMARY KEY,
+                    lotes_concluidos INTEGER,
+                    total_lotes INTEGER,
+                    registros_inseridos BIGINT,
+                    atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def ler_checkpoint(self, id_carga: str):
+        """Retorna (lotes_concluidos, total_lotes, registros_inseridos) ou None"""
+        conn = self.get_connection()
+        try:
+            return conn.execute(
+                "SELECT lotes_concluidos, total_lotes, registros_inseridos FROM carga_checkpoint WHERE id_carga = ?",
+                [id_carga]
+            ).fetchone()
+        finally:
+            conn.close()
+
+    def remover_checkpoint(self, id_carga: str):
+        conn = self.get_connection()
+        try:
+            conn.execute("DELETE FROM carga_checkpoint WHERE id_carga = ?", [id_carga])
+            conn.commit()
+        finally:
+            conn.close()
+
+    def inserir_lote_com_checkpoint(self, df: pd.DataFrame, id_carga: str, lotes_concluidos: int, total_lotes: int):
+        """Insere o lote e avança o checkpoint na mesma transação: ou os dois ficam, ou nenhum"""
+        with self._lock_escrita:
+            conn = self.get_connection()
+            try:
+                conn.execute("BEGIN TRANSACTION")
+                self._inserir_dataframe(conn, df)
+                conn.execute("""
+                    INSERT INTO carga_checkpoint (id_carga, lotes_concluidos, total_lotes, registros_inseridos, atualizado_em)
+                    VALUES (?, ?, ?, ?, now())
+                    ON CONFLICT (id_carga) DO UPDATE SET
+                        lotes_concluidos = excluded.lotes_concluidos,
+                        total_lotes = excluded.total_lotes,
+                        registros_inseridos = carga_checkpoint.registros_inseridos + excluded.registros_inseridos,
+                        atualizado_em = excluded.atualizado_em
+                """, [id_carga, lotes_concluidos, total_lotes, len(df)])
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            finally:
+                conn.close()
+
+    def importar_parquet(self, caminho) -> int:
+        """
+        Carrega arquivo(s) Parquet no layout de `duplicatas` (caminho, glob ou
+        lista de caminhos). Retorna linhas inseridas.
+        """
+        caminho = [str(c) for c in caminho] if isinstance(caminho, (list, tuple)) else str(caminho)
+        with self._lock_escrita:
+            conn = self.get_connection()
+            try:
+                antes = conn.execute("SELECT COUNT(*) FROM duplicatas").fetchone()[0]
+                conn.execute("BEGIN TRANSACTION")
+                conn.execute(
+                    "INSERT INTO duplicatas BY NAME SELECT *, now() AS data_insercao FROM read_parquet(?)",
+                    [caminho]
+                )
+                # now() é o início da transação: identifica as linhas recém-importadas
+                self._atualizar_perfis(conn, "(SELECT * FROM duplicatas WHERE data_insercao = now())")
+                conn.execute("COMMIT")
+                return conn.execute("SELECT COUNT(*) FROM duplicatas").fetchone()[0] - antes
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            finally:
+                conn.close()
@@ -1,35 +1,98 @@
 import json
+import threading
 import requests
 from typing import Dict, Any, List, TypedDict, Annotated
 import duckdb
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.tools import Tool
-from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
+from langchain_core.messages import HumanMessage, AIMessage, ToolMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
 from langgraph.graph.message import add_messages
 
 from ..core.dependencies import get_db_connection
+from ..core.uso_tokens import contador_tokens
+from ..core.controle_taxa import controlador_llm, ProvedorIndisponivel
+from ..core.metricas import metricas, cronometrar_funcao
+from .modelo_chat import criar_modelo_chat
+
+# Protocolo fixo do auditor: enviado como system message, idêntico em todos os casos
+PROTOCOLO_ANTIFRAUDE = """Você é um Auditor Sênior de Riscos e Agente Antifraude.
+
+OBJETIVO: analisar o evento de duplicata enviado pelo usuário, verificar a veracidade da transação com o cliente (simulado) e emitir um veredito.
+
+PROTOCOLO (Rigoroso):
+1. ANÁLISE INICIAL: o erro parece ser cadastral (Entidade) ou operacional?
+2. CONSULTA DE ENTIDADE (Opcional): se houver dúvida sobre quem é o sacado/cedente/endossatário (ex: CNAE incompatível), use a tool `consultar_entidade`.
+3. VERIFICAÇÃO COM CLIENTE (OBRIGATÓRIO SE HOUVER SUSPEITA - O*NET Req 7): se a duplicata for classificada como POSSÍVEL_FRAUDE ou SUSPEITA, CHAME a tool `verificar_com_cliente` passando o `id_duplicata`. A tool consulta a "base de verdade" (DuckDB) e retorna a resposta do cliente.
+4. VEREDITO FINAL:
+- Cliente confirma a emissão -> "FALSO_POSITIVO".
+- Cliente desconhece a dívida -> "FRAUDE_CONFIRMADA".
+- Sem necessidade de contato -> classifique conforme análise técnica.
+
+RESPOSTA: retorne APENAS este JSON válido, sem markdown:
+{"id_duplicata":"copie do evento","veredito_final":"FRAUDE_CONFIRMADA"|"FALSO_POSITIVO"|"LEGITIMO"|"EM_ANALISE","causa_raiz":"ENTIDADE"|"OPERACIONAL"|"GOLPE_EXTERNO","passo_a_passo":{"analise_entidade":"O que você analisou sobre a empresa...","contato_cliente_realizado":true|false,"resposta_cliente":"Resumo do que a tool retornou (se houve contato)"},"acao_recomendada":"BLOQUEAR"|"LIBERAR"|"AGUARDAR","justificativa_tecnica":"Explicação completa baseada nas tools chamadas."}"""
+
+# Campos do evento que o veredito realmente usa (na ordem enviada ao LLM)
+CAMPOS_EVENTO = [
+    'id_duplicata', 'classificacao', 'risk_score', 'motivos', 'valor',
+    'cedente', 'cnpj_cedente', 'estado_cedente', 'setor_cedente',
+    'sacado', 'cnpj_sacado', 'estado_sacado', 'setor_sacado',
+    'aceite_sacado', 'endossatario', 'data_emissao', 'data_vencimento', 'prazo_dias'
+]
+
+
+def montar_mensagem_evento(evento_bi: Dict) -> HumanMessage:
+    """
+    Serializa o evento em JSON denso: apenas CAMPOS_EVENTO, sem nulos,
+    sem indentação e com floats arredondados.
+    """
+    evento = {}
+    for campo in CAMPOS_EVENTO:
+        valor = evento_bi.get(campo)
+        if valor is None or valor == [] or valor == "":
+            continue
+        if isinstance(valor, float):
+            valor = round(valor, 2)
+        evento[campo] = valor
+
+    evento_str = json.dumps(evento, ensure_ascii=False, separators=(",", ":"))
+    return HumanMessage(content=f"EVENTO:{evento_str}")
+
 
 # Estado do agente
 class AgentState(TypedDict):
     messages: Annotated[list, add_messages]
 
 
+class InvestigacaoCancelada(Exception):
+    """A investigação foi interrompida antes da próxima chamada ao LLM"""
+
+
 class AntiFraudeAgente:
     def __init__(
         self, 
         api_url="http://localhost:8000/mocks/instituicoes", 
-        google_model="gemini-2.5-flash" 
+        google_model="gemini-2.5-flash",
+        llm=None,
+        backend=None
     ):
+        """
+        Args:
+            api_url: Endpoint da API de instituições (tool consultar_entidade)
+            google_model: Modelo Gemini usado pelo backend 'gemini'
+            llm: Modelo de chat já construído (tem prioridade sobre `backend`)
+            backend: 'gemini' ou 'fake'; se omitido usa PYLASTRO_LLM_BACKEND
+        """
         self.api_url = api_url
         self.conn = get_db_connection()
+        self._conn_lock = threading.Lock()
+
+        # Base de verdade pré-carregada: id_duplicata -> (label_fraude, nome_cedente)
+        self._verdades: Dict[str, tuple] = {}
         
         # LLM
-        self.llm = ChatGoogleGenerativeAI(
-            model=google_model,
-            temperature=0.2,
-        )
+        self.llm = llm if llm is not None else criar_modelo_chat(backend, google_model)
         
         # Tools
         self.tools = self._build_tools()
@@ -53,6 +116,58 @@ class AntiFraudeAgente:
             return None
         return None
 
+    def precarregar_verdades(self, ids_duplicata: List[str]) -> int:
+        """
+        Resolve em uma única consulta a base de verdade (label_fraude, nome_cedente)
+        de todas as duplicatas do lote, antes das investigações começarem.
+        A tool `verificar_com_cliente` passa a responder a partir deste mapa.
+
+        Returns:
+            Quantidade de duplicatas encontradas no banco
+        """
+        ids = list({str(i).strip() for i in ids_duplicata if i} - self._verdades.keys())
+        if not ids:
+            return 0
+
+        placeholders = ", ".join("?" for _ in ids)
+        query = f"""
+        SELECT id_duplicata, label_fraude, nome_cedente
+        FROM duplicatas WHERE id_duplicata IN ({placeholders})
+        """
+
+        with self._conn_lock:
+            linhas = self.conn.execute(query, ids).fetchall()
+
+        for id_duplicata, label_fraude, nome_cedente in linhas:
+            self._verdades[id_duplicata] = (label_fraude, nome_cedente)
+
+        return len(linhas)
+
+    def descartar_verdades(self, ids_duplicata: List[str]):
+        """Remove do mapa pré-carregado as duplicatas de um lote já investigado"""
+        for id_duplicata in ids_duplicata:
+            self._verdades.pop(str(id_duplicata).strip(), None)
+
+    def _buscar_verdade(self, id_duplicata: str):
+        """Consulta o mapa pré-carregado e, se ausente, faz a busca pontual no DuckDB"""
+        id_duplicata = str(id_duplicata).strip()
+
+        resultado = self._verdades.get(id_duplicata)
+        if resultado is not None:
+            return resultado
+
+        query = """
+        SELECT label_fraude, nome_cedente 
+        FROM duplicatas WHERE id_duplicata = ?
+        """
+
+        with self._conn_lock:
+            resultado = self.conn.execute(query, [id_duplicata]).fetchone()
+
+        if resultado:
+            self._verdades[id_duplicata] = tuple(resultado)
+        return resultado
+
     def _build_tools(self) -> List[Tool]:
         def consultar_entidade(nome: str) -> str:
             """
@@ -67,12 +182,7 @@ class AntiFraudeAgente:
             
         def verificar_com_cliente(id_duplicata: str) -> str:
             try:
-                query = """
-                SELECT label_fraude, nome_cedente 
-                FROM duplicatas WHERE id_duplicata = ?
-                """
-
-                resultado = self.conn.execute(query, [id_duplicata]).fetchone()
+                resultado = self._buscar_verdade(id_duplicata)
 
                 if not resultado:
                     return "ERRO: Cliente não encontrado para este ID de duplicata."
@@ -98,12 +208,12 @@ class AntiFraudeAgente:
         return [
             Tool(
                 name="consultar_entidade",
-                func=consultar_entidade,
+                func=cronometrar_funcao("pylastro_agente_tool_segundos", tool="consultar_entidade")(consultar_entidade),
                 description="Consulta uma API pública para validar dados cadastrais de uma instituição financeira ou empresa. Use esta tool quando tiver dúvidas sobre a classificação da entidade (ex: se é Banco, Factoring, etc). Retorna JSON string ou 'NO_DATA'."
             ),
             Tool(
                 name="verificar_com_cliente",
-                func=verificar_com_cliente,
+                func=cronometrar_funcao("pylastro_agente_tool_segundos", tool="verificar_com_cliente")(verificar_com_cliente),
                 description="Simula o contato com o cliente para confirmar a veracidade da duplicata. Consulta a base de fatos (DuckDB) para simular a resposta correta do cliente. Retorna a mensagem do cliente. Input: id_duplicata (string)"
             )
         ]
@@ -115,9 +225,29 @@ class AntiFraudeAgente:
         """Cria o grafo de execução do agente usando LangGraph"""
         
         # Define a função que chama o LLM
-        def call_model(state: AgentState):
+        def call_model(state: AgentState, config: RunnableConfig):
+            # Interrompe antes de gastar uma nova chamada se o cliente desistiu
+            cancelamento = config.get("configurable", {}).get("cancelamento")
+            if cancelamento is not None and cancelamento.is_set():
+                raise InvestigacaoCancelada()
+
             messages = state["messages"]
-            response = self.llm_with_tools.invoke(messages)
+
+            # Estimativa para o balde de tokens (~4 caracteres por token)
+            tokens_estimados = sum(len(str(m.content)) for m in messages) // 4
+            with metricas.cronometrar("pylastro_agente_no_segundos", no="agent"):
+                response = controlador_llm.executar(
+                    lambda: self.llm_with_tools.invoke(messages),
+                    tokens_estimados=tokens_estimados
+                )
+
+            # Contabiliza tokens da chamada a partir do metadata da resposta
+            uso = getattr(response, "usage_metadata", None) or {}
+            contador_tokens.registrar(
+                config.get("configurable", {}).get("rota") or "desconhecida",
+                uso.get("input_tokens", 0),
+                uso.get("output_tokens", 0)
+            )
             return {"messages": [response]}
         
         # Define quando continuar ou parar
@@ -135,9 +265,16 @@ class AntiFraudeAgente:
         # Cria o grafo
         workflow = StateGraph(AgentState)
         
+        # Nó das tools, cronometrado como um todo (cada tool também mede a sua duração)
+        tool_node = ToolNode(self.tools)
+
+        def call_tools(state: AgentState, config: RunnableConfig):
+            with metricas.cronometrar("pylastro_agente_no_segundos", no="tools"):
+                return tool_node.invoke(state, config)
+
         # Adiciona os nós
         workflow.add_node("agent", call_model)
-        workflow.add_node("tools", ToolNode(self.tools))
+        workflow.add_node("tools", call_tools if metricas.habilitado else tool_node)
         
         # Define o ponto de entrada
         workflow.set_entry_point("agent")
@@ -161,58 +298,24 @@ class AntiFraudeAgente:
     # --------------------------------------
     # ANALISAR CASO (COM VERIFICAÇÃO ATIVA)
     # --------------------------------------
-    def analisar_caso(self, evento_bi: Dict) -> Dict:
-        evento_str = json.dumps(evento_bi, indent=2, ensure_ascii=False)
-
-        prompt_sistema = f"""
-        Você é um Auditor Sênior de Riscos e Agente Antifraude.
-
-        OBJETIVO:
-        Analisar o evento de duplicata abaixo, verificar a veracidade da transação com o cliente (simulado) e emitir um veredito.
-
-        DADOS DO EVENTO:
-        {evento_str}
-
-        SEU PROTOCOLO DE AÇÃO (Rigoroso):
-
-        1. ANÁLISE INICIAL: 
-        Analise os dados. O erro parece ser cadastral (Entidade) ou operacional?
-
-        2. CONSULTA DE ENTIDADE (Opcional):
-        Se houver dúvida sobre quem é o sacado/cedente (ex: CNAE incompatível), use a tool `consultar_entidade`.
-
-        3. VERIFICAÇÃO COM CLIENTE (OBRIGATÓRIO SE HOUVER SUSPEITA - O*NET Req 7):
-        Se a duplicata for classificada como POSSÍVEL_FRAUDE ou SUSPEITA:
-        - CHAME a tool `verificar_com_cliente` passando o `id_duplicata`.
-        - A tool irá consultar a "base de verdade" (DuckDB) e retornar a resposta do cliente.
-
-        4. VEREDITO FINAL:
-        - Se o cliente responder confirmando a emissão -> Classifique como "FALSO_POSITIVO".
-        - Se o cliente responder desconhecendo a dívida -> Classifique como "FRAUDE_CONFIRMADA".
-        - Se não houve necessidade de contato -> Classifique conforme análise técnica.
-
-        FORMATO DE RESPOSTA ESPERADO (Retorne APENAS este JSON válido, sem markdown):
-        {{
-            "id_duplicata": "copie do evento",
-            "veredito_final": "FRAUDE_CONFIRMADA" | "FALSO_POSITIVO" | "LEGITIMO" | "EM_ANALISE",
-            "causa_raiz": "ENTIDADE" | "OPERACIONAL" | "GOLPE_EXTERNO",
-            "passo_a_passo": {{
-                "analise_entidade": "O que você analisou sobre a empresa...",
-                "contato_cliente_realizado": true | false,
-                "resposta_cliente": "Resumo do que a tool retornou (se houve contato)"
-            }},
-            "acao_recomendada": "BLOQUEAR" | "LIBERAR" | "AGUARDAR",
-            "justificativa_tecnica": "Explicação completa baseada nas tools chamadas."
-        }}
-        """
+    def analisar_caso(
+        self,
+        evento_bi: Dict,
+        cancelamento: threading.Event | None = None,
+        rota: str = "desconhecida"
+    ) -> Dict:
+        mensagem_evento = montar_mensagem_evento(evento_bi)
 
         try:
             # Executa o grafo
             initial_state = {
-                "messages": [HumanMessage(content=prompt_sistema)]
+                "messages": [SystemMessage(content=PROTOCOLO_ANTIFRAUDE), mensagem_evento]
             }
             
-            result = self.graph.invoke(initial_state)
+            result = self.graph.invoke(
+                initial_state,
+                config={"configurable": {"cancelamento": cancelamento, "rota": rota}}
+            )
             
             # Pega a última mensagem do agente
             final_message = result["messages"][-1]
@@ -235,6 +338,16 @@ class AntiFraudeAgente:
             
             return json.loads(output_text)
             
+        except InvestigacaoCancelada:
+            return {
+                "detail": "Investigação cancelada antes da conclusão",
+                "status": "CANCELADO"
+            }
+        except ProvedorIndisponivel as e:
+            return {
+                "detail": str(e),
+                "status": "PROVEDOR_INDISPONIVEL"
+            }
         except json.JSONDecodeError as e:
             return {
                 "detail": "Falha no parse do JSON gerado pelo Agente", 
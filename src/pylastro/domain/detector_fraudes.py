@@ -3,6 +3,8 @@ import numpy as np
 from datetime import datetime, timedelta
 from scipy import stats
 
+from ..core.config import BANCOS_KEYWORDS
+
 class DetectorFraudeRatios:
     """
     Sistema de detecção de fraudes em duplicatas usando ratios financeiros.
@@ -21,12 +23,19 @@ class DetectorFraudeRatios:
         self.resultados = None
 
         
-    def calcular_ratios_financeiros(self):
+    def calcular_ratios_financeiros(self, referencia: dict = None):
         """
         RATIO 1: Liquidez Implícita (Valor/Prazo)
         - Indica a "velocidade" do dinheiro
         - Valores muito altos = urgência suspeita
         - Valores muito baixos = alongamento suspeito
+
+        Args:
+            referencia: Estatísticas da base para pontuar um lote novo sem
+                recalcular sobre a tabela inteira (DuckDBManager.estatisticas_valor):
+                'setores' (mean/std de valor por setor), 'valor_p75' e
+                'chaves' (ocorrências de cada chave_nfe na base). Sem ela, as
+                estatísticas saem do próprio DataFrame.
         """
         self.df['ratio_liquidez'] = self.df['valor'] / np.maximum(self.df['prazo_dias'], 1)
         
@@ -42,9 +51,14 @@ class DetectorFraudeRatios:
         - Compara valor com média do setor
         - Z-score alto = valor anômalo
         """
-        sector_stats = self.df.groupby('setor_cedente')['valor'].agg(['mean', 'std'])
-        self.df['valor_medio_setor'] = self.df['setor_cedente'].map(sector_stats['mean'])
-        self.df['valor_std_setor'] = self.df['setor_cedente'].map(sector_stats['std'])
+        if referencia is None:
+            sector_stats = self.df.groupby('setor_cedente')['valor'].agg(['mean', 'std'])
+        else:
+            sector_stats = referencia['setores']
+        # Setor sem referência (nunca visto): sem base de comparação, z-score 0.
+        # Setor com uma única duplicata: desvio indefinido (NaN), usa 1
+        self.df['valor_medio_setor'] = self.df['setor_cedente'].map(sector_stats['mean']).fillna(self.df['valor'])
+        self.df['valor_std_setor'] = self.df['setor_cedente'].map(sector_stats['std']).fillna(1)
         self.df['zscore_valor'] = (
             (self.df['valor'] - self.df['valor_medio_setor']) / 
             np.maximum(self.df['valor_std_setor'], 1)
@@ -54,7 +68,7 @@ class DetectorFraudeRatios:
         RATIO 4: Frequência de Duplicidade (mesma chave_nfe)
         - Se chave_nfe aparece > 1 vez = possível double spending
         """
-        chave_counts = self.df['chave_nfe'].value_counts()
+        chave_counts = self.df['chave_nfe'].value_counts() if referencia is None else referencia['chaves']
         self.df['freq_chave_nfe'] = self.df['chave_nfe'].map(chave_counts)
         
         """
@@ -93,12 +107,11 @@ class DetectorFraudeRatios:
         RATIO 8: Endosso Não-Bancário
         - Se endossatário não é nulo e não é banco
         """
-        bancos_keywords = ['Banco', 'S.A.', 'Unibanco', 'Bradesco', 'Itaú', 'Santander', 'BTG']
         self.df['endosso_suspeito'] = self.df['endossatario'].notna()
         # Remove bancos legítimos
-        for keyword in bancos_keywords:
+        for keyword in BANCOS_KEYWORDS:
             self.df.loc[
-                self.df['endossatario'].str.contains(keyword, case=False, na=False),
+                self.df['endossatario'].str.contains(keyword, case=False, na=False, regex=False),
                 'endosso_suspeito'
             ] = False
         self.df['endosso_suspeito'] = self.df['endosso_suspeito'].astype(int)
@@ -115,14 +128,81 @@ class DetectorFraudeRatios:
         RATIO 10: Mesmo Estado Cedente/Sacado + Valor Alto
         - Pode indicar operação circular
         """
-        threshold_alto = self.df['valor'].quantile(0.75)
+        threshold_alto = self.df['valor'].quantile(0.75) if referencia is None else referencia['valor_p75']
 
         self.df['mesmo_estado_valor_alto'] = (
             (self.df['mesmo_estado'] == 1) & 
             (self.df['valor'] > threshold_alto)
         ).astype(int)
         return self.df
-    
+
+    # Limiares das features de entidade (histórico mínimo para o perfil valer)
+    MIN_HISTORICO_CEDENTE = 10
+    LIMIAR_SEM_ACEITE_CEDENTE = 0.3
+    LIMIAR_ENDOSSO_NAO_BANCARIO_CEDENTE = 0.25
+    LIMIAR_CONCENTRACAO_PAR = 0.8
+
+    def calcular_ratios_entidades(self, perfis: dict = None):
+        """
+        Contexto de entidade: histórico do cedente, do sacado e do par.
+        Deve rodar depois de calcular_ratios_financeiros.
+
+        Args:
+            perfis: Perfis das tabelas perfil_* (DuckDBManager.perfis_entidades):
+                'cedentes', 'sacados' e 'pares', só das entidades do DataFrame.
+                Sem eles, os perfis saem do próprio DataFrame (tabela inteira).
+        """
+        if perfis is None:
+            perfis = {
+                "cedentes": self.df.groupby('id_cedente').agg(
+                    qtd_duplicatas=('id_duplicata', 'size'),
+                    qtd_sem_aceite=('sem_aceite', 'sum'),
+                    qtd_endosso_nao_bancario=('endosso_suspeito', 'sum'),
+                    qtd_sacados=('id_sacado', 'nunique'),
+                    qtd_endossatarios=('endossatario', 'nunique')
+                ),
+                "sacados": self.df.groupby('id_sacado').agg(qtd_cedentes=('id_cedente', 'nunique')),
+                "pares": self.df.groupby(['id_cedente', 'id_sacado']).agg(qtd_duplicatas=('id_duplicata', 'size'))
+            }
+        cedentes, sacados, pares = perfis["cedentes"], perfis["sacados"], perfis["pares"]
+
+        """
+        RATIO 11: Histórico do Cedente
+        - Volume, fração sem aceite e fração de endossos não bancários
+        - Diversidade de sacados e de endossatários
+        """
+        self.df['cedente_qtd_duplicatas'] = self.df['id_cedente'].map(cedentes['qtd_duplicatas']).fillna(0)
+        volume = np.maximum(self.df['cedente_qtd_duplicatas'], 1)
+        self.df['cedente_taxa_sem_aceite'] = self.df['id_cedente'].map(cedentes['qtd_sem_aceite']).fillna(0) / volume
+        self.df['cedente_taxa_endosso_nao_bancario'] = (
+            self.df['id_cedente'].map(cedentes['qtd_endosso_nao_bancario']).fillna(0) / volume
+        )
+        self.df['cedente_qtd_sacados'] = self.df['id_cedente'].map(cedentes['qtd_sacados']).fillna(0)
+        self.df['cedente_qtd_endossatarios'] = self.df['id_cedente'].map(cedentes['qtd_endossatarios']).fillna(0)
+        self.df['sacado_qtd_cedentes'] = self.df['id_sacado'].map(sacados['qtd_cedentes']).fillna(0)
+
+        self.df['historico_cedente_suspeito'] = (
+            (self.df['cedente_qtd_duplicatas'] >= self.MIN_HISTORICO_CEDENTE) &
+            (
+                (self.df['cedente_taxa_sem_aceite'] >= self.LIMIAR_SEM_ACEITE_CEDENTE) |
+                (self.df['cedente_taxa_endosso_nao_bancario'] >= self.LIMIAR_ENDOSSO_NAO_BANCARIO_CEDENTE)
+            )
+        ).astype(int)
+
+        """
+        RATIO 12: Concentração do Par (Cedente, Sacado)
+        - Fração das duplicatas do cedente emitidas contra este sacado
+        - Quase tudo contra um único sacado = possível conluio
+        """
+        chaves_par = pd.MultiIndex.from_frame(self.df[['id_cedente', 'id_sacado']])
+        qtd_par = pares['qtd_duplicatas'].reindex(chaves_par).fillna(0).to_numpy()
+        self.df['par_concentracao'] = qtd_par / volume
+        self.df['par_concentrado'] = (
+            (self.df['cedente_qtd_duplicatas'] >= self.MIN_HISTORICO_CEDENTE) &
+            (self.df['par_concentracao'] >= self.LIMIAR_CONCENTRACAO_PAR)
+        ).astype(int)
+        return self.df
+
     def calcular_risk_score(self):
         """
         Risk Score Final: Soma ponderada dos ratios
@@ -133,6 +213,8 @@ class DetectorFraudeRatios:
         - CNPJ circular (peso 2.0) = grave
         - Valor anômalo (peso 1.5) = médio-grave
         - Demais (peso 1.0) = moderado
+        - Com calcular_ratios_entidades: histórico do cedente (peso 1.5) e
+          concentração do par (peso 1.0)
         """
         pesos = {
             'freq_chave_nfe': 3.0,      # Duplicidade
@@ -164,6 +246,12 @@ class DetectorFraudeRatios:
             pesos['vencida'] * self.df['vencida'] +
             pesos['mesmo_estado_valor_alto'] * self.df['mesmo_estado_valor_alto']
         )
+
+        if 'historico_cedente_suspeito' in self.df.columns:
+            self.df['risk_score'] += (
+                1.5 * self.df['historico_cedente_suspeito'] +
+                1.0 * self.df['par_concentrado']
+            )
         
         # Classifica risco
         self.df['classificacao_risco'] = pd.cut(
@@ -180,7 +268,13 @@ class DetectorFraudeRatios:
         """
         # Ordena por risk_score
         suspeitos = self.df.nlargest(top_n, 'risk_score')
-        
+        return self.montar_relatorio(suspeitos)
+
+    def montar_relatorio(self, suspeitos: pd.DataFrame):
+        """
+        Monta o relatório (motivos + dados cadastrais) para um subconjunto
+        já pontuado de self.df
+        """
         relatorio = []
         for idx, row in suspeitos.iterrows():
             motivos = []
@@ -211,6 +305,16 @@ class DetectorFraudeRatios:
             
             if row['mesmo_estado_valor_alto']:
                 motivos.append(f"🔄 Mesma UF ({row['estado_cedente']}) com valor alto: R$ {row['valor']:,.2f}")
+
+            if row.get('historico_cedente_suspeito'):
+                motivos.append(
+                    f"📉 Histórico do cedente: {row['cedente_taxa_sem_aceite']:.0%} sem aceite e "
+                    f"{row['cedente_taxa_endosso_nao_bancario']:.0%} com endosso não-bancário "
+                    f"em {int(row['cedente_qtd_duplicatas'])} duplicatas"
+                )
+
+            if row.get('par_concentrado'):
+                motivos.append(f"🔗 {row['par_concentracao']:.0%} das duplicatas do cedente são contra este sacado")
             
             relatorio.append({
                 'id_duplicata': row['id_duplicata'],
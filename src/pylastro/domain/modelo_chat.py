@@ -0,0 +1,51 @@
+from ..core.config import (
+    LLM_BACKEND,
+    LLM_FAKE_LATENCIA_MS,
+    LLM_FAKE_JITTER_MS,
+    LLM_FAKE_DISTRIBUICAO,
+    LLM_FAKE_FALHAS,
+    LLM_FAKE_SEED,
+)
+
+
+def _parse_falhas(texto: str) -> dict:
+    """Converte 'throttle=0.02,erro=0.01' em {'throttle': 0.02, 'erro': 0.01}"""
+    falhas = {}
+    for parte in texto.split(","):
+        if "=" not in parte:
+            continue
+        tipo, prob = parte.split("=", 1)
+        falhas[tipo.strip()] = float(prob)
+    return falhas
+
+
+def criar_modelo_chat(backend: str | None = None, google_model: str = "gemini-2.5-flash"):
+    """
+    Cria o modelo de chat usado pelo AntiFraudeAgente.
+
+    Backends:
+    - gemini: ChatGoogleGenerativeAI (produção, requer GOOGLE_API_KEY)
+    - fake: ModeloChatFake, local e determinístico (benchmark, CI, ambientes sem rede)
+    """
+    backend = (backend or LLM_BACKEND).lower()
+
+    if backend == "gemini":
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
+        return ChatGoogleGenerativeAI(
+            model=google_model,
+            temperature=0.2,
+        )
+
+    if backend == "fake":
+        from .modelo_chat_fake import ModeloChatFake
+
+        return ModeloChatFake(
+            latencia_ms=LLM_FAKE_LATENCIA_MS,
+            jitter_ms=LLM_FAKE_JITTER_MS,
+            distribuicao=LLM_FAKE_DISTRIBUICAO,
+            falhas=_parse_falhas(LLM_FAKE_FALHAS),
+            seed=LLM_FAKE_SEED,
+        )
+
+    raise ValueError(f"Backend de LLM desconhecido: {backend}")
@@ -0,0 +1,208 @@
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from typing import List, Optional
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+
+class ErroModeloSimulado(Exception):
+    """Falha injetada pelo modelo fake (imita os erros HTTP do provedor)"""
+
+    def __init__(self, mensagem: str, status_code: int):
+        super().__init__(mensagem)
+        self.status_code = status_code
+
+
+class ModeloChatFake:
+    """
+    Substituto local e determinístico do Gemini para benchmark e testes de carga.
+
+    Segue o mesmo protocolo esperado do agente:
+    1. Primeiro turno: emite tool calls (`verificar_com_cliente` e, se houver
+       endossatário, `consultar_entidade`)
+    2. Após as respostas das tools: emite o JSON de veredito final
+
+    A aleatoriedade (latência e falhas) é derivada de (seed, id_duplicata, turno, tentativa),
+    portanto o mesmo caso produz sempre a mesma sequência, independente da ordem
+    ou da concorrência das investigações. A tentativa conta só as falhas
+    seguidas do turno: zera quando o turno responde, então investigar o mesmo
+    caso de novo repete o resultado.
+    """
+
+    def __init__(
+        self,
+        latencia_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        distribuicao: str = "uniforme",
+        falhas: Optional[dict] = None,
+        seed: int = 42,
+    ):
+        """
+        Args:
+            latencia_ms: Latência média por chamada
+            jitter_ms: Dispersão da latência (amplitude na uniforme, desvio na lognormal)
+            distribuicao: 'fixa', 'uniforme' ou 'lognormal'
+            falhas: Probabilidade por tipo de falha: 'throttle' (429), 'erro' (503)
+                    e 'json_invalido' (veredito fora do formato)
+            seed: Semente base da aleatoriedade
+        """
+        self.latencia_ms = latencia_ms
+        self.jitter_ms = jitter_ms
+        self.distribuicao = distribuicao
+        self.falhas = falhas or {}
+        self.seed = seed
+        self.ferramentas: List[str] = []
+
+        # Nova tentativa do mesmo turno sorteia de novo (senão a falha se repetiria sempre);
+        # só guarda os turnos que estão falhando agora
+        self._tentativas = Counter()
+        self._lock = threading.Lock()
+
+    def bind_tools(self, tools, **kwargs):
+        """Retorna uma cópia do modelo que conhece as tools disponíveis"""
+        vinculado = ModeloChatFake(
+            latencia_ms=self.latencia_ms,
+            jitter_ms=self.jitter_ms,
+            distribuicao=self.distribuicao,
+            falhas=self.falhas,
+            seed=self.seed,
+        )
+        vinculado.ferramentas = [t.name for t in tools]
+        return vinculado
+
+    # --------------------------------------
+    # ALEATORIEDADE DETERMINÍSTICA
+    # --------------------------------------
+    def _sortear_latencia(self, rng: random.Random) -> float:
+        if self.distribuicao == "fixa" or self.jitter_ms <= 0:
+            return self.latencia_ms
+
+        if self.distribuicao == "lognormal" and self.latencia_ms > 0:
+            sigma = math.sqrt(math.log(1 + (self.jitter_ms / self.latencia_ms) ** 2))
+            mu = math.log(self.latencia_ms) - sigma ** 2 / 2
+            return rng.lognormvariate(mu, sigma)
+
+        return max(0.0, rng.uniform(self.latencia_ms - self.jitter_ms, self.latencia_ms + self.jitter_ms))
+
+    def _sortear_falha(self, rng: random.Random) -> Optional[str]:
+        sorteio = rng.random()
+        acumulado = 0.0
+        for tipo, prob in self.falhas.items():
+            acumulado += prob
+            if sorteio < acumulado:
+                return tipo
+        return None
+
+    # --------------------------------------
+    # EXTRAÇÃO DO EVENTO
+    # --------------------------------------
+    @staticmethod
+    def _texto(message) -> str:
+        content = message.content
+        if isinstance(content, list):
+            return "\n".join(
+                x.get("text", str(x)) if isinstance(x, dict) else str(x)
+                for x in content
+            )
+        return content or ""
+
+    @staticmethod
+    def _extrair_campo(texto: str, campo: str) -> Optional[str]:
+        match = re.search(rf'"{campo}"\s*:\s*"([^"]+)"', texto)
+        return match.group(1) if match else None
+
+    # --------------------------------------
+    # ROTEIRO
+    # --------------------------------------
+    def _veredito(self, id_duplicata: str, respostas: List[ToolMessage]) -> dict:
+        resposta_cliente = next(
+            (self._texto(r) for r in respostas if r.name == "verificar_com_cliente"),
+            ""
+        )
+
+        if "desconhecemos" in resposta_cliente:
+            veredito, causa, acao = "FRAUDE_CONFIRMADA", "GOLPE_EXTERNO", "BLOQUEAR"
+        elif "Confirmamos" in resposta_cliente:
+            veredito, causa, acao = "FALSO_POSITIVO", "OPERACIONAL", "LIBERAR"
+        else:
+            veredito, causa, acao = "EM_ANALISE", "OPERACIONAL", "AGUARDAR"
+
+        return {
+            "id_duplicata": id_duplicata,
+            "veredito_final": veredito,
+            "causa_raiz": causa,
+            "passo_a_passo": {
+                "analise_entidade": "Análise simulada pelo modelo fake.",
+                "contato_cliente_realizado": bool(resposta_cliente),
+                "resposta_cliente": resposta_cliente.strip()
+            },
+            "acao_recomendada": acao,
+            "justificativa_tecnica": "Veredito roteirizado pelo ModeloChatFake a partir das tools."
+        }
+
+    def invoke(self, messages, config=None, **kwargs) -> AIMessage:
+        texto_evento = "\n".join(self._texto(m) for m in messages if isinstance(m, HumanMessage))
+        id_duplicata = self._extrair_campo(texto_evento, "id_duplicata") or "desconhecido"
+        endossatario = self._extrair_campo(texto_evento, "endossatario")
+        turno = sum(1 for m in messages if isinstance(m, AIMessage))
+
+        with self._lock:
+            tentativa = self._tentativas[(id_duplicata, turno)]
+            self._tentativas[(id_duplicata, turno)] += 1
+
+        rng = random.Random(f"{self.seed}:{id_duplicata}:{turno}:{tentativa}")
+        time.sleep(self._sortear_latencia(rng) / 1000)
+
+        falha = self._sortear_falha(rng)
+        if falha == "throttle":
+            raise ErroModeloSimulado("429 RESOURCE_EXHAUSTED (simulado)", status_code=429)
+        if falha == "erro":
+            raise ErroModeloSimulado("503 UNAVAILABLE (simulado)", status_code=503)
+
+        with self._lock:
+            del self._tentativas[(id_duplicata, turno)]
+
+        respostas = [m for m in messages if isinstance(m, ToolMessage)]
+        tamanho_entrada = sum(len(self._texto(m)) for m in messages)
+
+        if not respostas and "verificar_com_cliente" in self.ferramentas:
+            tool_calls = [{
+                "name": "verificar_com_cliente",
+                "args": {"__arg1": id_duplicata},
+                "id": f"fake-{id_duplicata}-{turno}-0",
+                "type": "tool_call"
+            }]
+            if endossatario and "consultar_entidade" in self.ferramentas:
+                tool_calls.append({
+                    "name": "consultar_entidade",
+                    "args": {"__arg1": endossatario},
+                    "id": f"fake-{id_duplicata}-{turno}-1",
+                    "type": "tool_call"
+                })
+            return self._mensagem("", tamanho_entrada, tool_calls=tool_calls)
+
+        if falha == "json_invalido":
+            return self._mensagem("Não consegui concluir a análise.", tamanho_entrada)
+
+        conteudo = json.dumps(self._veredito(id_duplicata, respostas), ensure_ascii=False)
+        return self._mensagem(conteudo, tamanho_entrada)
+
+    @staticmethod
+    def _mensagem(conteudo: str, tamanho_entrada: int, tool_calls=None) -> AIMessage:
+        # Estimativa grosseira de tokens (~4 caracteres por token)
+        tokens_entrada = tamanho_entrada // 4
+        tokens_saida = max(1, len(conteudo) // 4)
+        return AIMessage(
+            content=conteudo,
+            tool_calls=tool_calls or [],
+            usage_metadata={
+                "input_tokens": tokens_entrada,
+                "output_tokens": tokens_saida,
+                "total_tokens": tokens_entrada + tokens_saida
+            }
+        )
@@ -0,0 +1,183 @@
+import math
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..core.dependencies import get_db_manager
+
+
+# Cadastro inicial (semente da tabela `instituicoes`)
+ENTIDADES_PADRAO = [
+    {"nome_exato": "Consultoria e Gestão Empresarial Ltda", "tipo_instituicao": "Empresa de consultoria"},
+    {"nome_exato": "M.S. Apoio Administrativo", "tipo_instituicao": "Empresa de serviços administrativos"},
+    {"nome_exato": "João da Silva - CPF 123.456.789-00", "tipo_instituicao": "Pessoa física"},
+    {"nome_exato": "Padaria e Confeitaria do Bairro", "tipo_instituicao": "Estabelecimento comercial (padaria)"},
+    {"nome_exato": "Holding Patrimonial X", "tipo_instituicao": "Holding patrimonial"},
+    {"nome_exato": "Associação de Moradores da Vila", "tipo_instituicao": "Associação civil"},
+    {"nome_exato": "Lava Jato Rápido ME", "tipo_instituicao": "Microempresa (serviços de lavagem automotiva)"},
+    {"nome_exato": "Maria Oliveira - CPF 987.654.321-00", "tipo_instituicao": "Pessoa física"},
+    {"nome_exato": "J.P. Consultoria Individual", "tipo_instituicao": "Empresa de consultoria individual"},
+    {"nome_exato": "Bar e Mercearia Central", "tipo_instituicao": "Comércio varejista"},
+    {"nome_exato": "Banco do Brasil S.A.", "tipo_instituicao": "Instituição financeira (banco comercial)"},
+    {"nome_exato": "Itaú Unibanco S.A.", "tipo_instituicao": "Instituição financeira (banco comercial)"},
+    {"nome_exato": "Bradesco S.A.", "tipo_instituicao": "Instituição financeira (banco comercial)"},
+    {"nome_exato": "Santander Brasil S.A.", "tipo_instituicao": "Instituição financeira (banco comercial)"},
+    {"nome_exato": "Caixa Econômica Federal", "tipo_instituicao": "Instituição financeira (banco estatal)"},
+    {"nome_exato": "BTG Pactual S.A.", "tipo_instituicao": "Instituição financeira (banco de investimentos)"},
+    {"nome_exato": "Safra S.A.", "tipo_instituicao": "Instituição financeira (banco comercial)"},
+    {"nome_exato": "Banco Inter S.A.", "tipo_instituicao": "Instituição financeira (banco digital)"},
+]
+
+_NAO_ALFANUMERICO = re.compile(r"[^a-z0-9]+")
+
+
+def normalizar_nome(nome: str) -> str:
+    """
+    Forma canônica para comparação: sem acentos, minúsculas, pontuação
+    removida e espaços colapsados.
+    Ex: "Itaú Unibanco S.A." e "ITAU UNIBANCO SA" -> "itau unibanco sa"
+    """
+    sem_acento = unicodedata.normalize("NFKD", nome).encode("ascii", "ignore").decode()
+    # Pontos somem sem virar espaço (S.A. -> sa, M.S. -> ms)
+    texto = sem_acento.lower().replace(".", "")
+    return _NAO_ALFANUMERICO.sub(" ", texto).strip()
+
+
+def trigramas(nome_normalizado: str) -> frozenset:
+    texto = f"  {nome_normalizado} "
+    return frozenset(texto[i:i + 3] for i in range(len(texto) - 2))
+
+
+class RegistroInstituicoes:
+    """
+    Cadastro de instituições carregado uma vez em memória.
+
+    - Busca exata por nome normalizado: dicionário (O(1))
+    - Busca aproximada: índice invertido de trigramas com similaridade de Dice.
+      As coincidências com a consulta são contadas para todos os nomes de uma
+      vez (numpy), lendo em cada lista do índice, ordenada pelo número de
+      trigramas do nome, só a faixa de tamanhos compatível com o limiar
+      (length filtering). A contagem é exata: nenhum nome acima do limiar é
+      perdido, e um nome que só coincide em "banco" e "s.a." fica abaixo dele.
+    """
+
+    def __init__(self, entidades: List[dict]):
+        self.entidades: List[dict] = []
+        self._por_nome: Dict[str, int] = {}
+        self._trigramas: List[frozenset] = []
+
+        indice: Dict[str, List[int]] = defaultdict(list)
+        for entidade in entidades:
+            self._adicionar(entidade, indice)
+
+        # Listas do índice em arrays ordenados pelo tamanho do nome (tamanhos ao lado, para a busca binária)
+        self._tamanho = np.array([len(grams) for grams in self._trigramas], dtype=np.int32)
+        self._postagens: Dict[str, np.ndarray] = {}
+        self._tamanhos_postagem: Dict[str, np.ndarray] = {}
+        for gram, posicoes in indice.items():
+            postagem = np.array(posicoes, dtype=np.int32)
+            postagem = postagem[np.argsort(self._tamanho[postagem], kind="stable")]
+            self._postagens[gram] = postagem
+            self._tamanhos_postagem[gram] = self._tamanho[postagem]
+
+    def _adicionar(self, entidade: dict, indice: Dict[str, List[int]]):
+        normalizado = normalizar_nome(entidade["nome_exato"])
+        if not normalizado or normalizado in self._por_nome:
+            return
+
+        posicao = len(self.entidades)
+        self.entidades.append(entidade)
+        self._por_nome[normalizado] = posicao
+
+        grams = trigramas(normalizado)
+        self._trigramas.append(grams)
+        for gram in grams:
+            indice[gram].append(posicao)
+
+    def __len__(self):
+        return len(self.entidades)
+
+    def buscar(self, nome: str, similaridade_minima: float = 0.6, max_resultados: int = 5) -> List[dict]:
+        """
+        Retorna as entidades que correspondem a `nome`, da mais para a menos similar.
+        Cada item traz `similaridade` (1.0 = nome normalizado idêntico).
+        """
+        normalizado = normalizar_nome(nome)
+        if not normalizado:
+            return []
+
+        exata = self._por_nome.get(normalizado)
+        if exata is not None:
+            return [{**self.entidades[exata], "similaridade": 1.0}]
+
+        consulta = trigramas(normalizado)
+        q = len(consulta)
+
+        # Dice >= s exige ao menos ceil(s * q / (2 - s)) trigramas em comum
+        minimo = max(1, math.ceil(similaridade_minima * q / (2 - similaridade_minima)))
+        presentes = [g for g in consulta if g in self._postagens]
+        if len(presentes) < minimo:
+            return []
+
+        # ... e limita o tamanho do candidato: s * q / (2 - s) <= b <= (2 - s) * q / s
+        tamanho_min = math.ceil(similaridade_minima * q / (2 - similaridade_minima) - 1e-9)
+        tamanho_max = math.floor((2 - similaridade_minima) * q / similaridade_minima + 1e-9) if similaridade_minima > 0 else math.inf
+
+        # Coincidências por nome (cada lista do índice tem o nome no máximo uma vez)
+        coincidencias = np.zeros(len(self.entidades), dtype=np.int32)
+        for gram in presentes:
+            tamanhos = self._tamanhos_postagem[gram]
+            inicio = np.searchsorted(tamanhos, tamanho_min, side="left")
+            fim = np.searchsorted(tamanhos, tamanho_max, side="right")
+            coincidencias[self._postagens[gram][inicio:fim]] += 1
+
+        candidatos = np.flatnonzero(coincidencias >= minimo)
+        dice = 2 * coincidencias[candidatos] / (q + self._tamanho[candidatos])
+        acima = dice >= similaridade_minima
+        pontuados = sorted(zip(dice[acima].tolist(), candidatos[acima].tolist()), key=lambda item: (-item[0], item[1]))
+        return [
+            {**self.entidades[posicao], "similaridade": round(dice, 3)}
+            for dice, posicao in pontuados[:max_resultados]
+        ]
+
+    def buscar_lote(self, nomes: List[str], similaridade_minima: float = 0.6, max_resultados: int = 5) -> Dict[str, List[dict]]:
+        return {nome: self.buscar(nome, similaridade_minima, max_resultados) for nome in nomes}
+
+
+_registro: Optional[RegistroInstituicoes] = None
+_registro_lock = threading.Lock()
+
+
+def get_registro_instituicoes() -> RegistroInstituicoes:
+    """
+    Instância única por processo, carregada da tabela `instituicoes`
+    (criada e semeada com ENTIDADES_PADRAO na primeira execução).
+    Sem banco disponível, usa a lista padrão em memória.
+    """
+    global _registro
+    if _registro is None:
+        with _registro_lock:
+            if _registro is None:
+                try:
+                    db_manager = get_db_manager()
+                    db_manager.criar_tabela_instituicoes(ENTIDADES_PADRAO)
+                    entidades = db_manager.carregar_instituicoes()
+                except Exception as e:
+                    print(f"⚠️ Cadastro de instituições indisponível no banco ({e}), usando lista padrão")
+                    entidades = ENTIDADES_PADRAO
+
+                _registro = RegistroInstituicoes(entidades)
+                print(f"🏦 Cadastro de instituições carregado ({len(_registro)} entidades)")
+    return _registro
+
+
+def recarregar_registro_instituicoes() -> RegistroInstituicoes:
+    """Descarta o índice em memória e relê a tabela"""
+    global _registro
+    with _registro_lock:
+        _registro = None
+    return get_registro_instituicoes()
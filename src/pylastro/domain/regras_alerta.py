@@ -0,0 +1,93 @@
+from typing import Callable, List
+
+import pandas as pd
+
+from ..core.config import ALERTAS_CLASSIFICACAO_MINIMA, ALERTAS_ENDOSSO_VALOR_MIN
+
+# Ordem de gravidade das classificações do DetectorFraudeRatios
+ORDEM_CLASSIFICACAO = ["BAIXO", "MODERADO", "ALTO", "CRÍTICO"]
+
+COLUNAS_ALERTA = [
+    "id_alerta", "regra", "severidade", "id_duplicata", "chave_nfe", "id_cedente",
+    "valor", "risk_score", "classificacao", "detalhe",
+]
+
+
+class RegraAlerta:
+    """
+    Condição avaliada sobre as linhas já pontuadas de um lote.
+
+    - `condicao(df)` devolve a máscara das linhas que disparam a regra
+    - `chave_dedup` é a coluna que identifica o alerta: a mesma regra não
+      alerta duas vezes a mesma chave (ex: uma chave_nfe repetida gera um
+      alerta, não um por cópia)
+    - `severidade` é fixa (str) ou calculada por linha (função do df)
+    """
+
+    def __init__(self, nome: str, condicao: Callable, detalhe: Callable, severidade, chave_dedup: str = "id_duplicata"):
+        self.nome = nome
+        self.condicao = condicao
+        self.detalhe = detalhe
+        self.severidade = severidade
+        self.chave_dedup = chave_dedup
+
+    def avaliar(self, df: pd.DataFrame) -> pd.DataFrame:
+        disparos = df[self.condicao(df)]
+        if disparos.empty:
+            return pd.DataFrame(columns=COLUNAS_ALERTA)
+
+        # Uma linha por chave dentro do lote; entre lotes, a PK de `alertas` deduplica
+        disparos = disparos.drop_duplicates(subset=self.chave_dedup)
+        severidade = self.severidade(disparos) if callable(self.severidade) else self.severidade
+
+        return pd.DataFrame({
+            "id_alerta": self.nome + ":" + disparos[self.chave_dedup].astype(str),
+            "regra": self.nome,
+            "severidade": severidade,
+            "id_duplicata": disparos["id_duplicata"].astype(str),
+            "chave_nfe": disparos["chave_nfe"],
+            "id_cedente": disparos["id_cedente"],
+            "valor": disparos["valor"].astype(float),
+            "risk_score": disparos["risk_score"].astype(float),
+            "classificacao": disparos["classificacao_risco"].astype(str),
+            "detalhe": self.detalhe(disparos),
+        }, columns=COLUNAS_ALERTA)
+
+
+def regras_padrao(
+    classificacao_minima: str = ALERTAS_CLASSIFICACAO_MINIMA,
+    endosso_valor_min: float = ALERTAS_ENDOSSO_VALOR_MIN
+) -> List[RegraAlerta]:
+    """Regras sobre as colunas do DetectorFraudeRatios (só as linhas do lote novo)"""
+    classificacoes = ORDEM_CLASSIFICACAO[ORDEM_CLASSIFICACAO.index(classificacao_minima):]
+
+    return [
+        RegraAlerta(
+            nome="classificacao_risco",
+            condicao=lambda df: df["classificacao_risco"].astype(str).isin(classificacoes),
+            detalhe=lambda df: "Risk score " + df["risk_score"].round(2).astype(str) + " (" + df["classificacao_risco"].astype(str) + ")",
+            severidade=lambda df: df["classificacao_risco"].astype(str)
+        ),
+        RegraAlerta(
+            nome="chave_nfe_repetida",
+            condicao=lambda df: df["freq_chave_nfe"] > 1,
+            detalhe=lambda df: "Chave NF-e aparece " + df["freq_chave_nfe"].astype(int).astype(str) + "x no sistema",
+            severidade="CRÍTICO",
+            chave_dedup="chave_nfe"
+        ),
+        RegraAlerta(
+            nome="endosso_nao_bancario",
+            condicao=lambda df: (df["endosso_suspeito"] == 1) & (df["valor"] >= endosso_valor_min),
+            detalhe=lambda df: "Endosso para entidade não-bancária: " + df["endossatario"].astype(str),
+            severidade="ALTO"
+        ),
+    ]
+
+
+def avaliar_regras(df: pd.DataFrame, regras: List[RegraAlerta]) -> pd.DataFrame:
+    """Alertas de todas as regras para um lote pontuado (custo proporcional ao lote)"""
+    alertas = [regra.avaliar(df) for regra in regras]
+    alertas = [a for a in alertas if not a.empty]
+    if not alertas:
+        return pd.DataFrame(columns=COLUNAS_ALERTA)
+    return pd.concat(alertas, ignore_index=True)
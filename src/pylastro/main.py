@@ -1,15 +1,28 @@
 from pathlib import Path
 import asyncio
+import secrets
+import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from .scripts.gerar_dados import DuplicataFactory
 from .scripts.popular_banco_automatico import popular_banco_automatico
 from .models.populacao import ConfigPopulacao
-from .core.config import DB_PATH
+from .core.config import DB_PATH, DB_SOMENTE_LEITURA, AGENTE_HABILITADO, ALERTAS_HABILITADO, PERFILAMENTO_TOKEN
 from .core.dependencies import get_db_manager
+from .core.metricas import metricas
+from .core.perfilamento import PERFILAMENTO_HABILITADO, MODOS, gerenciador_perfis
 from .routes.view import router as view
 from .routes.mocks import router as mock
 from .routes.relatorios import router as relatorios
+from .routes.investigacoes import router as investigacoes
+from .routes.populacao import router as populacao
+from .routes.duplicatas import router as duplicatas
+from .routes.alertas import router as alertas
+from .routes.metricas import router as metricas_router
+from .routes.perfilamento import router as perfilamento
+from .service.fila_investigacoes import get_fila_investigacoes
+from .service.ingestao import get_ingestor
+from .service.alertas import get_motor_alertas
 
 
 
@@ -27,13 +40,41 @@ async def lifespan(app: FastAPI):
         forcar_limpeza=False
     )
 
-    # Inicialização assincrona em background
-    asyncio.create_task(popular_banco_automatico(config, get_db_manager()))
+    # Inicialização em background: a carga roda em uma thread do executor,
+    # acompanhe em /populacao/status
+    app.state.tarefa_populacao = None
+    if DB_SOMENTE_LEITURA:
+        print("ℹ️  Banco em modo somente leitura: população e fila de investigações desativadas")
+    else:
+        app.state.tarefa_populacao = asyncio.create_task(popular_banco_automatico(config, get_db_manager()))
+
+    # Workers da fila de investigações (retoma jobs interrompidos)
+    fila = get_fila_investigacoes() if AGENTE_HABILITADO and not DB_SOMENTE_LEITURA else None
+    if fila is not None:
+        fila.iniciar()
+    elif not AGENTE_HABILITADO:
+        print("ℹ️  Agente desabilitado neste worker: fila de investigações não iniciada")
+
+    # Regras de alerta sobre cada micro-lote ingerido
+    motor_alertas = get_motor_alertas() if ALERTAS_HABILITADO and not DB_SOMENTE_LEITURA else None
+    if motor_alertas is not None:
+        motor_alertas.iniciar()
+
+    # Escritor dos micro-lotes do POST /duplicatas
+    ingestor = get_ingestor() if not DB_SOMENTE_LEITURA else None
+    if ingestor is not None:
+        await ingestor.iniciar()
 
     # Aqui a API fica ativa
     yield
 
     print("🛑 Encerrando aplicação...")
+    if ingestor is not None:
+        await ingestor.parar()
+    if motor_alertas is not None:
+        motor_alertas.parar()
+    if fila is not None:
+        fila.parar()
 
 app = FastAPI(
     title="API de Duplicatas com Detecção de Fraude",
@@ -45,10 +86,69 @@ app = FastAPI(
 app.include_router(view)
 app.include_router(mock)
 app.include_router(relatorios)
+app.include_router(investigacoes)
+app.include_router(populacao)
+app.include_router(duplicatas)
+app.include_router(alertas)
+app.include_router(metricas_router)
+app.include_router(perfilamento)
+
+if metricas.habilitado:
+    @app.middleware("http")
+    async def medir_latencia(request: Request, call_next):
+        """
+        Latência por rota (template do path, ex: /investigacoes/{id_job}, para não
+        explodir a cardinalidade). Em respostas streaming mede até o envio dos headers.
+        """
+        inicio = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            rota = request.scope.get("route")
+            metricas.observar(
+                "pylastro_http_requisicao_segundos",
+                time.perf_counter() - inicio,
+                metodo=request.method,
+                rota=getattr(rota, "path", "nao_mapeada"),
+                status=status
+            )
 
 @app.get("/", tags=["Status"])
 def root():
     return {
         "status": "online",
         "message": "API de Análise e Detecção de Fraudes ativa, acesse /docs para ver as rotas"
-    }
\ No newline at end of file
+    }
+if PERFILAMENTO_HABILITADO:
+    @app.middleware("http")
+    async def perfilar_requisicao(request: Request, call_next):
+        """
+        Perfila a requisição quando ela traz X-Pylastro-Perfil (amostragem |
+        deterministico) com o X-Pylastro-Token correto, ou quando há perfis
+        armados em /admin/perfis/armar (exceto rotas de observabilidade e probes).
+        O id do perfil volta em X-Pylastro-Perfil-Id.
+        """
+        if request.url.path.startswith("/admin/perfis"):
+            return await call_next(request)
+
+        modo = request.headers.get("x-pylastro-perfil")
+        origem = "header"
+        if modo not in MODOS or not secrets.compare_digest(request.headers.get("x-pylastro-token", ""), PERFILAMENTO_TOKEN):
+            modo = gerenciador_perfis.consumir(request.url.path)
+            origem = "armado"
+        if modo is None:
+            return await call_next(request)
+
+        sessao, token = gerenciador_perfis.iniciar_sessao(modo, request.method, request.url.path, origem)
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            response.headers["X-Pylastro-Perfil-Id"] = sessao.id
+            return response
+        finally:
+            gerenciador_perfis.encerrar_sessao(token)
+            await asyncio.to_thread(gerenciador_perfis.finalizar_sessao, sessao, status)
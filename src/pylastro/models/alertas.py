@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class Alerta(BaseModel):
+    """Alerta emitido por uma regra contínua sobre uma duplicata recém-ingerida"""
+    id_alerta: str
+    regra: str
+    severidade: str
+    id_duplicata: str
+    chave_nfe: Optional[str] = None
+    id_cedente: Optional[str] = None
+    valor: float
+    risk_score: float
+    classificacao: str
+    detalhe: str
+    criado_em: datetime
+
+
+class ListaAlertas(BaseModel):
+    total: int
+    alertas: List[Alerta]
+
+
+class EstadoAlertas(BaseModel):
+    """Contadores do motor de alertas desde o início do processo"""
+    habilitado: bool
+    regras: List[str]
+    sinks: List[str]
+    investigar: bool
+    lotes_avaliados: int
+    linhas_avaliadas: int
+    disparos: int
+    alertas_emitidos: int
+    pendentes_envio: int
+    falhas_envio: int
+    casos_investigacao: int
@@ -0,0 +1,39 @@
+from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class KpisGerais(BaseModel):
+    """Indicadores macro (cards do topo)"""
+    total_docs: int
+    valor_total: float
+    ticket_medio: float
+    taxa_fraude: float
+
+
+class CedenteResumo(BaseModel):
+    nome_cedente: str
+    setor_cedente: Optional[str] = None
+    qtd_operacoes: int
+    volume_total: float
+    qtd_alertas_fraude: int
+
+
+class OcorrenciaFraude(BaseModel):
+    tipo_fraude: str
+    ocorrencias: int
+
+
+class VencimentoDia(BaseModel):
+    data_vencimento: date
+    valor_a_vencer: float
+
+
+class Dashboard(BaseModel):
+    """Todos os blocos do dashboard, calculados em uma única leitura de `duplicatas`"""
+    data_inicio: Optional[date] = None
+    data_fim: Optional[date] = None
+    kpis: KpisGerais
+    top_cedentes: List[CedenteResumo]
+    distribuicao_fraude: List[OcorrenciaFraude]
+    fluxo_vencimento: List[VencimentoDia]
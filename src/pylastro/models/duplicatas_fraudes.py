@@ -7,6 +7,7 @@ from enum import Enum
 class ClassificacaoEnum(str, Enum):
     CRITICO = "CRÍTICO"
     ALTO = "ALTO"
+    MODERADO = "MODERADO"
     MEDIO = "MÉDIO"
     BAIXO = "BAIXO"
 
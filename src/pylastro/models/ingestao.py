@@ -0,0 +1,48 @@
+from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class DuplicataEntrada(BaseModel):
+    """Duplicata emitida pelo sistema de originação (layout da tabela `duplicatas`)"""
+    id_duplicata: Optional[str] = Field(default=None, description="Gerado (UUID4) se omitido")
+    chave_nfe: str = Field(..., min_length=1)
+    data_emissao: date
+    data_vencimento: date
+    prazo_dias: Optional[int] = Field(default=None, description="Calculado pelas datas se omitido")
+
+    id_cedente: str
+    nome_cedente: str
+    cnpj_cedente: str
+    estado_cedente: str
+    setor_cedente: str
+
+    id_sacado: str
+    nome_sacado: str
+    cnpj_sacado: str
+    estado_sacado: str
+    setor_sacado: str
+
+    produto: str
+    valor: float = Field(..., gt=0)
+    aceite_sacado: bool
+    endossatario: Optional[str] = None
+
+    # Só para massa de teste: em produção o rótulo não é conhecido na emissão
+    label_fraude: Optional[int] = None
+    tipo_fraude: Optional[str] = None
+
+
+class DuplicataPontuada(BaseModel):
+    id_duplicata: str
+    risk_score: float
+    classificacao: str
+    freq_chave_nfe: int
+
+
+class ResultadoIngestao(BaseModel):
+    """Resposta do POST /duplicatas: cada duplicata com o score calculado na chegada"""
+    recebidas: int
+    itens: List[DuplicataPontuada]
+    tamanho_microlote: int = Field(..., description="Linhas gravadas junto com esta requisição")
+    latencia_ms: float
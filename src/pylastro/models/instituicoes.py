@@ -0,0 +1,13 @@
+from typing import Dict, List
+from pydantic import BaseModel, Field
+
+
+class ConsultaLoteInstituicoes(BaseModel):
+    """Nomes a validar de uma vez no cadastro de instituições"""
+    nomes: List[str] = Field(..., min_length=1, max_length=5000)
+    similaridade_minima: float = Field(default=0.6, ge=0.0, le=1.0)
+    max_resultados: int = Field(default=5, ge=1, le=50)
+
+
+class ResultadoLoteInstituicoes(BaseModel):
+    resultados: Dict[str, List[dict]]
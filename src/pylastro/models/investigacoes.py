@@ -0,0 +1,40 @@
+from datetime import datetime
+from typing import Any, List, Optional
+from pydantic import BaseModel
+
+
+class JobSubmetido(BaseModel):
+    """Resposta da submissão de um lote de investigações"""
+    id_job: str
+    total_casos: int
+    status: str
+
+
+class StatusJob(BaseModel):
+    """Progresso de um job de investigação"""
+    id_job: str
+    status: str
+    total_casos: int
+    pendentes: int
+    processando: int
+    concluidos: int
+    falhos: int
+    percentual_concluido: float
+    criado_em: datetime
+    atualizado_em: datetime
+
+
+class ResultadoCaso(BaseModel):
+    """Resultado de um caso do job"""
+    posicao: int
+    id_duplicata: str
+    status: str
+    tentativas: int
+    resultado: Optional[Any] = None
+    erro: Optional[str] = None
+
+
+class ResultadosJob(BaseModel):
+    id_job: str
+    status: str
+    casos: List[ResultadoCaso]
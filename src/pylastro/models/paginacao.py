@@ -0,0 +1,9 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class Pagina(BaseModel):
+    """Página de uma listagem com paginação por cursor (keyset)"""
+    itens: List[dict]
+    limite: int
+    proximo_cursor: Optional[str] = None
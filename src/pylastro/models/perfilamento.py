@@ -0,0 +1,9 @@
+from pydantic import BaseModel, Field
+from typing import Literal, Optional
+
+
+class ArmarPerfil(BaseModel):
+    """Perfila as próximas `quantidade` requisições (opcionalmente só de uma rota)"""
+    quantidade: int = Field(default=1, ge=1, le=100)
+    modo: Literal["amostragem", "deterministico"] = "amostragem"
+    prefixo_rota: Optional[str] = Field(default=None, description="Ex: /relatorios/fraudes")
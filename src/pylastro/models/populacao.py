@@ -10,6 +10,16 @@ class StatusPopulacao(BaseModel):
     percentual_fraudes: float
     pode_popular: bool
     mensagem: str
+    # Andamento da população em background
+    fase: str = "AGUARDANDO"
+    em_andamento: bool = False
+    total_previsto: int = 0
+    registros_gerados: int = 0
+    registros_inseridos: int = 0
+    linhas_por_segundo: float = 0.0
+    eta_segundos: Optional[float] = None
+    tempo_decorrido_s: float = 0.0
+    erro: Optional[str] = None
 
 class ConfigPopulacao(BaseModel):
     """Configuração para popular o banco"""
@@ -26,3 +36,27 @@ class ResultadoPopulacao(BaseModel):
     total_fraudes: int
     tempo_execucao: float
     distribuicao_fraudes: dict
+
+class PerfilEscala(BaseModel):
+    """Perfil nomeado de população em larga escala (sem os limites de ConfigPopulacao)"""
+    nome: str
+    qtd_cedentes: int = Field(ge=1)
+    qtd_sacados: int = Field(ge=1)
+    qtd_duplicatas: int = Field(ge=1)
+    taxa_fraude: float = Field(default=0.15, ge=0.0, le=0.5)
+    tamanho_lote: int = Field(default=100_000, ge=1_000)
+    concentracao: float = Field(default=0.0, ge=0.0)
+
+class ResultadoEscala(BaseModel):
+    """Resultado de uma carga por perfil, com vazão de geração e de carga"""
+    perfil: str
+    seed: int
+    lotes_total: int
+    lotes_executados: int
+    lotes_retomados: int
+    registros_inseridos: int
+    tempo_geracao_s: float
+    tempo_carga_s: float
+    linhas_por_segundo_geracao: float
+    linhas_por_segundo_carga: float
+
@@ -0,0 +1,44 @@
+from typing import Optional
+
+import duckdb
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from ..core.dependencies import get_db_manager, exigir_escrita
+from ..service.alertas import get_motor_alertas
+from ..models.alertas import ListaAlertas, EstadoAlertas
+
+router = APIRouter(prefix="/alertas", tags=["Alertas"])
+
+
+@router.get("", response_model=ListaAlertas)
+def get_alertas(
+    regra: Optional[str] = Query(default=None, description="Ex: classificacao_risco, chave_nfe_repetida, endosso_nao_bancario"),
+    severidade: Optional[str] = Query(default=None, description="Ex: ALTO, CRÍTICO"),
+    limite: int = Query(default=100, ge=1, le=1000)
+):
+    """Alertas emitidos pelas regras contínuas, mais recentes primeiro"""
+    try:
+        alertas = get_db_manager().listar_alertas(regra, severidade, limite)
+    except duckdb.CatalogException:
+        # Nenhum micro-lote ingerido com o motor ativo: a tabela ainda não existe
+        alertas = []
+    return {"total": len(alertas), "alertas": alertas}
+
+
+@router.get("/estado", response_model=EstadoAlertas)
+def get_estado_alertas():
+    """Regras, destinos e contadores do motor de alertas deste processo"""
+    return get_motor_alertas().estado()
+
+
+@router.post("/fila/consumir", response_model=ListaAlertas, dependencies=[Depends(exigir_escrita)])
+def post_consumir_fila(maximo: int = Query(default=100, ge=1, le=1000)):
+    """
+    Retira até `maximo` alertas da fila em memória (o sink "fila", no lugar de
+    um broker). Cada alerta é entregue uma vez.
+    """
+    fila = get_motor_alertas().sink("fila")
+    if fila is None:
+        raise HTTPException(status_code=404, detail="Sink 'fila' não configurado (PYLASTRO_ALERTAS_SINKS)")
+    alertas = fila.consumir(maximo)
+    return {"total": len(alertas), "alertas": alertas}
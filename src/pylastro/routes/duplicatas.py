@@ -0,0 +1,92 @@
+import time
+import uuid
+from typing import List, Union
+
+import duckdb
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
+
+from ..core.dependencies import exigir_escrita
+from ..service.ingestao import get_ingestor, IngestaoSobrecarregada, PedidoGrandeDemais, PontuacaoFalhou
+from ..models.ingestao import DuplicataEntrada, DuplicataPontuada, ResultadoIngestao
+
+router = APIRouter(
+    prefix="/duplicatas",
+    tags=["Ingestão"],
+    dependencies=[Depends(exigir_escrita)]
+)
+
+
+def _registro(entrada: DuplicataEntrada) -> dict:
+    registro = entrada.model_dump()
+    if not registro["id_duplicata"]:
+        registro["id_duplicata"] = str(uuid.uuid4())
+    if registro["prazo_dias"] is None:
+        registro["prazo_dias"] = (entrada.data_vencimento - entrada.data_emissao).days
+    return registro
+
+
+def _id_repetido(erro: duckdb.ConstraintException) -> bool:
+    """Só a PK de `duplicatas` é duplicata repetida; chave de perfil é conflito entre escritores"""
+    return 'Duplicate key "id_duplicata:' in str(erro)
+
+
+def _conflito_transitorio(erro: Exception) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"Conflito de escrita, tente novamente: {erro}"},
+        headers={"Retry-After": "1"}
+    )
+
+
+@router.post("", response_model=ResultadoIngestao, status_code=201)
+async def post_duplicatas(payload: Union[DuplicataEntrada, List[DuplicataEntrada]]):
+    """
+    Recebe uma duplicata ou uma lista e devolve cada uma com risk_score e
+    classificação calculados na chegada. As requisições simultâneas são
+    gravadas juntas em micro-lotes; com a gravação atrasada, responde 429.
+    Uma lista maior que o limite de linhas pendentes recebe 413.
+    """
+    entradas = payload if isinstance(payload, list) else [payload]
+    if not entradas:
+        raise HTTPException(status_code=422, detail="Nenhuma duplicata enviada")
+
+    ingestor = get_ingestor()
+    if not ingestor.ativo:
+        raise HTTPException(status_code=503, detail="Ingestão não iniciada neste worker")
+
+    inicio = time.perf_counter()
+    try:
+        pontuado, tamanho_microlote = await ingestor.submeter([_registro(e) for e in entradas])
+    except PedidoGrandeDemais as e:
+        raise HTTPException(status_code=413, detail=f"Pedido grande demais: {e}")
+    except IngestaoSobrecarregada as e:
+        return JSONResponse(
+            status_code=429,
+            content={"detail": f"Ingestão sobrecarregada: {e}"},
+            headers={"Retry-After": "1"}
+        )
+    except duckdb.ConstraintException as e:
+        if not _id_repetido(e):
+            return _conflito_transitorio(e)
+        raise HTTPException(status_code=409, detail=f"Duplicata já registrada: {e}")
+    except duckdb.TransactionException as e:
+        return _conflito_transitorio(e)
+    except PontuacaoFalhou as e:
+        raise HTTPException(status_code=500, detail=f"Duplicatas gravadas, mas a pontuação falhou: {e}")
+
+    itens = [
+        DuplicataPontuada(
+            id_duplicata=linha.id_duplicata,
+            risk_score=round(float(linha.risk_score), 4),
+            classificacao=str(linha.classificacao_risco),
+            freq_chave_nfe=int(linha.freq_chave_nfe)
+        )
+        for linha in pontuado.itertuples(index=False)
+    ]
+    return ResultadoIngestao(
+        recebidas=len(itens),
+        itens=itens,
+        tamanho_microlote=tamanho_microlote,
+        latencia_ms=round((time.perf_counter() - inicio) * 1000, 1)
+    )
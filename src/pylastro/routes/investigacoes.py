@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException
+from ..core.dependencies import exigir_agente, exigir_escrita
+from ..service.fila_investigacoes import get_fila_investigacoes
+from ..models.duplicatas_fraudes import DuplicatasPayload
+from ..models.investigacoes import JobSubmetido, StatusJob, ResultadosJob
+
+router = APIRouter(
+    prefix="/investigacoes",
+    tags=["Investigações (Fila)"],
+    dependencies=[Depends(exigir_agente), Depends(exigir_escrita)]
+)
+
+
+@router.post("/jobs", response_model=JobSubmetido, status_code=202)
+def post_job(payload: DuplicatasPayload):
+    """
+    Enfileira as duplicatas para investigação em background e retorna o id do job.
+    Acompanhe em /investigacoes/jobs/{id_job}.
+    """
+    try:
+        return get_fila_investigacoes().submeter(payload)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/jobs/{id_job}", response_model=StatusJob)
+def get_status_job(id_job: str):
+    """Progresso do job: casos pendentes, em processamento, concluídos e falhos"""
+    status = get_fila_investigacoes().status(id_job)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return status
+
+
+@router.get("/jobs/{id_job}/resultados", response_model=ResultadosJob)
+def get_resultados_job(id_job: str):
+    """Vereditos dos casos do job (parciais enquanto o job estiver em andamento)"""
+    resultados = get_fila_investigacoes().resultados(id_job)
+    if resultados is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return resultados
@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..core.metricas import metricas
+
+router = APIRouter(tags=["Observabilidade"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Histogramas de latência no formato texto do Prometheus"""
+    return PlainTextResponse(
+        metricas.exportar_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
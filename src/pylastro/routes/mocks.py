@@ -1,86 +1,56 @@
+from collections import deque
 from fastapi import APIRouter, HTTPException
 from typing import Optional
 from fastapi import Query
 
+from ..domain.registro_instituicoes import get_registro_instituicoes
+from ..models.instituicoes import ConsultaLoteInstituicoes, ResultadoLoteInstituicoes
+
 
 router = APIRouter(prefix="/mocks", tags=["Mocks"])
+
+# Últimos alertas recebidos pelo receptor de webhook local
+_alertas_recebidos = deque(maxlen=1000)
+
 @router.get("/intituicoes")
-def get_instituicoes(nome: Optional[str] = Query(default=None)):
-    entidades = [
-        {
-            "nome_exato": "Consultoria e Gestão Empresarial Ltda",
-            "tipo_instituicao": "Empresa de consultoria"
-        },
-        {
-            "nome_exato": "M.S. Apoio Administrativo",
-            "tipo_instituicao": "Empresa de serviços administrativos"
-        },
-        {
-            "nome_exato": "João da Silva - CPF 123.456.789-00",
-            "tipo_instituicao": "Pessoa física"
-        },
-        {
-            "nome_exato": "Padaria e Confeitaria do Bairro",
-            "tipo_instituicao": "Estabelecimento comercial (padaria)"
-        },
-        {
-            "nome_exato": "Holding Patrimonial X",
-            "tipo_instituicao": "Holding patrimonial"
-        },
-        {
-            "nome_exato": "Associação de Moradores da Vila",
-            "tipo_instituicao": "Associação civil"
-        },
-        {
-            "nome_exato": "Lava Jato Rápido ME",
-            "tipo_instituicao": "Microempresa (serviços de lavagem automotiva)"
-        },
-        {
-            "nome_exato": "Maria Oliveira - CPF 987.654.321-00",
-            "tipo_instituicao": "Pessoa física"
-        },
-        {
-            "nome_exato": "J.P. Consultoria Individual",
-            "tipo_instituicao": "Empresa de consultoria individual"
-        },
-        {
-            "nome_exato": "Bar e Mercearia Central",
-            "tipo_instituicao": "Comércio varejista"
-        },
-        {
-            "nome_exato": "Banco do Brasil S.A.",
-            "tipo_instituicao": "Instituição financeira (banco comercial)"
-        },
-        {
-            "nome_exato": "Itaú Unibanco S.A.",
-            "tipo_instituicao": "Instituição financeira (banco comercial)"
-        },
-        {
-            "nome_exato": "Bradesco S.A.",
-            "tipo_instituicao": "Instituição financeira (banco comercial)"
-        },
-        {
-            "nome_exato": "Santander Brasil S.A.",
-            "tipo_instituicao": "Instituição financeira (banco comercial)"
-        },
-        {
-            "nome_exato": "Caixa Econômica Federal",
-            "tipo_instituicao": "Instituição financeira (banco estatal)"
-        },
-        {
-            "nome_exato": "BTG Pactual S.A.",
-            "tipo_instituicao": "Instituição financeira (banco de investimentos)"
-        },
-        {
-            "nome_exato": "Safra S.A.",
-            "tipo_instituicao": "Instituição financeira (banco comercial)"
-        },
-        {
-            "nome_exato": "Banco Inter S.A.",
-            "tipo_instituicao": "Instituição financeira (banco digital)"
-        }
-    ]
+@router.get("/instituicoes")
+def get_instituicoes(
+    nome: Optional[str] = Query(default=None),
+    similaridade_minima: float = Query(default=0.6, ge=0.0, le=1.0),
+    max_resultados: int = Query(default=5, ge=1, le=50)
+):
+    """
+    Consulta o cadastro de instituições. Com `nome`, a busca ignora acentos,
+    caixa e pontuação e aceita nomes aproximados (similaridade por trigramas).
+    """
+    registro = get_registro_instituicoes()
     if nome is not None:
-        entidades_filtradas = [e for e in entidades if e["nome_exato"] == nome]
-        return {"entidades": entidades_filtradas}
-    return {"entidades": entidades}
+        return {"entidades": registro.buscar(nome, similaridade_minima, max_resultados)}
+    return {"entidades": registro.entidades}
+
+
+@router.post("/instituicoes/lote", response_model=ResultadoLoteInstituicoes)
+def post_instituicoes_lote(consulta: ConsultaLoteInstituicoes):
+    """Valida vários nomes em uma chamada: nome consultado -> entidades encontradas"""
+    registro = get_registro_instituicoes()
+    return {
+        "resultados": registro.buscar_lote(
+            consulta.nomes,
+            consulta.similaridade_minima,
+            consulta.max_resultados
+        )
+    }
+
+
+@router.post("/webhook/alertas")
+def post_webhook_alertas(corpo: dict):
+    """Receptor local do sink webhook dos alertas (PYLASTRO_ALERTAS_SINKS=webhook)"""
+    alertas = corpo.get("alertas", [])
+    _alertas_recebidos.extend(alertas)
+    return {"recebidos": len(alertas)}
+
+
+@router.get("/webhook/alertas")
+def get_webhook_alertas(limite: int = Query(default=100, ge=1, le=1000)):
+    """Últimos alertas entregues ao receptor local"""
+    return {"total": len(_alertas_recebidos), "alertas": list(_alertas_recebidos)[-limite:]}
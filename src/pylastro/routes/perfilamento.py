@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import Response
+
+from ..core.dependencies import exigir_token_perfilamento
+from ..core.perfilamento import gerenciador_perfis
+from ..models.perfilamento import ArmarPerfil
+
+router = APIRouter(
+    prefix="/admin/perfis",
+    tags=["Perfilamento"],
+    dependencies=[Depends(exigir_token_perfilamento)]
+)
+
+
+@router.post("/armar")
+def armar_perfil(config: ArmarPerfil):
+    """Perfila as próximas N requisições (substitui o que estiver armado)"""
+    gerenciador_perfis.armar(config.quantidade, config.modo, config.prefixo_rota)
+    return gerenciador_perfis.situacao()
+
+
+@router.delete("/armar")
+def desarmar_perfil():
+    gerenciador_perfis.desarmar()
+    return gerenciador_perfis.situacao()
+
+
+@router.get("/")
+def listar_perfis():
+    """Perfis gravados, do mais recente para o mais antigo"""
+    return {"armado": gerenciador_perfis.situacao(), "perfis": gerenciador_perfis.listar()}
+
+
+@router.get("/{id_perfil}/download")
+def baixar_perfil(id_perfil: str):
+    """Zip com os artefatos do perfil (pilhas, cProfile e planos do DuckDB)"""
+    conteudo = gerenciador_perfis.compactar(id_perfil)
+    if conteudo is None:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+    return Response(
+        conteudo,
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="perfil-{id_perfil}.zip"'}
+    )
@@ -0,0 +1,57 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from ..core.dependencies import get_db_manager
+from ..core.progresso_populacao import progresso_populacao
+from ..models.populacao import StatusPopulacao
+
+router = APIRouter(prefix="/populacao", tags=["População do Banco"])
+
+
+@router.get("/status", response_model=StatusPopulacao)
+def get_status_populacao():
+    """Situação do banco e andamento da população em background (fase, vazão, ETA)"""
+    db_manager = get_db_manager()
+    tabela_existe = db_manager.tabela_existe()
+    total_registros = db_manager.contar_registros() if tabela_existe else 0
+    total_fraudes = db_manager.contar_fraudes() if tabela_existe else 0
+
+    andamento = progresso_populacao.resumo()
+    em_andamento = progresso_populacao.em_andamento
+
+    if andamento["fase"] == "ERRO":
+        mensagem = f"Falha na população: {andamento['erro']}"
+    elif em_andamento:
+        mensagem = f"População em andamento ({andamento['fase']})"
+    elif total_registros > 0:
+        mensagem = "Banco populado"
+    else:
+        mensagem = "Banco vazio"
+
+    return StatusPopulacao(
+        tabela_existe=tabela_existe,
+        total_registros=total_registros,
+        total_fraudes=total_fraudes,
+        percentual_fraudes=round(total_fraudes / total_registros * 100, 2) if total_registros else 0.0,
+        pode_popular=not em_andamento,
+        mensagem=mensagem,
+        em_andamento=em_andamento,
+        **andamento
+    )
+
+
+@router.get("/pronto")
+def get_pronto():
+    """
+    Readiness probe: 200 quando a população terminou e há dados para consulta,
+    503 enquanto o banco está sendo populado (ou vazio)
+    """
+    if progresso_populacao.em_andamento:
+        return JSONResponse(status_code=503, content={"pronto": False, "fase": progresso_populacao.fase})
+
+    db_manager = get_db_manager()
+    pronto = db_manager.tabela_existe() and db_manager.contar_registros() > 0
+    return JSONResponse(
+        status_code=200 if pronto else 503,
+        content={"pronto": pronto, "fase": progresso_populacao.fase}
+    )
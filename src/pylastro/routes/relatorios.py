@@ -1,28 +1,110 @@
-import requests
-import random
-from fastapi import APIRouter, HTTPException
+import json
+import threading
+from datetime import date
+from contextlib import aclosing
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.encoders import jsonable_encoder
-from ..core.dependencies import get_db_connection
-from ..service.detector_fraude import DetectorFraudeService
+from fastapi.responses import StreamingResponse
+from ..core.config import LLM_CONCORRENCIA_MAX
+from ..core.uso_tokens import contador_tokens
+from ..core.controle_taxa import controlador_llm
+from ..core.dependencies import exigir_agente
+from ..core.perfilamento import perfilavel
+from ..core.paginacao import codificar_cursor, decodificar_cursor, cursor_numero, cursor_texto
+from ..core.serializacao import negociar_formato, responder_tabela, RESPOSTAS_COLUNARES
+from ..service.snapshot_scores import snapshot_scores
 from ..service.simular_alerta import SimularAlertaService
 from ..models.duplicatas_fraudes import DuplicatasPayload, DuplicataItem
+from ..models.paginacao import Pagina
 
 router = APIRouter(prefix="/relatorios", tags=["Analytics & Fraudes"])
 
-@router.get("/fraudes")
-def get_fraudes(n_itens : int = 20):
-    conn = get_db_connection()
+@router.get("/fraudes", responses=RESPOSTAS_COLUNARES)
+@perfilavel
+def get_fraudes(n_itens : int = 20, formato: str = Depends(negociar_formato)):
+    """
+    Resumo de risco, top suspeitos e métricas do detector. Em Arrow/Parquet
+    o corpo é só a tabela `top_suspeitos` (resumo e métricas ficam no JSON).
+    """
     try:
-        query = """SELECT * FROM duplicatas"""
-        resultado = conn.execute(query).df()
-        service = DetectorFraudeService(resultado)
-        return service.executar(n_itens)
+        # Scoring da tabela inteira vem do cache; só é refeito se a tabela mudar
+        scores = snapshot_scores.obter()
+        if formato == "json":
+            return scores.executar(n_itens)
+        relatorio = scores.top_suspeitos(n_itens)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    return responder_tabela(relatorio, formato)
 
-@router.post("/simular_alerta_bi")
+
+@router.get("/fraudes/ranking", response_model=Pagina, responses=RESPOSTAS_COLUNARES)
+@perfilavel
+def get_fraudes_ranking(
+    limite: int = Query(default=50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    classificacoes: Optional[List[str]] = Query(default=None, description="Ex: ALTO, CRÍTICO"),
+    setor: Optional[str] = None,
+    estado: Optional[str] = None,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    valor_min: Optional[float] = None,
+    valor_max: Optional[float] = None,
+    colunas: Optional[List[str]] = Query(default=None),
+    formato: str = Depends(negociar_formato)
+):
+    """
+    Ranking de risco paginado por cursor em (risk_score, id_duplicata), com
+    filtros por classificação, setor/estado do cedente, período de emissão e
+    faixa de valor, e projeção das colunas do relatório. Em Arrow/Parquet o
+    corpo é só a tabela, fora do envelope `Pagina`, e o cursor vai no header
+    X-Proximo-Cursor.
+    """
+    apos = None
+    if cursor:
+        try:
+            apos = tuple(decodificar_cursor(cursor, tipos=(cursor_numero, cursor_texto)))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        relatorio, ha_mais = snapshot_scores.obter().pagina_ranking(
+            limite=limite,
+            apos=apos,
+            classificacoes=classificacoes,
+            setor=setor,
+            estado=estado,
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+            valor_min=valor_min,
+            valor_max=valor_max
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    proximo_cursor = None
+    if ha_mais and not relatorio.empty:
+        ultima = relatorio.iloc[-1]
+        proximo_cursor = codificar_cursor([float(ultima['risk_score']), ultima['id_duplicata']])
+
+    if colunas and not relatorio.empty:
+        invalidas = set(colunas) - set(relatorio.columns)
+        if invalidas:
+            raise HTTPException(status_code=400, detail=f"Colunas inválidas: {sorted(invalidas)}")
+        relatorio = relatorio[colunas]
+
+    headers = {"X-Proximo-Cursor": proximo_cursor} if proximo_cursor else None
+    return responder_tabela(
+        relatorio,
+        formato,
+        envelope={"limite": limite, "proximo_cursor": proximo_cursor},
+        headers=headers
+    )
+
+
+@router.post("/simular_alerta_bi", dependencies=[Depends(exigir_agente)])
 def post_simular_alerta_bi(payload : DuplicatasPayload ):
     try:
         service= SimularAlertaService()
@@ -32,28 +114,115 @@ def post_simular_alerta_bi(payload : DuplicatasPayload ):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/simular_pipeline")
-def simular_pipeline():
-    try:
-        response = requests.get("http://localhost:8000/relatorios/fraudes?n_itens=10")
-        data = response.json()
+@router.post("/simular_alerta_bi/stream", dependencies=[Depends(exigir_agente)])
+async def post_simular_alerta_bi_stream(
+    payload: DuplicatasPayload,
+    request: Request,
+    formato: Literal["ndjson", "sse"] = "ndjson",
+    max_concorrencia: int = Query(default=4, ge=1, le=LLM_CONCORRENCIA_MAX),
+    intervalo_heartbeat: float = Query(default=10.0, gt=0)
+):
+    """
+    Versão em streaming do /simular_alerta_bi: cada veredito é enviado assim que
+    sua investigação termina (NDJSON ou Server-Sent Events), com eventos de
+    progresso e heartbeat. Se o cliente desconectar, as chamadas pendentes ao LLM
+    são canceladas.
+    """
+    service = SimularAlertaService(rota="/relatorios/simular_alerta_bi/stream")
+    cancelamento = threading.Event()
+
+    def formatar(evento: dict) -> str:
+        dados = json.dumps(jsonable_encoder(evento), ensure_ascii=False)
+        if formato == "ndjson":
+            return dados + "\n"
+
+        linhas = [f"event: {evento['evento']}"]
+        if "id_duplicata" in evento:
+            linhas.append(f"id: {evento['id_duplicata']}")
+        linhas.append(f"data: {dados}")
+        return "\n".join(linhas) + "\n\n"
 
-        suspeito = random.choice(data['top_suspeitos'])
+    async def gerar():
+        eventos = service.alerta_stream(
+            payload,
+            cancelamento,
+            max_concorrencia=max_concorrencia,
+            intervalo_heartbeat=intervalo_heartbeat
+        )
+        async with aclosing(eventos):
+            async for evento in eventos:
+                if await request.is_disconnected():
+                    break
+                yield formatar(evento)
 
-        # Remove campos que não devem ir para a LLM
-        suspeito.pop("label_fraude", None)
-        suspeito.pop("tipo_fraude_real", None)
+    media_type = "application/x-ndjson" if formato == "ndjson" else "text/event-stream"
+    return StreamingResponse(
+        gerar(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-        duplicata_item = DuplicataItem(**suspeito)
 
-        payload = DuplicatasPayload(duplicatas=[duplicata_item])
+@router.post("/simular_pipeline", dependencies=[Depends(exigir_agente)])
+def simular_pipeline(
+    quantidade: int = Query(default=1, ge=1, le=50),
+    classificacoes: Optional[List[str]] = Query(default=None, description="Ex: ALTO, CRÍTICO"),
+    score_min: Optional[float] = None,
+    score_max: Optional[float] = None,
+    top_n: int = Query(default=10, ge=1),
+    seed: Optional[int] = None
+):
+    """
+    Sorteia suspeitos do scoring em cache e os envia para o agente.
+    Sem filtros, sorteia entre os `top_n` maiores scores (comportamento original).
+    """
+    try:
+        snapshot = snapshot_scores.obter()
+        suspeitos = snapshot.selecionar(
+            quantidade=quantidade,
+            classificacoes=classificacoes,
+            score_min=score_min,
+            score_max=score_max,
+            top_n=top_n,
+            seed=seed
+        )
+
+        if suspeitos.empty:
+            raise HTTPException(status_code=404, detail="Nenhuma duplicata nos filtros informados")
 
-        service = SimularAlertaService()
+        duplicatas = []
+        for suspeito in jsonable_encoder(suspeitos.to_dict(orient="records")):
+            # Remove campos que não devem ir para a LLM
+            suspeito.pop("label_fraude", None)
+            suspeito.pop("tipo_fraude_real", None)
+            duplicatas.append(DuplicataItem(**suspeito))
+
+        payload = DuplicatasPayload(duplicatas=duplicatas)
+
+        service = SimularAlertaService(rota="/relatorios/simular_pipeline")
         resultado = service.alerta(payload)
 
         return jsonable_encoder(resultado)
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/uso_tokens")
+def get_uso_tokens():
+    """
+    Consumo de tokens do LLM acumulado por rota desde o início do processo
+    (entrada, saída e médias por chamada).
+    """
+    return contador_tokens.resumo()
+
+
+@router.get("/llm/metricas")
+def get_metricas_llm():
+    """
+    Estado do controle de chamadas ao LLM: throttles (429), retries, rejeições
+    do circuit breaker, espera no rate limit e limite de concorrência atual.
+    """
+    return controlador_llm.metricas()
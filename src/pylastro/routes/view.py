@@ -1,7 +1,17 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 import duckdb
-from datetime import datetime
+import pandas as pd
+from datetime import date, datetime
+from typing import List, Optional, Union
 from ..core.dependencies import get_db_connection
+from ..core.perfilamento import perfilavel
+from ..core.paginacao import codificar_cursor, decodificar_cursor, cursor_data, cursor_texto
+from ..core.serializacao import (
+    negociar_formato, consultar, responder_tabela, RESPOSTAS_COLUNARES,
+    n_linhas, primeiras_linhas, ultima_linha, selecionar_colunas
+)
+from ..models.dashboard import Dashboard, KpisGerais, CedenteResumo, OcorrenciaFraude, VencimentoDia
+from ..models.paginacao import Pagina
 
 router = APIRouter(prefix="/view", tags=["Analytics & Database"])
 
@@ -35,7 +45,7 @@ def get_kpis_gerais():
         conn.close()
 
 @router.get("/top-cedentes")
-def get_top_cedentes(limit: int = 5):
+def get_top_cedentes(limit: int = 5, formato: str = Depends(negociar_formato)):
     """
     Retorna os Cedentes que mais operam e o risco associado a eles.
     Ideal para Tabela ou Gráfico de Barras Horizontais.
@@ -54,13 +64,12 @@ def get_top_cedentes(limit: int = 5):
             ORDER BY volume_total DESC
             LIMIT {limit}
         """
-        result = conn.execute(query).df()
-        return result.to_dict(orient="records")
+        return responder_tabela(consultar(conn, query), formato)
     finally:
         conn.close()
 
 @router.get("/distribuicao-fraude")
-def get_distribuicao_fraude():
+def get_distribuicao_fraude(formato: str = Depends(negociar_formato)):
     """
     Mostra quais tipos de fraude são mais comuns.
     Ideal para Gráfico de Pizza ou Donut.
@@ -76,13 +85,12 @@ def get_distribuicao_fraude():
             GROUP BY tipo_fraude
             ORDER BY ocorrencias DESC
         """
-        result = conn.execute(query).df()
-        return result.to_dict(orient="records")
+        return responder_tabela(consultar(conn, query), formato)
     finally:
         conn.close()
 
 @router.get("/fluxo-vencimento")
-def get_fluxo_vencimento():
+def get_fluxo_vencimento(formato: str = Depends(negociar_formato)):
     """
     Previsão de fluxo de caixa (Cash Flow) baseado nos vencimentos futuros.
     Importante para saber quanto dinheiro 'deve' entrar por dia.
@@ -100,26 +108,243 @@ def get_fluxo_vencimento():
             LIMIT 30
         """
         # Nota: Limitado a 30 dias para não pesar o JSON
-        df = conn.execute(query).df()
-        df['data_vencimento'] = df['data_vencimento'].dt.strftime('%Y-%m-%d')
-        return df.to_dict(orient="records")
+        tabela = consultar(conn, query)
+        if isinstance(tabela, pd.DataFrame):
+            tabela['data_vencimento'] = tabela['data_vencimento'].dt.strftime('%Y-%m-%d')
+        return responder_tabela(tabela, formato)
     finally:
         conn.close()
 
-@router.get("/exemplo_fraude")
-def get_exemplo_fraude(tipo_fraude: str):
+@router.get("/dashboard", response_model=Dashboard)
+@perfilavel
+def get_dashboard(
+    limite_cedentes: int = Query(default=5, ge=1, le=100),
+    limite_vencimentos: int = Query(default=30, ge=1, le=365),
+    data_inicio: Optional[date] = Query(default=None, description="Início do período de emissão"),
+    data_fim: Optional[date] = Query(default=None, description="Fim do período de emissão")
+):
+    """
+    KPIs, top cedentes, distribuição de fraudes e fluxo de vencimentos em uma
+    única chamada. Os quatro blocos saem de uma só leitura de `duplicatas`
+    (GROUPING SETS); os limites de cada bloco são aplicados com QUALIFY.
+    """
+    condicoes = []
+    params = []
+    if data_inicio is not None:
+        condicoes.append("data_emissao >= ?")
+        params.append(data_inicio)
+    if data_fim is not None:
+        condicoes.append("data_emissao <= ?")
+        params.append(data_fim)
+    where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+
+    # Chaves dos blocos: fora do bloco (não-fraude / já vencido) viram NULL
+    # e são descartadas depois
+    query = f"""
+        WITH base AS (
+            SELECT
+                nome_cedente,
+                setor_cedente,
+                valor,
+                label_fraude,
+                CASE WHEN label_fraude = 1 THEN tipo_fraude END AS tipo_chave,
+                CASE WHEN data_vencimento >= CURRENT_DATE THEN data_vencimento END AS vencimento_chave
+            FROM duplicatas
+            {where}
+        ),
+        agregado AS (
+            SELECT
+                CASE
+                    WHEN GROUPING(nome_cedente) = 0 THEN 'cedente'
+                    WHEN GROUPING(tipo_chave) = 0 THEN 'tipo_fraude'
+                    WHEN GROUPING(vencimento_chave) = 0 THEN 'vencimento'
+                    ELSE 'total'
+                END AS bloco,
+                nome_cedente,
+                setor_cedente,
+                tipo_chave,
+                vencimento_chave,
+                COUNT(*) AS qtd,
+                COALESCE(SUM(valor), 0) AS volume,
+                COALESCE(AVG(valor), 0) AS ticket_medio,
+                COALESCE(SUM(label_fraude), 0) AS fraudes
+            FROM base
+            GROUP BY GROUPING SETS (
+                (),
+                (nome_cedente, setor_cedente),
+                (tipo_chave),
+                (vencimento_chave)
+            )
+        )
+        SELECT bloco, nome_cedente, setor_cedente, tipo_chave, vencimento_chave, qtd, volume, ticket_medio, fraudes
+        FROM agregado
+        WHERE bloco IN ('total', 'cedente')
+           OR (bloco = 'tipo_fraude' AND tipo_chave IS NOT NULL)
+           OR (bloco = 'vencimento' AND vencimento_chave IS NOT NULL)
+        QUALIFY bloco = 'total'
+            OR (bloco = 'cedente' AND ROW_NUMBER() OVER (
+                    PARTITION BY bloco ORDER BY volume DESC, nome_cedente) <= ?)
+            OR bloco = 'tipo_fraude'
+            OR (bloco = 'vencimento' AND ROW_NUMBER() OVER (
+                    PARTITION BY bloco ORDER BY vencimento_chave) <= ?)
+    """
+
+    conn = get_db_connection()
+    try:
+        linhas_agregadas = conn.execute(query, params + [limite_cedentes, limite_vencimentos]).fetchall()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        conn.close()
+
+    kpis = KpisGerais(total_docs=0, valor_total=0, ticket_medio=0, taxa_fraude=0)
+    top_cedentes, distribuicao, fluxo = [], [], []
+
+    for bloco, cedente, setor, tipo, vencimento, qtd, volume, ticket, fraudes in linhas_agregadas:
+        if bloco == "total":
+            kpis = KpisGerais(
+                total_docs=qtd,
+                valor_total=volume,
+                ticket_medio=round(ticket, 2),
+                taxa_fraude=round(fraudes / qtd * 100, 2) if qtd else 0
+            )
+        elif bloco == "cedente":
+            top_cedentes.append(CedenteResumo(
+                nome_cedente=cedente,
+                setor_cedente=setor,
+                qtd_operacoes=qtd,
+                volume_total=volume,
+                qtd_alertas_fraude=fraudes
+            ))
+        elif bloco == "tipo_fraude":
+            distribuicao.append(OcorrenciaFraude(tipo_fraude=tipo, ocorrencias=qtd))
+        else:
+            fluxo.append(VencimentoDia(data_vencimento=vencimento, valor_a_vencer=volume))
+
+    top_cedentes.sort(key=lambda c: c.volume_total, reverse=True)
+    distribuicao.sort(key=lambda o: o.ocorrencias, reverse=True)
+    fluxo.sort(key=lambda v: v.data_vencimento)
+
+    return Dashboard(
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+        kpis=kpis,
+        top_cedentes=top_cedentes,
+        distribuicao_fraude=distribuicao,
+        fluxo_vencimento=fluxo
+    )
+
+# Colunas que podem ser projetadas nas listagens
+COLUNAS_DUPLICATAS = [
+    'id_duplicata', 'chave_nfe', 'data_emissao', 'data_vencimento', 'prazo_dias',
+    'id_cedente', 'nome_cedente', 'cnpj_cedente', 'estado_cedente', 'setor_cedente',
+    'id_sacado', 'nome_sacado', 'cnpj_sacado', 'estado_sacado', 'setor_sacado',
+    'produto', 'valor', 'aceite_sacado', 'endossatario', 'label_fraude', 'tipo_fraude',
+    'data_insercao'
+]
+
+LIMITE_PADRAO_EXEMPLOS = 100
+
+
+@router.get("/exemplo_fraude", response_model=Union[Pagina, List[dict]], responses=RESPOSTAS_COLUNARES)
+@perfilavel
+def get_exemplo_fraude(
+    tipo_fraude: str,
+    limite: Optional[int] = Query(default=None, ge=1, le=1000, description="Pagina o resultado (padrão 100 quando só o cursor é enviado)"),
+    cursor: Optional[str] = None,
+    setor: Optional[str] = None,
+    estado: Optional[str] = None,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    valor_min: Optional[float] = None,
+    valor_max: Optional[float] = None,
+    colunas: Optional[List[str]] = Query(default=None),
+    formato: str = Depends(negociar_formato)
+):
     """
     Retorna exemplos de duplicatas marcadas como fraude para o tipo de fraude especificado.
+
+    Sem `limite` nem `cursor`, mantém o contrato original: lista simples com
+    todas as duplicatas encontradas. Com `limite` e/ou `cursor`, responde a
+    página `Pagina`, com paginação por cursor em (data_emissao, id_duplicata),
+    das mais recentes para as mais antigas: envie o `proximo_cursor` recebido
+    para obter a página seguinte.
+    Filtros (setor/estado do cedente, período de emissão, faixa de valor) e a
+    projeção de colunas são aplicados na própria consulta. Em Arrow/Parquet o
+    corpo é só a tabela, fora do envelope `Pagina`, e o cursor vai no header
+    X-Proximo-Cursor.
     """
+    paginar = limite is not None or cursor is not None
+    if paginar and limite is None:
+        limite = LIMITE_PADRAO_EXEMPLOS
+
+    if colunas:
+        invalidas = set(colunas) - set(COLUNAS_DUPLICATAS)
+        if invalidas:
+            raise HTTPException(status_code=400, detail=f"Colunas inválidas: {sorted(invalidas)}")
+        # A chave do cursor precisa estar sempre no resultado
+        projecao = list(dict.fromkeys(colunas + ['data_emissao', 'id_duplicata']))
+    else:
+        projecao = COLUNAS_DUPLICATAS
+
+    condicoes = ["label_fraude = 1", "tipo_fraude = ?"]
+    params = [tipo_fraude]
+
+    filtros = [
+        (setor, "setor_cedente = ?"),
+        (estado, "estado_cedente = ?"),
+        (data_inicio, "data_emissao >= ?"),
+        (data_fim, "data_emissao <= ?"),
+        (valor_min, "valor >= ?"),
+        (valor_max, "valor <= ?"),
+    ]
+    for valor, condicao in filtros:
+        if valor is not None:
+            condicoes.append(condicao)
+            params.append(valor)
+
+    if cursor:
+        try:
+            ultima_data, ultimo_id = decodificar_cursor(cursor, tipos=(cursor_data, cursor_texto))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        condicoes.append("(data_emissao < CAST(? AS DATE) OR (data_emissao = CAST(? AS DATE) AND id_duplicata < ?))")
+        params += [ultima_data, ultima_data, ultimo_id]
+
     conn = get_db_connection()
     try:
-        query = """
-            SELECT * FROM duplicatas
-            WHERE label_fraude = 1 AND tipo_fraude = ?
+        query = f"""
+            SELECT {', '.join(projecao)} FROM duplicatas
+            WHERE {' AND '.join(condicoes)}
+            ORDER BY data_emissao DESC, id_duplicata DESC
+            {f"LIMIT {limite + 1}" if paginar else ""}
         """
-        df = conn.execute(query, [tipo_fraude]).df()
-        return df.to_dict(orient="records")
+        tabela = consultar(conn, query, params)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     finally:
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+    proximo_cursor = None
+    if paginar and n_linhas(tabela) > limite:
+        tabela = primeiras_linhas(tabela, limite)
+        ultima = ultima_linha(tabela)
+        proximo_cursor = codificar_cursor([
+            pd.Timestamp(ultima['data_emissao']).date().isoformat(),
+            ultima['id_duplicata']
+        ])
+
+    if colunas:
+        tabela = selecionar_colunas(tabela, colunas)
+
+    if not paginar:
+        return responder_tabela(tabela, formato)
+
+    # Nos formatos colunares o cursor segue no header
+    headers = {"X-Proximo-Cursor": proximo_cursor} if proximo_cursor else None
+    return responder_tabela(
+        tabela,
+        formato,
+        envelope={"limite": limite, "proximo_cursor": proximo_cursor},
+        headers=headers
+    )
@@ -0,0 +1,239 @@
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+from ..core.config import FAIXAS_BENCHMARK, BENCHMARKS_PATH
+from .benchmark_suite import semear_banco
+
+# Tráfego por tipo: (método, caminho, peso dentro do tipo)
+TRAFEGO = {
+    "dashboard": [
+        ("GET", "/view/kpis-gerais", 3),
+        ("GET", "/view/top-cedentes", 2),
+        ("GET", "/view/distribuicao-fraude", 2),
+        ("GET", "/view/fluxo-vencimento", 2),
+        ("GET", "/view/dashboard", 3),
+    ],
+    "scoring": [
+        ("GET", "/relatorios/fraudes", 3),
+        ("GET", "/relatorios/fraudes/ranking?limite=50", 2),
+    ],
+    "alertas": [
+        ("POST", "/relatorios/simular_pipeline?quantidade=1", 1),
+    ],
+}
+
+# Mix de tráfego: peso de cada tipo
+MIXES = {
+    "dashboard": {"dashboard": 1.0},
+    "scoring": {"scoring": 1.0},
+    "alertas": {"alertas": 1.0},
+    "misto": {"dashboard": 0.7, "scoring": 0.25, "alertas": 0.05},
+}
+
+
+def montar_sorteio(mix: dict) -> tuple:
+    """Rotas e pesos finais (peso do tipo no mix x peso da rota no tipo)"""
+    rotas, pesos = [], []
+    for tipo, peso_tipo in mix.items():
+        total_tipo = sum(peso for _, _, peso in TRAFEGO[tipo])
+        for metodo, caminho, peso in TRAFEGO[tipo]:
+            rotas.append((metodo, caminho))
+            pesos.append(peso_tipo * peso / total_tipo)
+    return rotas, pesos
+
+
+def percentil(valores: list, p: float) -> float:
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+class ServidorApi:
+    """
+    Sobe `uvicorn pylastro.main:app` em um subprocesso, apontado para o banco
+    semeado e com o modelo fake no lugar do Gemini (sem rede).
+    """
+
+    def __init__(self, db_path, porta: int = 8000, workers: int = 1, somente_leitura: bool = True,
+                 latencia_llm_ms: float = 800, jitter_llm_ms: float = 300, env_extra: dict = None):
+        self.url = f"http://127.0.0.1:{porta}"
+        self.comando = [
+            sys.executable, "-m", "uvicorn", "pylastro.main:app",
+            "--host", "127.0.0.1", "--port", str(porta),
+            "--workers", str(workers), "--log-level", "warning"
+        ]
+        self.env = {
+            **os.environ,
+            "PYLASTRO_DB_PATH": str(db_path),
+            "PYLASTRO_DB_SOMENTE_LEITURA": "true" if somente_leitura else "false",
+            "PYLASTRO_LLM_BACKEND": "fake",
+            "PYLASTRO_LLM_FAKE_LATENCIA_MS": str(latencia_llm_ms),
+            "PYLASTRO_LLM_FAKE_JITTER_MS": str(jitter_llm_ms),
+            **(env_extra or {})
+        }
+        self._processo = None
+
+    def __enter__(self):
+        self._processo = subprocess.Popen(self.comando, env=self.env, stdout=subprocess.DEVNULL)
+        self.aguardar_pronto()
+        return self
+
+    def aguardar_pronto(self, timeout_s: float = 120):
+        limite = time.monotonic() + timeout_s
+        while time.monotonic() < limite:
+            if self._processo.poll() is not None:
+                raise RuntimeError(f"uvicorn terminou na inicialização (código {self._processo.returncode})")
+            try:
+                if requests.get(f"{self.url}/populacao/pronto", timeout=2).status_code == 200:
+                    return
+            except requests.RequestException:
+                pass
+            time.sleep(0.5)
+        raise TimeoutError("API não ficou pronta a tempo")
+
+    def __exit__(self, *exc):
+        self._processo.terminate()
+        try:
+            self._processo.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            self._processo.kill()
+
+
+def gerar_carga(url: str, mix: dict, concorrencia: int, duracao_s: float, timeout_s: float = 60, seed: int = 42) -> dict:
+    """
+    `concorrencia` usuários virtuais em loop fechado (cada um dispara a próxima
+    requisição quando a anterior volta) durante `duracao_s`.
+
+    Returns:
+        Por rota: requisições, erros, vazão e latências p50/p95/p99 (ms)
+    """
+    rotas, pesos = montar_sorteio(mix)
+    latencias = defaultdict(list)
+    erros = defaultdict(lambda: defaultdict(int))
+    lock = threading.Lock()
+    fim = time.monotonic() + duracao_s
+
+    def usuario(indice: int):
+        sorteio = random.Random(seed + indice)
+        sessao = requests.Session()
+        while time.monotonic() < fim:
+            metodo, caminho = sorteio.choices(rotas, weights=pesos)[0]
+            rota = caminho.split("?")[0]
+            inicio = time.perf_counter()
+            try:
+                status = sessao.request(metodo, url + caminho, timeout=timeout_s).status_code
+                motivo = None if status < 400 else str(status)
+            except requests.RequestException as e:
+                motivo = type(e).__name__
+            decorrido = time.perf_counter() - inicio
+            with lock:
+                latencias[rota].append(decorrido)
+                if motivo:
+                    erros[rota][motivo] += 1
+
+    inicio = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concorrencia) as pool:
+        list(pool.map(usuario, range(concorrencia)))
+    decorrido = time.monotonic() - inicio
+
+    por_rota = {}
+    for rota, valores in sorted(latencias.items()):
+        total_erros = sum(erros[rota].values())
+        por_rota[rota] = {
+            "requisicoes": len(valores),
+            "erros": total_erros,
+            "taxa_erro": round(total_erros / len(valores), 4),
+            "erros_por_tipo": dict(erros[rota]),
+            "rps": round(len(valores) / decorrido, 2),
+            "p50_ms": round(percentil(valores, 50) * 1000, 1),
+            "p95_ms": round(percentil(valores, 95) * 1000, 1),
+            "p99_ms": round(percentil(valores, 99) * 1000, 1),
+        }
+
+    todas = [v for valores in latencias.values() for v in valores]
+    total_erros = sum(r["erros"] for r in por_rota.values())
+    return {
+        "duracao_s": round(decorrido, 1),
+        "total": {
+            "requisicoes": len(todas),
+            "erros": total_erros,
+            "taxa_erro": round(total_erros / len(todas), 4) if todas else 0.0,
+            "rps": round(len(todas) / decorrido, 2),
+            "p50_ms": round(percentil(todas, 50) * 1000, 1) if todas else None,
+            "p95_ms": round(percentil(todas, 95) * 1000, 1) if todas else None,
+            "p99_ms": round(percentil(todas, 99) * 1000, 1) if todas else None,
+        },
+        "por_rota": por_rota
+    }
+
+
+def _ms(valor) -> str:
+    # Sem nenhuma requisição concluída os percentis do total são None
+    return f"{valor:>9.1f}" if valor is not None else f"{'-':>9}"
+
+
+def imprimir_resumo(resultado: dict):
+    """Tabela por rota (e total) com vazão, percentis de latência e taxa de erro"""
+    print(f"\n{'rota':<40} {'req':>7} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'erros':>7}")
+    for rota, r in {**resultado["por_rota"], "TOTAL": resultado["total"]}.items():
+        print(f"{rota:<40} {r['requisicoes']:>7} {r['rps']:>8.1f} {_ms(r['p50_ms'])} "
+              f"{_ms(r['p95_ms'])} {_ms(r['p99_ms'])} {r['taxa_erro']:>7.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga HTTP da API (offline, modelo fake)")
+    parser.add_argument("--faixa", choices=sorted(FAIXAS_BENCHMARK), default="10k", help="Banco semeado (ver benchmark_suite)")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="misto")
+    parser.add_argument("--concorrencia", type=int, default=16, help="Usuários virtuais")
+    parser.add_argument("--duracao", type=float, default=30, help="Segundos de carga")
+    parser.add_argument("--workers", type=int, default=1, help="Workers do uvicorn")
+    parser.add_argument("--porta", type=int, default=8000, help="A tool consultar_entidade do agente usa a porta 8000")
+    parser.add_argument("--escrita", action="store_true",
+                        help="Abre o banco com escrita (só funciona com 1 worker: o DuckDB trava o arquivo por processo)")
+    parser.add_argument("--latencia-llm-ms", type=float, default=800)
+    parser.add_argument("--jitter-llm-ms", type=float, default=300)
+    parser.add_argument("--url", default=None, help="Usa uma API já em execução (não sobe o uvicorn)")
+    args = parser.parse_args()
+
+    mix = MIXES[args.mix]
+    if args.url:
+        resultado = gerar_carga(args.url, mix, args.concorrencia, args.duracao)
+    else:
+        db_path = semear_banco(args.faixa)
+        print(f"🚀 Subindo API: {args.workers} worker(s), banco {db_path.name}, "
+              f"{'com escrita' if args.escrita else 'somente leitura'}")
+        with ServidorApi(db_path, args.porta, args.workers, not args.escrita,
+                         args.latencia_llm_ms, args.jitter_llm_ms) as servidor:
+            print(f"🔥 Carga '{args.mix}': {args.concorrencia} usuários por {args.duracao:.0f}s")
+            resultado = gerar_carga(servidor.url, mix, args.concorrencia, args.duracao)
+
+    execucao = {
+        "executado_em": datetime.now().isoformat(timespec="seconds"),
+        "faixa": args.faixa,
+        "mix": args.mix,
+        "concorrencia": args.concorrencia,
+        "workers": args.workers,
+        "somente_leitura": not args.escrita,
+        **resultado
+    }
+    BENCHMARKS_PATH.mkdir(parents=True, exist_ok=True)
+    with open(BENCHMARKS_PATH / "carga.jsonl", "a", encoding="utf-8") as historico:
+        historico.write(json.dumps(execucao, ensure_ascii=False) + "\n")
+
+    imprimir_resumo(resultado)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Executado em um processo novo a cada medição (cold start real)
+_SONDA = r"""
+import json, resource, sys, time
+
+inicio = time.perf_counter()
+import pylastro.main
+tempo_import = time.perf_counter() - inicio
+rss_import = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+pesados = sorted(m for m in ("langgraph", "langchain_core", "langchain_google_genai") if m in sys.modules)
+
+tempo_agente = None
+if MEDIR_AGENTE:
+    inicio = time.perf_counter()
+    import pylastro.domain.agente
+    tempo_agente = time.perf_counter() - inicio
+
+print(json.dumps({
+    "tempo_import_s": tempo_import,
+    "rss_mb": rss_import / 1024,
+    "rss_pos_agente_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "tempo_primeiro_agente_s": tempo_agente,
+    "modulos_pesados": pesados,
+}))
+"""
+
+
+def medir(agente_habilitado: bool, medir_agente: bool) -> dict:
+    env = {**os.environ, "PYLASTRO_AGENTE_HABILITADO": "true" if agente_habilitado else "false"}
+    codigo = _SONDA.replace("MEDIR_AGENTE", str(medir_agente))
+    saida = subprocess.run(
+        [sys.executable, "-c", codigo],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    # A última linha é o JSON; as anteriores são prints de import
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def benchmark(repeticoes: int = 5, medir_agente: bool = True) -> dict:
+    """
+    Cold start de `import pylastro.main` em processos novos, por papel de worker
+    (PYLASTRO_AGENTE_HABILITADO true/false): mediana do tempo de import, RSS
+    máximo e quais módulos do agente foram carregados no import.
+    """
+    resultado = {}
+    for habilitado in (True, False):
+        amostras = [medir(habilitado, medir_agente and habilitado) for _ in range(repeticoes)]
+        resumo = {
+            "tempo_import_mediana_s": round(statistics.median(a["tempo_import_s"] for a in amostras), 3),
+            "rss_mediana_mb": round(statistics.median(a["rss_mb"] for a in amostras), 1),
+            "modulos_pesados": amostras[-1]["modulos_pesados"],
+        }
+        if medir_agente and habilitado:
+            resumo["tempo_primeiro_agente_mediana_s"] = round(
+                statistics.median(a["tempo_primeiro_agente_s"] for a in amostras), 3)
+            resumo["rss_pos_agente_mediana_mb"] = round(
+                statistics.median(a["rss_pos_agente_mb"] for a in amostras), 1)
+        resultado["agente_habilitado" if habilitado else "agente_desabilitado"] = resumo
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização da API (cold start e RSS)")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--sem-agente", action="store_true", help="Não mede o primeiro import do agente")
+    args = parser.parse_args()
+
+    print(json.dumps(benchmark(args.repeticoes, not args.sem_agente), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from ..core.config import FAIXAS_BENCHMARK, BENCHMARKS_PATH, BENCHMARK_TOLERANCIA
+
+SEED = 42
+
+# Limite de linhas dos casos que não usam o banco semeado: os caminhos linha a
+# linha são lentos demais para 10M e a vazão (linhas/s) já se estabiliza antes
+LIMITE_GERACAO_LINHA = 50_000
+LIMITE_INSERCAO = 500_000
+
+ROTAS_API = [
+    "/view/kpis-gerais",
+    "/view/top-cedentes",
+    "/view/distribuicao-fraude",
+    "/view/fluxo-vencimento",
+    "/view/dashboard",
+    "/view/exemplo_fraude?tipo_fraude=Duplicatas%20Duplicadas&limite=100",
+    "/relatorios/fraudes",
+]
+REPETICOES_API = 5
+
+
+# --------------------------------------
+# CASOS (cada um roda em um processo novo; devolve uma lista de medições)
+# --------------------------------------
+
+def _medicao(nome: str, tempo_s: float, linhas: int = None, **extra) -> dict:
+    return {
+        "caso": nome,
+        "tempo_s": round(tempo_s, 4),
+        "linhas": linhas,
+        "linhas_por_segundo": round(linhas / tempo_s, 1) if linhas and tempo_s > 0 else None,
+        **extra
+    }
+
+
+def _factory(qtd_cedentes: int = 50, qtd_sacados: int = 200):
+    from .gerar_dados import DuplicataFactory
+    factory = DuplicataFactory(seed=SEED)
+    factory.gerar_carteira_empresas(qtd_cedentes, qtd_sacados)
+    return factory
+
+
+def caso_geracao(qtd: int, db_path: Path) -> list:
+    """DuplicataFactory (vetorizado e linha a linha) e FraudeInjector"""
+    from .gerar_fraudes import FraudeInjector
+    factory = _factory()
+
+    inicio = time.perf_counter()
+    factory.gerar_lote_vetorizado(qtd, seed=SEED)
+    vetorizado = time.perf_counter() - inicio
+
+    qtd_linha = min(qtd, LIMITE_GERACAO_LINHA)
+    inicio = time.perf_counter()
+    normais = [factory.gerar_transacao_normal() for _ in range(qtd_linha)]
+    linha = time.perf_counter() - inicio
+
+    qtd_fraudes = int(qtd_linha * 0.15)
+    inicio = time.perf_counter()
+    FraudeInjector(factory).contaminar_lote([], qtd_fraudes, normais[:1000])
+    fraudes = time.perf_counter() - inicio
+
+    return [
+        _medicao("geracao.vetorizada", vetorizado, qtd),
+        _medicao("geracao.linha_a_linha", linha, qtd_linha),
+        _medicao("geracao.fraudes", fraudes, qtd_fraudes),
+    ]
+
+
+def caso_insercao(qtd: int, db_path: Path) -> list:
+    """DuckDBManager.inserir_lote (lista de dicts) em um banco temporário"""
+    from ..db.duckdb import DuckDBManager
+    qtd = min(qtd, LIMITE_INSERCAO)
+    lote = _factory().gerar_lote_vetorizado(qtd, seed=SEED).to_dict("records")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        db_manager = DuckDBManager(Path(diretorio) / "insercao.duckdb")
+        db_manager.criar_tabela()
+        inicio = time.perf_counter()
+        db_manager.inserir_lote(lote)
+        tempo = time.perf_counter() - inicio
+
+    return [_medicao("duckdb.inserir_lote", tempo, qtd)]
+
+
+def caso_detector(qtd: int, db_path: Path) -> list:
+    """Etapas do DetectorFraudeRatios sobre o banco semeado"""
+    import duckdb
+    from ..domain.detector_fraudes import DetectorFraudeRatios
+
+    inicio = time.perf_counter()
+    conn = duckdb.connect(str(db_path), read_only=True)
+    try:
+        df = conn.execute("SELECT * FROM duplicatas").df()
+    finally:
+        conn.close()
+    detector = DetectorFraudeRatios(df)
+    medicoes = [_medicao("detector.carga", time.perf_counter() - inicio, len(df))]
+
+    etapas = [
+        ("detector.ratios", detector.calcular_ratios_financeiros),
+        ("detector.entidades", detector.calcular_ratios_entidades),
+        ("detector.score", detector.calcular_risk_score),
+        ("detector.relatorio", lambda: detector.gerar_relatorio(top_n=20)),
+        ("detector.metricas", detector.metricas_desempenho),
+    ]
+    for nome, etapa in etapas:
+        inicio = time.perf_counter()
+        etapa()
+        medicoes.append(_medicao(nome, time.perf_counter() - inicio, len(df)))
+    return medicoes
+
+
+def caso_api(qtd: int, db_path: Path) -> list:
+    """Rotas /view e /relatorios/fraudes pelo TestClient (sem lifespan: sem população nem fila)"""
+    from fastapi.testclient import TestClient
+    from ..main import app
+
+    cliente = TestClient(app)
+    medicoes = []
+    for rota in ROTAS_API:
+        tempos = []
+        for _ in range(REPETICOES_API + 1):
+            inicio = time.perf_counter()
+            resposta = cliente.get(rota)
+            tempos.append(time.perf_counter() - inicio)
+            if resposta.status_code != 200:
+                raise RuntimeError(f"{rota} respondeu {resposta.status_code}: {resposta.text[:200]}")
+
+        # A primeira chamada inclui caches frios (ex: scoring de /relatorios/fraudes)
+        quentes = sorted(tempos[1:])
+        nome = "api." + rota.split("?")[0].strip("/").replace("/", ".")
+        medicoes.append(_medicao(nome, quentes[len(quentes) // 2], primeira_chamada_s=round(tempos[0], 4)))
+    return medicoes
+
+
+CASOS = {
+    "geracao": caso_geracao,
+    "insercao": caso_insercao,
+    "detector": caso_detector,
+    "api": caso_api,
+}
+
+
+# --------------------------------------
+# ORQUESTRAÇÃO
+# --------------------------------------
+
+def semear_banco(faixa: str) -> Path:
+    """
+    Banco determinístico da faixa (perfil de escala com a seed fixa), criado
+    uma vez e reaproveitado nas execuções seguintes.
+    """
+    from ..db.duckdb import DuckDBManager
+    from .popular_escala import popular_perfil
+
+    db_path = BENCHMARKS_PATH / f"{FAIXAS_BENCHMARK[faixa]}-seed{SEED}.duckdb"
+    db_manager = DuckDBManager(db_path)
+    db_manager.criar_tabela_checkpoint()
+    checkpoint = db_manager.ler_checkpoint(f"{FAIXAS_BENCHMARK[faixa]}:{SEED}")
+    if checkpoint is None or checkpoint[0] < checkpoint[1]:
+        popular_perfil(FAIXAS_BENCHMARK[faixa], db_manager, seed=SEED)
+    return db_path
+
+
+def executar_caso(caso: str, faixa: str, db_path: Path) -> list:
+    """Roda o caso em um processo novo: o pico de RSS é só dele"""
+    env = {
+        **os.environ,
+        "PYLASTRO_DB_PATH": str(db_path),
+        "PYLASTRO_AGENTE_HABILITADO": "false",
+    }
+    saida = subprocess.run(
+        [sys.executable, "-m", "pylastro.scripts.benchmark_suite",
+         "--executar-caso", caso, "--faixas", faixa, "--db", str(db_path)],
+        env=env, capture_output=True, text=True
+    )
+    if saida.returncode != 0:
+        raise RuntimeError(f"Caso {caso} ({faixa}) falhou:\n{saida.stderr[-2000:]}")
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def _executar_no_processo(caso: str, faixa: str, db_path: Path):
+    from .popular_escala import obter_perfil
+    qtd = obter_perfil(FAIXAS_BENCHMARK[faixa]).qtd_duplicatas
+    medicoes = CASOS[caso](qtd, db_path)
+    pico_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    for medicao in medicoes:
+        medicao["pico_rss_mb"] = round(pico_rss_mb, 1)
+    print(json.dumps(medicoes))
+
+
+def comparar(resultados: dict, baseline: dict, tolerancia: float) -> list:
+    """Medições mais lentas que o baseline além da tolerância"""
+    regressoes = []
+    for chave, atual in resultados.items():
+        anterior = baseline.get(chave)
+        if not anterior or not anterior.get("tempo_s"):
+            continue
+        variacao = atual["tempo_s"] / anterior["tempo_s"] - 1
+        if variacao > tolerancia:
+            regressoes.append({
+                "medicao": chave,
+                "baseline_s": anterior["tempo_s"],
+                "atual_s": atual["tempo_s"],
+                "variacao_percentual": round(variacao * 100, 1)
+            })
+    return regressoes
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def executar_suite(faixas: list, casos: list, tolerancia: float = BENCHMARK_TOLERANCIA, salvar_baseline: bool = False) -> dict:
+    """
+    Semeia os bancos das faixas, roda cada caso em um processo próprio e
+    registra o resultado em historico.jsonl. Compara com baseline.json e
+    lista as regressões (tempo acima de baseline * (1 + tolerancia)).
+    """
+    BENCHMARKS_PATH.mkdir(parents=True, exist_ok=True)
+    resultados = {}
+
+    for faixa in faixas:
+        print(f"\n🌱 Faixa {faixa}: preparando banco...")
+        db_path = semear_banco(faixa)
+        for caso in casos:
+            print(f"⏱️  {faixa} / {caso}...")
+            for medicao in executar_caso(caso, faixa, db_path):
+                resultados[f"{faixa}/{medicao['caso']}"] = medicao
+
+    caminho_baseline = BENCHMARKS_PATH / "baseline.json"
+    baseline = json.loads(caminho_baseline.read_text(encoding="utf-8")) if caminho_baseline.exists() else {}
+    regressoes = comparar(resultados, baseline, tolerancia)
+
+    execucao = {
+        "executado_em": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit_atual(),
+        "python": platform.python_version(),
+        "maquina": platform.machine(),
+        "cpus": os.cpu_count(),
+        "resultados": resultados,
+        "regressoes": regressoes
+    }
+    with open(BENCHMARKS_PATH / "historico.jsonl", "a", encoding="utf-8") as historico:
+        historico.write(json.dumps(execucao, ensure_ascii=False) + "\n")
+
+    if salvar_baseline:
+        caminho_baseline.write_text(json.dumps({**baseline, **resultados}, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"📌 Baseline atualizado: {caminho_baseline}")
+
+    return execucao
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks (geração, carga, scoring e API) por faixa de escala")
+    parser.add_argument("--faixas", nargs="+", choices=sorted(FAIXAS_BENCHMARK), default=["10k"])
+    parser.add_argument("--casos", nargs="+", choices=sorted(CASOS), default=list(CASOS))
+    parser.add_argument("--tolerancia", type=float, default=BENCHMARK_TOLERANCIA)
+    parser.add_argument("--salvar-baseline", action="store_true", help="Grava os resultados como novo baseline")
+    parser.add_argument("--executar-caso", choices=sorted(CASOS), help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.executar_caso:
+        _executar_no_processo(args.executar_caso, args.faixas[0], Path(args.db))
+        return
+
+    execucao = executar_suite(args.faixas, args.casos, args.tolerancia, args.salvar_baseline)
+
+    print(f"\n{'medição':<45} {'tempo (s)':>10} {'linhas/s':>14} {'RSS (MB)':>9}")
+    for chave, medicao in execucao["resultados"].items():
+        vazao = f"{medicao['linhas_por_segundo']:,.0f}" if medicao["linhas_por_segundo"] else "-"
+        print(f"{chave:<45} {medicao['tempo_s']:>10.4f} {vazao:>14} {medicao['pico_rss_mb']:>9.1f}")
+
+    if execucao["regressoes"]:
+        print(f"\n🚨 {len(execucao['regressoes'])} regressão(ões) acima de {args.tolerancia:.0%}:")
+        for regressao in execucao["regressoes"]:
+            print(f"   {regressao['medicao']}: {regressao['baseline_s']}s -> {regressao['atual_s']}s "
+                  f"(+{regressao['variacao_percentual']}%)")
+        sys.exit(1)
+    print("\n✅ Sem regressões em relação ao baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from .gerar_dados import DuplicataFactory
+from .gerar_fraudes import FraudeInjector
+from .pipeline_carga import gerar_lotes_contaminados, executar_pipeline, CarregadorParquet
+
+
+def seed_do_shard(seed: int, indice: int) -> int:
+    """Semente derivada e independente por shard (SeedSequence com spawn_key)"""
+    return int(np.random.SeedSequence(seed, spawn_key=(indice,)).generate_state(1)[0])
+
+
+def dividir_em_shards(qtd_duplicatas: int, n_shards: int) -> List[int]:
+    base, resto = divmod(qtd_duplicatas, n_shards)
+    return [base + (1 if i < resto else 0) for i in range(n_shards)]
+
+
+def _gerar_shard(tarefa: dict) -> str:
+    """Executa em um processo do pool: gera um shard completo em Parquet"""
+    factory = DuplicataFactory(seed=tarefa["seed"])
+    factory.importar_carteira(tarefa["carteira"])
+    injector = FraudeInjector(factory)
+
+    lotes = gerar_lotes_contaminados(
+        factory,
+        injector,
+        qtd_duplicatas=tarefa["qtd_duplicatas"],
+        taxa_fraude=tarefa["taxa_fraude"],
+        tamanho_lote=tarefa["tamanho_lote"]
+    )
+    executar_pipeline(lotes, CarregadorParquet(tarefa["caminho"]))
+    return tarefa["caminho"]
+
+
+def gerar_shards(
+    qtd_duplicatas: int,
+    taxa_fraude: float,
+    diretorio,
+    n_shards: int = 4,
+    seed: int = 42,
+    qtd_cedentes: int = 50,
+    qtd_sacados: int = 200,
+    concentracao: float = 0.0,
+    tamanho_lote: int = 5000,
+    max_workers: int = None
+) -> List[str]:
+    """
+    Gera a massa de dados em `n_shards` arquivos Parquet, em paralelo.
+
+    - A carteira de empresas é criada uma vez (com `seed`) e compartilhada
+    - Cada shard tem seu próprio random.Random/Faker com seed derivada de
+      (seed, índice), então o resultado é idêntico para o mesmo
+      (seed, n_shards), qualquer que seja a ordem de execução
+
+    Returns:
+        Caminhos dos shards, em ordem
+    """
+    diretorio = Path(diretorio)
+    diretorio.mkdir(parents=True, exist_ok=True)
+
+    factory = DuplicataFactory(seed=seed)
+    factory.gerar_carteira_empresas(qtd_cedentes, qtd_sacados, concentracao=concentracao)
+    carteira = factory.exportar_carteira()
+
+    tarefas = [
+        {
+            "seed": seed_do_shard(seed, indice),
+            "carteira": carteira,
+            "qtd_duplicatas": qtd,
+            "taxa_fraude": taxa_fraude,
+            "tamanho_lote": tamanho_lote,
+            "caminho": str(diretorio / f"shard-{indice:04d}.parquet")
+        }
+        for indice, qtd in enumerate(dividir_em_shards(qtd_duplicatas, n_shards))
+    ]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_gerar_shard, tarefas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Geração paralela (sharded) da base de duplicatas")
+    parser.add_argument("--qtd", type=int, default=1_000_000, help="Duplicatas normais")
+    parser.add_argument("--taxa-fraude", type=float, default=0.15)
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cedentes", type=int, default=50)
+    parser.add_argument("--sacados", type=int, default=200)
+    parser.add_argument("--concentracao", type=float, default=0.0)
+    parser.add_argument("--diretorio", default="data/shards", help="Destino dos arquivos Parquet")
+    parser.add_argument("--db", default=None, help="Se informado, importa os shards neste arquivo DuckDB")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    caminhos = gerar_shards(
+        args.qtd, args.taxa_fraude, args.diretorio,
+        n_shards=args.shards, seed=args.seed,
+        qtd_cedentes=args.cedentes, qtd_sacados=args.sacados,
+        concentracao=args.concentracao, max_workers=args.workers
+    )
+    print(f"✅ {len(caminhos)} shards gerados em {time.perf_counter() - inicio:.1f}s")
+
+    if args.db:
+        from ..db.duckdb import DuckDBManager
+
+        db_manager = DuckDBManager(Path(args.db))
+        db_manager.criar_tabela()
+        total = db_manager.importar_parquet(caminhos)
+        print(f"💾 {total:,} registros importados em {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import itertools
 import random
 from datetime import date, timedelta
 import pandas as pd
@@ -11,46 +12,218 @@ fake = faker.Faker('pt_BR')
 faker.Faker.seed(42)
 random.seed(42)
 
+BANCOS_ENDOSSO = [
+    "Banco do Brasil S.A.",
+    "Itaú Unibanco S.A.",
+    "Bradesco S.A.",
+    "Santander Brasil S.A.",
+    "Caixa Econômica Federal",
+    "BTG Pactual S.A.",
+    "Safra S.A.",
+    "Banco Inter S.A."
+]
+
+PRAZOS = [30, 45, 60, 90]
+
+# Janela de emissão do caminho escalar: fake.date_between('-6m', 'today')
+DIAS_JANELA_EMISSAO = 182
+
+_HEX = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+_ZERO = ord("0")
+
+
+def _uuid4_vetorizado(rng: np.random.Generator, n: int) -> np.ndarray:
+    """n UUIDs v4 em texto, montados byte a byte sem objetos Python intermediários"""
+    brutos = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+    brutos[:, 6] = (brutos[:, 6] & 0x0F) | 0x40   # versão 4
+    brutos[:, 8] = (brutos[:, 8] & 0x3F) | 0x80   # variante RFC 4122
+
+    hexa = np.empty((n, 32), dtype=np.uint8)
+    hexa[:, 0::2] = _HEX[brutos >> 4]
+    hexa[:, 1::2] = _HEX[brutos & 0x0F]
+
+    texto = np.full((n, 36), ord("-"), dtype=np.uint8)
+    texto[:, 0:8] = hexa[:, 0:8]
+    texto[:, 9:13] = hexa[:, 8:12]
+    texto[:, 14:18] = hexa[:, 12:16]
+    texto[:, 19:23] = hexa[:, 16:20]
+    texto[:, 24:36] = hexa[:, 20:32]
+    return texto.view("S36").ravel().astype("U36")
+
+
+def _chaves_nfe_vetorizado(rng: np.random.Generator, emissao: np.ndarray) -> np.ndarray:
+    """Mesmo layout de `_gerar_chave_nfe`: UF(35) + AAMM + 20 dígitos aleatórios, completado com zeros até 44"""
+    n = len(emissao)
+    ano = emissao.astype("datetime64[Y]").astype(np.int64) + 1970
+    mes = emissao.astype("datetime64[M]").astype(np.int64) % 12 + 1
+
+    digitos = np.full((n, 44), _ZERO, dtype=np.uint8)
+    digitos[:, 0] = _ZERO + 3
+    digitos[:, 1] = _ZERO + 5
+    digitos[:, 2] = _ZERO + (ano % 100) // 10
+    digitos[:, 3] = _ZERO + ano % 10
+    digitos[:, 4] = _ZERO + mes // 10
+    digitos[:, 5] = _ZERO + mes % 10
+    # randint(10**19, 10**20 - 1): primeiro dígito 1-9, demais 0-9
+    digitos[:, 6] = _ZERO + rng.integers(1, 10, size=n, dtype=np.uint8)
+    digitos[:, 7:26] = _ZERO + rng.integers(0, 10, size=(n, 19), dtype=np.uint8)
+    return digitos.view("S44").ravel().astype("U44")
+
 class DuplicataFactory:
-    def __init__(self):
+    def __init__(self, seed=None):
+        """
+        Args:
+            seed: Semente de um gerador próprio (random.Random + Faker da instância),
+                independente do estado global. Sem seed, usa o `random` e o
+                Faker do módulo, como antes
+        """
+        if seed is None:
+            self.random = random
+            self.fake = fake
+        else:
+            self.random = random.Random(seed)
+            self.fake = faker.Faker('pt_BR')
+            self.fake.seed_instance(seed)
+
         self.cedentes = []
         self.sacados = []
         self.data_hoje = date.today()
 
+        # Índices montados em gerar_carteira_empresas (custo por linha O(1))
+        self._sacados_por_setor = {}    # setor do cedente -> índices dos sacados compatíveis
+        self._pesos_por_setor = {}      # setor do cedente -> pesos acumulados (None = uniforme)
+        self._produtos_por_setor = {}
+        self._cache_colunas = None      # colunas da carteira em arrays (caminho vetorizado)
+
     def _gerar_chave_nfe(self, uf, data_emissao):
         """Simula uma chave de acesso de NF-e válida (44 dígitos)"""
         # Formato: UF(2) + AAMM(4) + CNPJ(14) + Mod(2) + Serie(3) + Num(9) + Random(9) + DV(1)
         aamm = data_emissao.strftime("%y%m")
         cod_uf = "35"  # Simplificação
-        random_part = str(random.randint(10000000000000000000, 99999999999999999999))
+        random_part = str(self.random.randint(10000000000000000000, 99999999999999999999))
         chave = f"{cod_uf}{aamm}{random_part}"
         return chave[:44].ljust(44, '0')
 
-    def gerar_carteira_empresas(self, qtd_cedentes=50, qtd_sacados=200):
-        """Cria as empresas que farão parte do ecossistema"""
+    def gerar_carteira_empresas(self, qtd_cedentes=50, qtd_sacados=200, concentracao=0.0):
+        """
+        Cria as empresas que farão parte do ecossistema
+
+        Args:
+            concentracao: 0 = sacados sorteados uniformemente. Acima de 0, o volume
+                se concentra em sacados-chave (pesos Zipf: 1 / posição ** concentracao),
+                como nas carteiras reais
+        """
         print(f"🏭 Criando {qtd_cedentes} Cedentes e {qtd_sacados} Sacados...")
         
         for _ in range(qtd_cedentes):
-            setor = random.choice(list(SETORES.keys()))
+            setor = self.random.choice(list(SETORES.keys()))
             self.cedentes.append({
-                "id": fake.uuid4(),
-                "razao_social": fake.company(),
-                "cnpj": fake.cnpj(),
-                "estado": random.choice(ESTADOS),
+                "id": self.fake.uuid4(),
+                "razao_social": self.fake.company(),
+                "cnpj": self.fake.cnpj(),
+                "estado": self.random.choice(ESTADOS),
                 "setor": setor,
                 "tipo": "Cedente"
             })
 
         for _ in range(qtd_sacados):
-            setor = random.choice(list(SETORES.keys()))
+            setor = self.random.choice(list(SETORES.keys()))
             self.sacados.append({
-                "id": fake.uuid4(),
-                "razao_social": fake.company(),
-                "cnpj": fake.cnpj(),
-                "estado": random.choice(ESTADOS),
+                "id": self.fake.uuid4(),
+                "razao_social": self.fake.company(),
+                "cnpj": self.fake.cnpj(),
+                "estado": self.random.choice(ESTADOS),
                 "setor": setor,
                 "tipo": "Sacado"
             })
+
+        self._indexar_carteira(concentracao)
+
+    def _indexar_carteira(self, concentracao=0.0):
+        """
+        Pré-calcula, por setor de cedente, os sacados compatíveis pela matriz de
+        suprimentos (com pesos acumulados para random.choices) e os produtos do setor
+        """
+        setores = list(SETORES.keys())
+
+        if concentracao > 0:
+            # Sacados-chave sorteados uma vez: peso decai com a posição no ranking
+            ranking = list(range(len(self.sacados)))
+            self.random.shuffle(ranking)
+            pesos = [0.0] * len(self.sacados)
+            for posicao, indice in enumerate(ranking, 1):
+                pesos[indice] = 1 / posicao ** concentracao
+        else:
+            pesos = None
+
+        self._sacados_por_setor = {}
+        self._pesos_por_setor = {}
+        for setor in setores + [None]:
+            setores_compativeis = SUPRIMENTOS.get(setor, setores)
+            indices = [i for i, s in enumerate(self.sacados) if s['setor'] in setores_compativeis]
+
+            # Se não houver sacados compatíveis, usa qualquer sacado
+            if not indices:
+                indices = list(range(len(self.sacados)))
+
+            self._sacados_por_setor[setor] = indices
+            self._pesos_por_setor[setor] = (
+                list(itertools.accumulate(pesos[i] for i in indices)) if pesos else None
+            )
+
+        self._produtos_por_setor = {setor: SETORES[setor] for setor in setores}
+
+    def exportar_carteira(self) -> dict:
+        """Carteira e índices, para outra instância (ex: outro processo) gerar sobre as mesmas empresas"""
+        return {
+            "cedentes": self.cedentes,
+            "sacados": self.sacados,
+            "sacados_por_setor": self._sacados_por_setor,
+            "pesos_por_setor": self._pesos_por_setor,
+            "produtos_por_setor": self._produtos_por_setor,
+            "colunas": self._colunas_carteira()
+        }
+
+    def importar_carteira(self, carteira: dict):
+        self.cedentes = carteira["cedentes"]
+        self.sacados = carteira["sacados"]
+        self._sacados_por_setor = carteira["sacados_por_setor"]
+        self._pesos_por_setor = carteira["pesos_por_setor"]
+        self._produtos_por_setor = carteira["produtos_por_setor"]
+        self._cache_colunas = ((len(self.cedentes), len(self.sacados)), carteira["colunas"])
+
+    def _colunas_carteira(self) -> dict:
+        """Campos de cedentes e sacados como arrays numpy, montados uma vez por carteira"""
+        chave = (len(self.cedentes), len(self.sacados))
+        if self._cache_colunas is None or self._cache_colunas[0] != chave:
+            colunas = {
+                papel: {
+                    campo: np.array([e[campo] for e in empresas], dtype=object)
+                    for campo in ('id', 'razao_social', 'cnpj', 'estado', 'setor')
+                }
+                for papel, empresas in (('cedentes', self.cedentes), ('sacados', self.sacados))
+            }
+            self._cache_colunas = (chave, colunas)
+        return self._cache_colunas[1]
+
+    def _garantir_indices(self):
+        """Carteira atribuída direto (sem gerar_carteira_empresas/importar_carteira): indexa na primeira geração"""
+        if None not in self._sacados_por_setor:
+            self._indexar_carteira()
+
+    def _sortear_sacado(self, setor_cedente):
+        self._garantir_indices()
+        indices = self._sacados_por_setor.get(setor_cedente)
+        if indices is None:
+            indices = self._sacados_por_setor[None]
+            pesos = self._pesos_por_setor[None]
+        else:
+            pesos = self._pesos_por_setor[setor_cedente]
+
+        if pesos is None:
+            return self.sacados[self.random.choice(indices)]
+        return self.sacados[self.random.choices(indices, cum_weights=pesos)[0]]
+
     def _gerar_endossatario(self):
         """
         Gera endossatário (ou None para a maioria das duplicatas)
@@ -58,48 +231,32 @@ class DuplicataFactory:
         - Desses 10%: 70% são bancos (legítimos), 30% são não-bancários (suspeitos)
         """
         
-        return random.choice( [
-            "Banco do Brasil S.A.",
-            "Itaú Unibanco S.A.",
-            "Bradesco S.A.",
-            "Santander Brasil S.A.",
-            "Caixa Econômica Federal",
-            "BTG Pactual S.A.",
-            "Safra S.A.",
-            "Banco Inter S.A."
-        ])
+        return self.random.choice(BANCOS_ENDOSSO)
           
     def gerar_transacao_normal(self):
         """Gera uma duplicata saudável baseada na Matriz de Suprimentos"""
-        cedente = random.choice(self.cedentes)
+        cedente = self.random.choice(self.cedentes)
         setor_cedente = cedente['setor']
         
-        # Seleciona sacado compatível baseado na matriz de suprimentos
-        setores_compativeis = SUPRIMENTOS.get(setor_cedente, list(SETORES.keys()))
-        sacados_compativeis = [s for s in self.sacados if s['setor'] in setores_compativeis]
-        
-        # Se não houver sacados compatíveis, usa qualquer sacado
-        if not sacados_compativeis:
-            sacado = random.choice(self.sacados)
-        else:
-            sacado = random.choice(sacados_compativeis)
+        # Seleciona sacado compatível baseado na matriz de suprimentos (índice pré-calculado)
+        sacado = self._sortear_sacado(setor_cedente)
         
-        dt_emissao = fake.date_between(start_date='-6m', end_date='today')
-        prazo = random.choice([30, 45, 60, 90])
+        dt_emissao = self.fake.date_between(start_date='-6m', end_date='today')
+        prazo = self.random.choice(PRAZOS)
         dt_vencimento = dt_emissao + timedelta(days=prazo)
         
         # Gera produto baseado no setor do cedente
-        produtos_setor = SETORES.get(setor_cedente, ["Produto Genérico"])
-        produto = random.choice(produtos_setor)
+        produtos_setor = self._produtos_por_setor.get(setor_cedente, ["Produto Genérico"])
+        produto = self.random.choice(produtos_setor)
         
-        preco_base = random.uniform(1000, 10000)
-        valor_nota = round(preco_base * random.uniform(0.9, 1.1), 2)
+        preco_base = self.random.uniform(1000, 10000)
+        valor_nota = round(preco_base * self.random.uniform(0.9, 1.1), 2)
 
         endossatario = self._gerar_endossatario()
 
 
         return {
-            "id_duplicata": fake.uuid4(),
+            "id_duplicata": self.fake.uuid4(),
             "chave_nfe": self._gerar_chave_nfe(cedente['estado'], dt_emissao),
             "data_emissao": dt_emissao,
             "data_vencimento": dt_vencimento,
@@ -122,4 +279,96 @@ class DuplicataFactory:
             "tipo_fraude": "Nenhuma"
         }
 
+    def gerar_lote_vetorizado(self, n: int, seed: int = None, rng: np.random.Generator = None) -> pd.DataFrame:
+        """
+        Gera `n` duplicatas saudáveis de uma vez, coluna a coluna, com um
+        `numpy.random.Generator`. Mesmas distribuições de `gerar_transacao_normal`
+        (sacado compatível pela matriz de suprimentos, produto do setor do cedente,
+        prazos, valores, endossatário), sem criar um dict por linha.
+
+        Args:
+            n: Quantidade de duplicatas
+            seed: Semente do gerador (ignorada se `rng` for informado)
+            rng: Gerador já inicializado (permite continuar uma sequência entre lotes)
+
+        Returns:
+            DataFrame com as colunas da tabela `duplicatas` (exceto data_insercao)
+        """
+        if not self.cedentes or not self.sacados:
+            raise ValueError("Carteira vazia: chame gerar_carteira_empresas antes")
 
+        rng = rng if rng is not None else np.random.default_rng(seed)
+
+        self._garantir_indices()
+        colunas = self._colunas_carteira()
+        cedentes, sacados = colunas['cedentes'], colunas['sacados']
+
+        # Setores como códigos inteiros: as máscaras por setor ficam baratas
+        setores = list(SETORES.keys())
+        codigo_setor = {setor: i for i, setor in enumerate(setores)}
+        setor_cedentes = np.array([codigo_setor.get(c['setor'], -1) for c in self.cedentes])
+
+        # Cedente de cada linha
+        idx_cedente = rng.integers(0, len(self.cedentes), size=n)
+        setor_linha = setor_cedentes[idx_cedente]
+
+        # Sacado compatível e produto: sorteio vetorizado por setor do cedente
+        idx_sacado = np.empty(n, dtype=np.int64)
+        produto = np.empty(n, dtype=object)
+
+        for codigo in np.unique(setor_cedentes):
+            mascara = setor_linha == codigo
+            qtd = int(mascara.sum())
+            if qtd == 0:
+                continue
+            setor = setores[codigo] if codigo >= 0 else None
+
+            if setor not in self._sacados_por_setor:
+                setor = None
+            compativeis = np.asarray(self._sacados_por_setor[setor])
+            pesos = self._pesos_por_setor[setor]
+            if pesos is None:
+                idx_sacado[mascara] = compativeis[rng.integers(0, len(compativeis), size=qtd)]
+            else:
+                acumulados = np.asarray(pesos)
+                sorteio = rng.uniform(0, acumulados[-1], size=qtd)
+                idx_sacado[mascara] = compativeis[np.searchsorted(acumulados, sorteio, side='right')]
+
+            produtos_setor = np.array(self._produtos_por_setor.get(setor, ["Produto Genérico"]), dtype=object)
+            produto[mascara] = produtos_setor[rng.integers(0, len(produtos_setor), size=qtd)]
+
+        # Datas e prazos
+        hoje = np.datetime64(self.data_hoje, 'D')
+        data_emissao = hoje - rng.integers(0, DIAS_JANELA_EMISSAO + 1, size=n).astype('timedelta64[D]')
+        prazo = np.asarray(PRAZOS)[rng.integers(0, len(PRAZOS), size=n)]
+        data_vencimento = data_emissao + prazo.astype('timedelta64[D]')
+
+        # Valores
+        preco_base = rng.uniform(1000, 10000, size=n)
+        valor = np.round(preco_base * rng.uniform(0.9, 1.1, size=n), 2)
+
+        endossatario = np.asarray(BANCOS_ENDOSSO, dtype=object)[rng.integers(0, len(BANCOS_ENDOSSO), size=n)]
+
+        return pd.DataFrame({
+            "id_duplicata": _uuid4_vetorizado(rng, n),
+            "chave_nfe": _chaves_nfe_vetorizado(rng, data_emissao),
+            "data_emissao": data_emissao,
+            "data_vencimento": data_vencimento,
+            "prazo_dias": prazo,
+            "id_cedente": cedentes['id'][idx_cedente],
+            "nome_cedente": cedentes['razao_social'][idx_cedente],
+            "cnpj_cedente": cedentes['cnpj'][idx_cedente],
+            "estado_cedente": cedentes['estado'][idx_cedente],
+            "setor_cedente": cedentes['setor'][idx_cedente],
+            "id_sacado": sacados['id'][idx_sacado],
+            "nome_sacado": sacados['razao_social'][idx_sacado],
+            "cnpj_sacado": sacados['cnpj'][idx_sacado],
+            "estado_sacado": sacados['estado'][idx_sacado],
+            "setor_sacado": sacados['setor'][idx_sacado],
+            "produto": produto,
+            "valor": valor,
+            "aceite_sacado": np.ones(n, dtype=bool),
+            "endossatario": endossatario,
+            "label_fraude": np.zeros(n, dtype=np.int32),
+            "tipo_fraude": np.full(n, "Nenhuma", dtype=object)
+        })
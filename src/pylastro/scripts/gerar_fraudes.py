@@ -9,9 +9,51 @@ fake = Faker('pt_BR')
 Faker.seed(42)
 random.seed(42)
 
+class ReservatorioVitimas:
+    """
+    Amostra uniforme de tamanho fixo (reservoir sampling, algoritmo R) das
+    duplicatas legítimas já geradas. Substitui a lista completa do dataset
+    como fonte de vítimas da fraude de duplicidade: a memória fica limitada
+    a `capacidade` registros, qualquer que seja o tamanho da carga.
+
+    Suporta len() e indexação, então pode ser passado direto para
+    `FraudeInjector.criar_duplicidade`.
+    """
+
+    def __init__(self, capacidade=10000, rng=None):
+        self.capacidade = capacidade
+        self.random = rng if rng is not None else random
+        self.itens = []
+        self.vistos = 0
+
+    def observar(self, duplicata):
+        self.vistos += 1
+        if len(self.itens) < self.capacidade:
+            self.itens.append(duplicata)
+            return
+        posicao = self.random.randrange(self.vistos)
+        if posicao < self.capacidade:
+            self.itens[posicao] = duplicata
+
+    def observar_lote(self, lote):
+        for duplicata in lote:
+            self.observar(duplicata)
+
+    def __len__(self):
+        return len(self.itens)
+
+    def __getitem__(self, indice):
+        return self.itens[indice]
+
+
 class FraudeInjector:
     def __init__(self, factory):
         self.factory = factory
+
+        # Mesmo gerador da factory: com seed própria, a contaminação também
+        # fica independente do estado global
+        self.random = factory.random
+        self.fake = factory.fake
         
         # Lista de entidades suspeitas para receber endosso (Fraude C)
         self.laranjas = [
@@ -55,13 +97,13 @@ class FraudeInjector:
         # Valores redondos e suspeitos
         valores_suspeitos = [10000.00, 20000.00, 25000.00, 50000.00, 
                             75000.00, 100000.00, 150000.00, 200000.00]
-        base['valor'] = random.choice(valores_suspeitos)
+        base['valor'] = self.random.choice(valores_suspeitos)
         
         # Sacado não reconhece (sem aceite)
         base['aceite_sacado'] = False
         
         # Produto vago
-        base['produto'] = random.choice([
+        base['produto'] = self.random.choice([
             "Serviços Diversos",
             "Consultoria Geral",
             "Materiais Diversos",
@@ -69,7 +111,7 @@ class FraudeInjector:
         ])
         
         # Emissão muito recente (0-7 dias)
-        base['data_emissao'] = fake.date_between(start_date='-7d', end_date='today')
+        base['data_emissao'] = self.fake.date_between(start_date='-7d', end_date='today')
         
         base['label_fraude'] = 1
         base['tipo_fraude'] = "EMISSAO_FALSA"
@@ -92,13 +134,13 @@ class FraudeInjector:
             return self.factory.gerar_transacao_normal()
         
         # Escolhe uma vítima (duplicata legítima para clonar)
-        vitima = random.choice(dataset_existente)
+        vitima = self.random.choice(dataset_existente)
         
         # Cria um clone
         copia_fraude = vitima.copy()
         
         # Muda apenas o ID (para parecer documento novo)
-        copia_fraude['id_duplicata'] = fake.uuid4()
+        copia_fraude['id_duplicata'] = self.fake.uuid4()
         
         # MANTÉM a mesma chave_nfe (AQUI ESTÁ A FRAUDE!)
         # copia_fraude['chave_nfe'] já é igual ao original
@@ -122,7 +164,7 @@ class FraudeInjector:
         base = self.factory.gerar_transacao_normal()
         
         # Adiciona campo endossatário (se não existir na base)
-        base['endossatario'] = random.choice(self.laranjas)
+        base['endossatario'] = self.random.choice(self.laranjas)
         
         base['label_fraude'] = 1
         base['tipo_fraude'] = "ENDOSSO_INDEVIDO"
@@ -145,14 +187,14 @@ class FraudeInjector:
         # Força CNPJ similar (mesma raiz)
         cnpj_cedente = base['cnpj_cedente']
         raiz_cnpj = cnpj_cedente[:10]  # Pega os 8 dígitos + separadores
-        novo_sufixo = f"{random.randint(1000, 9999)}-{random.randint(10, 99)}"
+        novo_sufixo = f"{self.random.randint(1000, 9999)}-{self.random.randint(10, 99)}"
         base['cnpj_sacado'] = raiz_cnpj + novo_sufixo
         
         # Força mesmo estado
         base['estado_sacado'] = base['estado_cedente']
         
         # Valor alto (inflação artificial)
-        base['valor'] = round(random.uniform(50000, 200000), 2)
+        base['valor'] = round(self.random.uniform(50000, 200000), 2)
         
         base['label_fraude'] = 1
         base['tipo_fraude'] = "RELACAO_CIRCULAR"
@@ -171,24 +213,24 @@ class FraudeInjector:
         """
         base = self.factory.gerar_transacao_normal()
         
-        tipo_anomalia = random.choice(['curto', 'longo', 'vencida'])
+        tipo_anomalia = self.random.choice(['curto', 'longo', 'vencida'])
         
         if tipo_anomalia == 'curto':
             # Prazo urgente (1-5 dias)
-            prazo = random.randint(1, 5)
+            prazo = self.random.randint(1, 5)
             base['data_vencimento'] = base['data_emissao'] + timedelta(days=prazo)
             base['prazo_dias'] = prazo
             
         elif tipo_anomalia == 'longo':
             # Prazo excessivo (200-365 dias)
-            prazo = random.randint(200, 365)
+            prazo = self.random.randint(200, 365)
             base['data_vencimento'] = base['data_emissao'] + timedelta(days=prazo)
             base['prazo_dias'] = prazo
             
         else:  # vencida
             # Vencimento no passado (já expirou)
-            prazo = random.randint(30, 90)
-            base['data_emissao'] = fake.date_between(start_date='-6m', end_date='-3m')
+            prazo = self.random.randint(30, 90)
+            base['data_emissao'] = self.fake.date_between(start_date='-6m', end_date='-3m')
             base['data_vencimento'] = base['data_emissao'] + timedelta(days=prazo)
             base['prazo_dias'] = prazo
         
@@ -212,13 +254,13 @@ class FraudeInjector:
         # Setores pequenos com valores gigantes
         setores_pequenos = ['Varejo', 'Serviços', 'Alimentos']
         if base['setor_cedente'] not in setores_pequenos:
-            base['setor_cedente'] = random.choice(setores_pequenos)
+            base['setor_cedente'] = self.random.choice(setores_pequenos)
         
         # Valor absurdamente alto
-        base['valor'] = round(random.uniform(500000, 2000000), 2)
+        base['valor'] = round(self.random.uniform(500000, 2000000), 2)
         
         # Produto incompatível
-        base['produto'] = random.choice([
+        base['produto'] = self.random.choice([
             "Equipamentos Hospitalares de Alta Complexidade",
             "Turbinas Aeronáuticas",
             "Usina de Energia Solar Industrial"
@@ -254,29 +296,12 @@ class FraudeInjector:
         contadores = {tipo: 0 for tipo in tipos_fraude}
         
         for _ in range(qtd_fraudes):
-            tipo = random.choice(tipos_fraude)
-            
-            if tipo == 'A':
-                dataset.append(self.criar_emissao_falsa())
-                contadores['A'] += 1
-            elif tipo == 'B':
-                dataset.append(self.criar_duplicidade(dataset))
-                contadores['B'] += 1
-            elif tipo == 'C':
-                dataset.append(self.criar_endosso_indevido())
-                contadores['C'] += 1
-            elif tipo == 'D':
-                dataset.append(self.criar_relacao_suspeita())
-                contadores['D'] += 1
-            elif tipo == 'E':
-                dataset.append(self.criar_vencimento_suspeito())
-                contadores['E'] += 1
-            elif tipo == 'F':
-                dataset.append(self.criar_valor_incompativel())
-                contadores['F'] += 1
+            tipo = self.random.choice(tipos_fraude)
+            dataset.append(self._criar_fraude(tipo, dataset))
+            contadores[tipo] += 1
         
         # Embaralha tudo
-        random.shuffle(dataset)
+        self.random.shuffle(dataset)
         
         print(f"✅ Dataset final: {len(dataset)} registros")
         print(f"📈 Distribuição de fraudes:")
@@ -287,4 +312,39 @@ class FraudeInjector:
         print(f"   E - Vencimento Anômalo: {contadores['E']}")
         print(f"   F - Valor Incompatível: {contadores['F']}")
         
-        return dataset
\ No newline at end of file
+        return dataset
+
+    def _criar_fraude(self, tipo, vitimas):
+        if tipo == 'A':
+            return self.criar_emissao_falsa()
+        if tipo == 'B':
+            return self.criar_duplicidade(vitimas)
+        if tipo == 'C':
+            return self.criar_endosso_indevido()
+        if tipo == 'D':
+            return self.criar_relacao_suspeita()
+        if tipo == 'E':
+            return self.criar_vencimento_suspeito()
+        return self.criar_valor_incompativel()
+
+    def contaminar_lote(self, lote, qtd_fraudes, reservatorio):
+        """
+        Versão por lote de `contaminar_dataset`, para a carga em streaming.
+
+        Args:
+            lote: Duplicatas normais do lote (já observadas pelo reservatório)
+            qtd_fraudes: Fraudes a injetar neste lote
+            reservatorio: ReservatorioVitimas com a amostra das duplicatas já geradas
+
+        Returns:
+            (lote contaminado e embaralhado, contagem por tipo de fraude)
+        """
+        contadores = {tipo: 0 for tipo in ['A', 'B', 'C', 'D', 'E', 'F']}
+
+        for _ in range(qtd_fraudes):
+            tipo = self.random.choice(list(contadores))
+            lote.append(self._criar_fraude(tipo, reservatorio))
+            contadores[tipo] += 1
+
+        self.random.shuffle(lote)
+        return lote, contadores
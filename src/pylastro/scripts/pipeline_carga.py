@@ -0,0 +1,183 @@
+import queue
+import threading
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional
+
+from .gerar_fraudes import ReservatorioVitimas
+
+# Dependência opcional: só o carregador Parquet precisa
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+def gerar_lotes_contaminados(
+    factory,
+    injector,
+    qtd_duplicatas: int,
+    taxa_fraude: float,
+    tamanho_lote: int = 5000,
+    capacidade_reservatorio: int = 10000
+) -> Iterator[List[dict]]:
+    """
+    Gera a carga em lotes: `tamanho_lote` duplicatas normais por vez, mais as
+    fraudes proporcionais, embaralhadas dentro do lote.
+
+    O total de fraudes é o mesmo de `contaminar_dataset` (int(qtd * taxa)),
+    distribuído pelos lotes conforme a geração avança. As vítimas da fraude de
+    duplicidade saem de um reservatório de tamanho fixo, não do dataset inteiro.
+    """
+    reservatorio = ReservatorioVitimas(capacidade_reservatorio, rng=injector.random)
+    geradas = 0
+    fraudes = 0
+
+    while geradas < qtd_duplicatas:
+        qtd = min(tamanho_lote, qtd_duplicatas - geradas)
+        lote = [factory.gerar_transacao_normal() for _ in range(qtd)]
+        reservatorio.observar_lote(lote)
+        geradas += qtd
+
+        fraudes_lote = int(geradas * taxa_fraude) - fraudes
+        fraudes += fraudes_lote
+
+        lote, _ = injector.contaminar_lote(lote, fraudes_lote, reservatorio)
+        yield lote
+
+
+class CarregadorDuckDB:
+    """Grava cada lote direto na tabela `duplicatas`"""
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+
+    def escrever(self, lote: List[dict]):
+        self.db_manager.inserir_lote(lote)
+
+    def fechar(self):
+        pass
+
+
+class CarregadorParquet:
+    """
+    Grava os lotes em um único arquivo Parquet (um row group por lote).
+    O arquivo pode ser importado depois com `DuckDBManager.importar_parquet`.
+    """
+
+    def __init__(self, caminho):
+        if pa is None:
+            raise RuntimeError("Carregador Parquet indisponível: instale pyarrow")
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._escritor = None
+
+    @staticmethod
+    def esquema():
+        return pa.schema([
+            ("id_duplicata", pa.string()),
+            ("chave_nfe", pa.string()),
+            ("data_emissao", pa.date32()),
+            ("data_vencimento", pa.date32()),
+            ("prazo_dias", pa.int32()),
+            ("id_cedente", pa.string()),
+            ("nome_cedente", pa.string()),
+            ("cnpj_cedente", pa.string()),
+            ("estado_cedente", pa.string()),
+            ("setor_cedente", pa.string()),
+            ("id_sacado", pa.string()),
+            ("nome_sacado", pa.string()),
+            ("cnpj_sacado", pa.string()),
+            ("estado_sacado", pa.string()),
+            ("setor_sacado", pa.string()),
+            ("produto", pa.string()),
+            ("valor", pa.float64()),
+            ("aceite_sacado", pa.bool_()),
+            ("endossatario", pa.string()),
+            ("label_fraude", pa.int32()),
+            ("tipo_fraude", pa.string()),
+        ])
+
+    def escrever(self, lote: List[dict]):
+        tabela = pa.Table.from_pylist(lote, schema=self.esquema())
+        if self._escritor is None:
+            self._escritor = pq.ParquetWriter(self.caminho, tabela.schema)
+        self._escritor.write_table(tabela)
+
+    def fechar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+            self._escritor = None
+
+
+_FIM = object()
+
+
+def executar_pipeline(
+    lotes: Iterator[List[dict]],
+    carregador,
+    max_lotes_pendentes: int = 2,
+    ao_carregar: Optional[Callable[[int, int], None]] = None
+) -> int:
+    """
+    Geração e carga em paralelo, com memória limitada.
+
+    Uma thread produz os lotes e os coloca em uma fila de até
+    `max_lotes_pendentes`; a thread chamadora grava. Se a gravação ficar para
+    trás, a fila enche e a geração espera (backpressure).
+
+    Args:
+        lotes: Iterador de lotes (ex: gerar_lotes_contaminados)
+        carregador: Objeto com escrever(lote) e fechar()
+        ao_carregar: Callback (lotes gravados, registros gravados) após cada lote
+
+    Returns:
+        Total de registros gravados
+    """
+    fila = queue.Queue(maxsize=max_lotes_pendentes)
+    parar = threading.Event()
+    erros = []
+
+    def enfileirar(item):
+        while not parar.is_set():
+            try:
+                fila.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produzir():
+        try:
+            for lote in lotes:
+                if not enfileirar(lote):
+                    return
+        except Exception as e:
+            erros.append(e)
+        finally:
+            enfileirar(_FIM)
+
+    produtor = threading.Thread(target=produzir, name="pipeline-carga", daemon=True)
+    produtor.start()
+
+    total_lotes = 0
+    total_registros = 0
+    try:
+        while True:
+            lote = fila.get()
+            if lote is _FIM:
+                break
+            carregador.escrever(lote)
+            total_lotes += 1
+            total_registros += len(lote)
+            if ao_carregar:
+                ao_carregar(total_lotes, total_registros)
+    finally:
+        parar.set()
+        carregador.fechar()
+        produtor.join(timeout=5)
+
+    if erros:
+        raise erros[0]
+    return total_registros
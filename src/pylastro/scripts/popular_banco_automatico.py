@@ -3,16 +3,26 @@ from datetime import datetime
 
 from .gerar_dados import DuplicataFactory
 from .gerar_fraudes import FraudeInjector
+from .pipeline_carga import gerar_lotes_contaminados, executar_pipeline, CarregadorDuckDB
+from ..core.progresso_populacao import ProgressoPopulacao, progresso_populacao
 from ..models.populacao import ConfigPopulacao
 
 
-async def popular_banco_automatico(config: ConfigPopulacao, db_manager):
+async def popular_banco_automatico(config: ConfigPopulacao, db_manager, progresso: ProgressoPopulacao = progresso_populacao):
     """
     Popula automaticamente o banco na inicialização.
-    Pode ser executado em background (lifespan/startup).
+    Pode ser executado em background (lifespan/startup): todo o trabalho
+    (geração, fraudes, inserts) roda em uma thread do executor, fora do
+    event loop, e o andamento fica em `progresso`.
     """
+    return await asyncio.to_thread(popular_banco, config, db_manager, progresso)
+
+
+def popular_banco(config: ConfigPopulacao, db_manager, progresso: ProgressoPopulacao = progresso_populacao):
+    """Versão síncrona da população (bloqueante)"""
 
     inicio = datetime.now()
+    progresso.iniciar(config.qtd_duplicatas + int(config.qtd_duplicatas * config.taxa_fraude))
     resultado = {
         "em_andamento": True,
         "concluido": False,
@@ -29,6 +39,9 @@ async def popular_banco_automatico(config: ConfigPopulacao, db_manager):
 
         if total_existente > 0 and not config.forcar_limpeza:
             print(f"ℹ️  Banco já contém {total_existente} registros - pulando população")
+            # Banco criado antes dos perfis de entidade: calcula uma vez
+            db_manager.criar_tabelas_perfil()
+            progresso.mudar_fase("IGNORADO")
             resultado.update({"concluido": True})
             return resultado
 
@@ -49,37 +62,32 @@ async def popular_banco_automatico(config: ConfigPopulacao, db_manager):
             qtd_sacados=config.qtd_sacados
         )
 
-        # Gera duplicatas
-        print(f"📝 Gerando {config.qtd_duplicatas} duplicatas...")
-        dataset = []
-
-        tamanho_lote = 1000
-        for i in range(0, config.qtd_duplicatas, tamanho_lote):
-            lote_size = min(tamanho_lote, config.qtd_duplicatas - i)
-
-            for _ in range(lote_size):
-                dataset.append(factory.gerar_transacao_normal())
-
-            progresso = (i + lote_size) / config.qtd_duplicatas * 100
-            print(f"   📊 Progresso: {progresso:.1f}%")
-
-            await asyncio.sleep(0.01)
-
-        # Injeta fraudes
-        print(f"⚠️  Contaminando com fraudes ({config.taxa_fraude*100:.1f}%)...")
+        # Gera, contamina e insere em lotes (memória limitada a poucos lotes)
+        print(f"📝 Gerando {config.qtd_duplicatas} duplicatas com {config.taxa_fraude*100:.1f}% de fraudes...")
         injector = FraudeInjector(factory)
-        dataset_final = injector.contaminar_dataset(dataset, taxa_fraude=config.taxa_fraude)
-
-        # Insere no banco
-        print("💾 Inserindo no banco...")
-        tamanho_lote_insert = 5000
-        total_lotes = (len(dataset_final) + tamanho_lote_insert - 1) // tamanho_lote_insert
+        tamanho_lote = 5000
+        total_lotes = (config.qtd_duplicatas + tamanho_lote - 1) // tamanho_lote
+
+        def ao_carregar(lotes_gravados, registros_gravados):
+            progresso.registrar_inseridos(registros_gravados)
+            print(f"   💾 Lote {lotes_gravados}/{total_lotes} inserido ({registros_gravados:,} registros)")
+
+        def contar_gerados(lotes):
+            for lote in lotes:
+                progresso.registrar_gerados(len(lote))
+                yield lote
+
+        lotes = gerar_lotes_contaminados(
+            factory,
+            injector,
+            qtd_duplicatas=config.qtd_duplicatas,
+            taxa_fraude=config.taxa_fraude,
+            tamanho_lote=tamanho_lote
+        )
+        progresso.mudar_fase("GERANDO")
+        executar_pipeline(contar_gerados(lotes), CarregadorDuckDB(db_manager), ao_carregar=ao_carregar)
 
-        for idx, i in enumerate(range(0, len(dataset_final), tamanho_lote_insert), 1):
-            lote = dataset_final[i:i + tamanho_lote_insert]
-            db_manager.inserir_lote(lote)
-            print(f"   💾 Lote {idx}/{total_lotes} inserido")
-            await asyncio.sleep(0.01)
+        progresso.mudar_fase("FINALIZANDO")
 
         # Estatísticas
         total_inserido = db_manager.contar_registros()
@@ -94,6 +102,7 @@ async def popular_banco_automatico(config: ConfigPopulacao, db_manager):
         print(f"⏱️  Tempo de execução: {tempo_total:.2f}s")
         print("="*60 + "\n")
 
+        progresso.mudar_fase("CONCLUIDO")
         resultado["concluido"] = True
         return resultado
 
@@ -101,6 +110,7 @@ async def popular_banco_automatico(config: ConfigPopulacao, db_manager):
         print(f"\n❌ ERRO na população automática: {str(e)}")
         import traceback
         traceback.print_exc()
+        progresso.mudar_fase("ERRO", erro=str(e))
         resultado["erro"] = str(e)
         return resultado
 
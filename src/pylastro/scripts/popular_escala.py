@@ -0,0 +1,174 @@
+import argparse
+import math
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .gerar_dados import DuplicataFactory
+from .gerar_fraudes import FraudeInjector
+from .geracao_paralela import seed_do_shard
+from ..core.config import PERFIS_ESCALA
+from ..core.progresso_populacao import ProgressoPopulacao, progresso_populacao
+from ..models.populacao import PerfilEscala, ResultadoEscala
+
+# Vítimas da duplicidade: amostra do próprio lote (mantém cada lote independente)
+VITIMAS_POR_LOTE = 1000
+
+
+def obter_perfil(nome: str) -> PerfilEscala:
+    if nome not in PERFIS_ESCALA:
+        raise ValueError(f"Perfil desconhecido: {nome}. Disponíveis: {sorted(PERFIS_ESCALA)}")
+    return PerfilEscala(nome=nome, **PERFIS_ESCALA[nome])
+
+
+def gerar_lote_escala(carteira: dict, perfil: PerfilEscala, seed: int, indice: int) -> pd.DataFrame:
+    """
+    Gera o lote `indice` da carga: duplicatas normais pelo caminho vetorizado
+    e as fraudes proporcionais pelo FraudeInjector.
+
+    Cada lote depende só de (seed, indice): uma carga retomada produz
+    exatamente os mesmos lotes que a carga original produziria.
+    """
+    seed_lote = seed_do_shard(seed, indice)
+    inicio = indice * perfil.tamanho_lote
+    fim = min(inicio + perfil.tamanho_lote, perfil.qtd_duplicatas)
+
+    factory = DuplicataFactory(seed=seed_lote)
+    factory.importar_carteira(carteira)
+    rng = np.random.default_rng(seed_lote)
+
+    normais = factory.gerar_lote_vetorizado(fim - inicio, rng=rng)
+
+    qtd_fraudes = int(fim * perfil.taxa_fraude) - int(inicio * perfil.taxa_fraude)
+    if qtd_fraudes == 0:
+        return normais
+
+    vitimas = normais.iloc[rng.choice(len(normais), size=min(VITIMAS_POR_LOTE, len(normais)), replace=False)]
+    fraudes, _ = FraudeInjector(factory).contaminar_lote([], qtd_fraudes, vitimas.to_dict('records'))
+
+    fraudes = pd.DataFrame(fraudes)
+    for coluna in ('data_emissao', 'data_vencimento'):
+        fraudes[coluna] = pd.to_datetime(fraudes[coluna])
+
+    lote = pd.concat([normais, fraudes], ignore_index=True)
+    return lote.iloc[rng.permutation(len(lote))].reset_index(drop=True)
+
+
+def popular_perfil(
+    nome_perfil: str,
+    db_manager,
+    seed: int = 42,
+    reiniciar: bool = False,
+    progresso: ProgressoPopulacao = progresso_populacao
+) -> dict:
+    """
+    Popula o banco com um perfil de escala, em lotes, com checkpoint.
+
+    Cada lote é inserido na mesma transação que avança o checkpoint
+    (`carga_checkpoint`). Se a carga for interrompida, a próxima execução com
+    o mesmo (perfil, seed) continua do primeiro lote não gravado.
+
+    Args:
+        reiniciar: Apaga a tabela e o checkpoint antes de começar
+
+    Returns:
+        ResultadoEscala (dict) com a vazão de geração e de carga
+    """
+    perfil = obter_perfil(nome_perfil)
+    id_carga = f"{perfil.nome}:{seed}"
+    total_lotes = math.ceil(perfil.qtd_duplicatas / perfil.tamanho_lote)
+
+    db_manager.criar_tabela_checkpoint()
+    if reiniciar:
+        db_manager.limpar_tabela()
+        db_manager.remover_checkpoint(id_carga)
+    db_manager.criar_tabela()
+
+    checkpoint = db_manager.ler_checkpoint(id_carga)
+    lotes_concluidos = checkpoint[0] if checkpoint else 0
+    registros_anteriores = checkpoint[2] if checkpoint else 0
+
+    if checkpoint is None and db_manager.contar_registros() > 0:
+        raise ValueError("A tabela duplicatas já contém dados de outra carga: use reiniciar=True")
+
+    print(f"\n📐 Perfil '{perfil.nome}': {perfil.qtd_duplicatas:,} duplicatas em {total_lotes} lotes "
+          f"({perfil.qtd_cedentes:,} cedentes, {perfil.qtd_sacados:,} sacados)")
+    if lotes_concluidos:
+        print(f"♻️  Retomando do lote {lotes_concluidos + 1}/{total_lotes} ({registros_anteriores:,} registros já gravados)")
+
+    progresso.iniciar(perfil.qtd_duplicatas + int(perfil.qtd_duplicatas * perfil.taxa_fraude))
+    progresso.registrar_inseridos(registros_anteriores)
+
+    # Carteira determinística pela seed: a mesma em todas as execuções da carga
+    factory = DuplicataFactory(seed=seed)
+    factory.gerar_carteira_empresas(perfil.qtd_cedentes, perfil.qtd_sacados, concentracao=perfil.concentracao)
+    carteira = factory.exportar_carteira()
+
+    progresso.mudar_fase("GERANDO")
+    tempo_geracao = 0.0
+    tempo_carga = 0.0
+    registros = 0
+
+    try:
+        for indice in range(lotes_concluidos, total_lotes):
+            inicio = time.perf_counter()
+            lote = gerar_lote_escala(carteira, perfil, seed, indice)
+            gerado = time.perf_counter()
+            db_manager.inserir_lote_com_checkpoint(lote, id_carga, indice + 1, total_lotes)
+            carregado = time.perf_counter()
+
+            tempo_geracao += gerado - inicio
+            tempo_carga += carregado - gerado
+            registros += len(lote)
+            progresso.registrar_gerados(len(lote))
+            progresso.registrar_inseridos(registros_anteriores + registros)
+
+            print(f"   💾 Lote {indice + 1}/{total_lotes}: {len(lote):,} registros | "
+                  f"geração {len(lote) / (gerado - inicio):,.0f} linhas/s | "
+                  f"carga {len(lote) / (carregado - gerado):,.0f} linhas/s")
+    except Exception as e:
+        progresso.mudar_fase("ERRO", erro=str(e))
+        raise
+
+    progresso.mudar_fase("CONCLUIDO")
+
+    resultado = ResultadoEscala(
+        perfil=perfil.nome,
+        seed=seed,
+        lotes_total=total_lotes,
+        lotes_executados=total_lotes - lotes_concluidos,
+        lotes_retomados=lotes_concluidos,
+        registros_inseridos=registros_anteriores + registros,
+        tempo_geracao_s=round(tempo_geracao, 3),
+        tempo_carga_s=round(tempo_carga, 3),
+        linhas_por_segundo_geracao=round(registros / tempo_geracao, 1) if tempo_geracao else 0.0,
+        linhas_por_segundo_carga=round(registros / tempo_carga, 1) if tempo_carga else 0.0
+    )
+    print(f"✅ Perfil '{perfil.nome}' concluído: {resultado.registros_inseridos:,} registros | "
+          f"geração {resultado.linhas_por_segundo_geracao:,.0f} linhas/s | "
+          f"carga {resultado.linhas_por_segundo_carga:,.0f} linhas/s")
+    return resultado.model_dump()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="População do banco por perfil de escala")
+    parser.add_argument("--perfil", choices=sorted(PERFIS_ESCALA), default="pequeno")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", default=None, help="Arquivo DuckDB (padrão: o banco da API)")
+    parser.add_argument("--reiniciar", action="store_true", help="Descarta dados e checkpoint existentes")
+    args = parser.parse_args()
+
+    if args.db:
+        from ..db.duckdb import DuckDBManager
+        db_manager = DuckDBManager(Path(args.db))
+    else:
+        from ..core.dependencies import get_db_manager
+        db_manager = get_db_manager()
+
+    popular_perfil(args.perfil, db_manager, seed=args.seed, reiniciar=args.reiniciar)
+
+
+if __name__ == "__main__":
+    main()
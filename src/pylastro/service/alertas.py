@@ -0,0 +1,223 @@
+import queue
+import threading
+from collections import deque
+from typing import List, Optional
+
+import pandas as pd
+import requests
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+
+from ..core.config import (
+    AGENTE_HABILITADO, ALERTAS_SINKS, ALERTAS_WEBHOOK_URL, ALERTAS_FILA_MAX, ALERTAS_INVESTIGAR
+)
+from ..core.dependencies import get_db_manager
+from ..domain.regras_alerta import RegraAlerta, regras_padrao, avaliar_regras
+from ..models.duplicatas_fraudes import DuplicataItem, DuplicatasPayload
+
+_FIM = object()
+
+
+# --------------------------------------
+# SINKS (destinos dos alertas novos)
+# --------------------------------------
+class SinkFila:
+    """
+    Fila em memória no lugar de um broker (SQS, Kafka...): guarda os últimos
+    `maximo` alertas até alguém consumir em /alertas/fila
+    """
+
+    nome = "fila"
+
+    def __init__(self, maximo: int = ALERTAS_FILA_MAX):
+        self._itens = deque(maxlen=maximo)
+        self._lock = threading.Lock()
+
+    def enviar(self, alertas: List[dict]):
+        with self._lock:
+            self._itens.extend(alertas)
+
+    def consumir(self, maximo: int) -> List[dict]:
+        with self._lock:
+            return [self._itens.popleft() for _ in range(min(maximo, len(self._itens)))]
+
+    def __len__(self):
+        return len(self._itens)
+
+
+class SinkWebhook:
+    """POST {"alertas": [...]} na URL configurada (ex: o receptor local em /mocks/webhook/alertas)"""
+
+    nome = "webhook"
+
+    def __init__(self, url: str = ALERTAS_WEBHOOK_URL, timeout_s: float = 5.0):
+        self.url = url
+        self.timeout_s = timeout_s
+        self._sessao = requests.Session()
+
+    def enviar(self, alertas: List[dict]):
+        resposta = self._sessao.post(self.url, json={"alertas": alertas}, timeout=self.timeout_s)
+        resposta.raise_for_status()
+
+
+SINKS_DISPONIVEIS = {"fila": SinkFila, "webhook": SinkWebhook}
+
+
+# --------------------------------------
+# MOTOR
+# --------------------------------------
+class MotorAlertas:
+    """
+    Avalia as regras de alerta a cada micro-lote ingerido.
+
+    - Só as linhas do lote novo (já pontuadas) passam pelas regras: o custo
+      acompanha o tamanho do lote, não o da tabela
+    - Os alertas vão para a tabela `alertas` com INSERT OR IGNORE: a PK
+      regra:chave impede alertar de novo o mesmo caso
+    - Só os alertas novos seguem para os sinks e, com `investigar`, para a
+      fila de investigações do agente. O envio roda em uma thread própria:
+      um webhook lento não atrasa a ingestão
+    """
+
+    def __init__(
+        self,
+        db_manager,
+        regras: List[RegraAlerta] = None,
+        sinks: list = None,
+        investigar: bool = ALERTAS_INVESTIGAR
+    ):
+        self.db_manager = db_manager
+        self.regras = regras if regras is not None else regras_padrao()
+        self.sinks = sinks if sinks is not None else [SINKS_DISPONIVEIS[nome]() for nome in ALERTAS_SINKS]
+        self.investigar = investigar and AGENTE_HABILITADO
+
+        self._envios: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._contadores = {
+            "lotes_avaliados": 0, "linhas_avaliadas": 0, "disparos": 0,
+            "alertas_emitidos": 0, "falhas_envio": 0, "casos_investigacao": 0
+        }
+
+    # --------------------------------------
+    # CICLO DE VIDA
+    # --------------------------------------
+    def iniciar(self):
+        self.db_manager.criar_tabela_alertas()
+        self._thread = threading.Thread(target=self._loop_envio, name="alertas-envio", daemon=True)
+        self._thread.start()
+        destinos = ", ".join(sink.nome for sink in self.sinks) or "só tabela"
+        print(f"🚨 Alertas contínuos ativos ({len(self.regras)} regras; destinos: {destinos})")
+
+    def parar(self, timeout: float = 5.0):
+        """Envia o que já foi emitido e encerra a thread de envio"""
+        if self._thread is None:
+            return
+        self._envios.put(_FIM)
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    @property
+    def ativo(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def sink(self, nome: str):
+        return next((sink for sink in self.sinks if sink.nome == nome), None)
+
+    # --------------------------------------
+    # AVALIAÇÃO
+    # --------------------------------------
+    def avaliar(self, detector) -> int:
+        """
+        Roda na thread do ingestor, logo após a pontuação do micro-lote.
+
+        Args:
+            detector: DetectorFraudeRatios já pontuado com as linhas do lote
+
+        Returns:
+            Quantidade de alertas novos
+        """
+        df = detector.df
+        disparos = avaliar_regras(df, self.regras)
+        novos = self.db_manager.inserir_alertas(disparos) if not disparos.empty else disparos
+
+        with self._lock:
+            self._contadores["lotes_avaliados"] += 1
+            self._contadores["linhas_avaliadas"] += len(df)
+            self._contadores["disparos"] += len(disparos)
+            self._contadores["alertas_emitidos"] += len(novos)
+
+        if not novos.empty:
+            casos = None
+            if self.investigar:
+                casos = df[df["id_duplicata"].astype(str).isin(novos["id_duplicata"])]
+            self._envios.put((novos, detector, casos))
+        return len(novos)
+
+    # --------------------------------------
+    # ENVIO
+    # --------------------------------------
+    def _loop_envio(self):
+        while True:
+            item = self._envios.get()
+            if item is _FIM:
+                return
+            novos, detector, casos = item
+
+            alertas = jsonable_encoder(novos.to_dict(orient="records"))
+            for sink in self.sinks:
+                try:
+                    sink.enviar(alertas)
+                except Exception as e:
+                    with self._lock:
+                        self._contadores["falhas_envio"] += 1
+                    print(f"⚠️ Falha ao enviar {len(alertas)} alertas para '{sink.nome}': {e}")
+
+            if casos is not None:
+                try:
+                    self._enfileirar_investigacao(detector, casos)
+                except Exception as e:
+                    print(f"⚠️ Falha ao enfileirar investigação dos alertas: {e}")
+
+    def _enfileirar_investigacao(self, detector, casos: pd.DataFrame):
+        # Import tardio: a fila só existe nos workers com o agente habilitado
+        from .fila_investigacoes import get_fila_investigacoes
+
+        duplicatas = []
+        for suspeito in jsonable_encoder(detector.montar_relatorio(casos).to_dict(orient="records")):
+            # Remove campos que não devem ir para a LLM
+            suspeito.pop("label_fraude", None)
+            suspeito.pop("tipo_fraude_real", None)
+            try:
+                duplicatas.append(DuplicataItem(**suspeito))
+            except ValidationError:
+                # id_duplicata fora do formato UUID: o agente não aceita o caso
+                continue
+
+        if duplicatas:
+            get_fila_investigacoes().submeter(DuplicatasPayload(duplicatas=duplicatas))
+            with self._lock:
+                self._contadores["casos_investigacao"] += len(duplicatas)
+
+    def estado(self) -> dict:
+        with self._lock:
+            contadores = dict(self._contadores)
+        return {
+            "habilitado": self.ativo,
+            "regras": [regra.nome for regra in self.regras],
+            "sinks": [sink.nome for sink in self.sinks],
+            "investigar": self.investigar,
+            "pendentes_envio": self._envios.qsize(),
+            **contadores
+        }
+
+
+_motor: Optional[MotorAlertas] = None
+
+
+def get_motor_alertas() -> MotorAlertas:
+    """Instância única do motor de alertas por processo"""
+    global _motor
+    if _motor is None:
+        _motor = MotorAlertas(get_db_manager())
+    return _motor
@@ -1,10 +1,14 @@
 import pandas as pd
 from ..domain.detector_fraudes import DetectorFraudeRatios
+from ..core.metricas import metricas
+
+ETAPA = "pylastro_detector_etapa_segundos"
 
 class DetectorFraudeService:
 
     def __init__(self, df: pd.DataFrame):
-        self.detector = DetectorFraudeRatios(df)
+        with metricas.cronometrar(ETAPA, etapa="carga"):
+            self.detector = DetectorFraudeRatios(df)
 
     def executar(self, top_n:int = 20) -> dict:
         """
@@ -12,18 +16,24 @@ class DetectorFraudeService:
         retorna estrutura JSON serializável
         """
         # 1) features
-        self.detector.calcular_ratios_financeiros()
+        with metricas.cronometrar(ETAPA, etapa="ratios"):
+            self.detector.calcular_ratios_financeiros()
+        with metricas.cronometrar(ETAPA, etapa="entidades"):
+            self.detector.calcular_ratios_entidades()
 
         # 2) score
-        self.detector.calcular_risk_score()
+        with metricas.cronometrar(ETAPA, etapa="score"):
+            self.detector.calcular_risk_score()
 
         # 3) relatório (df)
-        relatorio_df = self.detector.gerar_relatorio(top_n=top_n)
+        with metricas.cronometrar(ETAPA, etapa="relatorio"):
+            relatorio_df = self.detector.gerar_relatorio(top_n=top_n)
 
         # 4) métricas (se existir label)
-        metricas = None
+        metricas_desempenho = None
         if 'label_fraude' in self.detector.df.columns:
-            metricas = self.detector.metricas_desempenho()
+            with metricas.cronometrar(ETAPA, etapa="metricas"):
+                metricas_desempenho = self.detector.metricas_desempenho()
 
         # montar resposta final JSON friendly
         return {
@@ -34,5 +44,5 @@ class DetectorFraudeService:
                 .to_dict()
             ),
             "top_suspeitos": relatorio_df.to_dict(orient="records"),
-            "metricas": metricas
+            "metricas": metricas_desempenho
         }
@@ -0,0 +1,354 @@
+import json
+import os
+import socket
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from ..core.config import FILA_WORKERS, FILA_MAX_TENTATIVAS, FILA_LEASE_S, FILA_JOBS_EM_CACHE
+from ..core.dependencies import get_db_manager
+from ..models.duplicatas_fraudes import DuplicatasPayload
+
+
+ROTA_FILA = "/investigacoes/jobs"
+
+
+class FilaInvestigacoes:
+    """
+    Fila durável de investigações do AntiFraudeAgente.
+
+    - Jobs e casos ficam nas tabelas `investigacao_jobs` / `investigacao_casos`
+    - Um pool de threads consome os casos PENDENTE
+    - Falhas voltam para a fila com backoff exponencial até `max_tentativas`
+    - Cada caso reservado leva o dono (worker) e um lease: se o dono morrer ou
+      o processo reiniciar, o caso volta a ser reservável quando o lease
+      expira, sem tirar de outros workers vivos os casos que eles estão
+      processando
+    """
+
+    def __init__(
+        self,
+        db_manager,
+        n_workers: int = FILA_WORKERS,
+        max_tentativas: int = FILA_MAX_TENTATIVAS,
+        lease_s: float = FILA_LEASE_S,
+        jobs_em_cache: int = FILA_JOBS_EM_CACHE
+    ):
+        self.db_manager = db_manager
+        self.n_workers = n_workers
+        self.max_tentativas = max_tentativas
+        self.lease_s = lease_s
+        self.jobs_em_cache = jobs_em_cache
+        # Identifica os workers deste processo nas reservas (host:pid:instância)
+        self.id_processo = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        # DuckDB aceita um escritor por vez: serializa as operações da fila
+        self._lock = threading.Lock()
+        self._novo_trabalho = threading.Event()
+        self._parar = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    # --------------------------------------
+    # CICLO DE VIDA
+    # --------------------------------------
+    def iniciar(self):
+        """Cria as tabelas e sobe os workers (casos com lease expirado são retomados por eles)"""
+        self.db_manager.criar_tabelas_investigacao()
+        print(f"📬 Fila de investigações ativa ({self.n_workers} workers)")
+
+        self._parar.clear()
+        for indice in range(self.n_workers):
+            thread = threading.Thread(
+                target=self._loop_worker,
+                args=(f"{self.id_processo}:{indice}",),
+                name=f"investigacao-{indice}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+        self._novo_trabalho.set()
+
+    def parar(self, timeout: float = 5.0):
+        """Sinaliza os workers e aguarda o caso em andamento terminar"""
+        self._parar.set()
+        self._novo_trabalho.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    # --------------------------------------
+    # ACESSO AO BANCO
+    # --------------------------------------
+    def _executar(self, query: str, params: Optional[list] = None, fetch: str = None):
+        with self._lock:
+            conn = self.db_manager.get_connection()
+            try:
+                cursor = conn.execute(query, params or [])
+                if fetch == "one":
+                    return cursor.fetchone()
+                if fetch == "all":
+                    return cursor.fetchall()
+                conn.commit()
+            finally:
+                conn.close()
+
+    # --------------------------------------
+    # SUBMISSÃO E CONSULTA
+    # --------------------------------------
+    def submeter(self, payload: DuplicatasPayload) -> dict:
+        """Persiste o job e seus casos como PENDENTE e acorda os workers"""
+        id_job = str(uuid.uuid4())
+        agora = datetime.now()
+
+        casos = [
+            [id_job, posicao, str(item.id_duplicata), json.dumps(jsonable_encoder(item), ensure_ascii=False), agora]
+            for posicao, item in enumerate(payload.duplicatas)
+        ]
+
+        with self._lock:
+            conn = self.db_manager.get_connection()
+            try:
+                conn.execute("BEGIN TRANSACTION")
+                conn.execute(
+                    "INSERT INTO investigacao_jobs (id_job, status, total_casos, criado_em, atualizado_em) VALUES (?, 'PENDENTE', ?, ?, ?)",
+                    [id_job, len(casos), agora, agora]
+                )
+                if casos:
+                    conn.executemany("""
+                        INSERT INTO investigacao_casos
+                            (id_job, posicao, id_duplicata, evento, status, tentativas, disponivel_em, atualizado_em)
+                        VALUES (?, ?, ?, ?, 'PENDENTE', 0, ?, now())
+                    """, casos)
+                conn.execute("COMMIT")
+            finally:
+                conn.close()
+
+        self._novo_trabalho.set()
+        return {"id_job": id_job, "total_casos": len(casos), "status": "PENDENTE"}
+
+    def status(self, id_job: str) -> Optional[dict]:
+        job = self._executar(
+            "SELECT status, total_casos, criado_em, atualizado_em FROM investigacao_jobs WHERE id_job = ?",
+            [id_job], fetch="one"
+        )
+        if not job:
+            return None
+
+        contagens = dict(self._executar(
+            "SELECT status, COUNT(*) FROM investigacao_casos WHERE id_job = ? GROUP BY status",
+            [id_job], fetch="all"
+        ))
+        total = job[1]
+        concluidos = contagens.get("CONCLUIDO", 0)
+        falhos = contagens.get("FALHOU", 0)
+
+        return {
+            "id_job": id_job,
+            "status": job[0],
+            "total_casos": total,
+            "pendentes": contagens.get("PENDENTE", 0),
+            "processando": contagens.get("PROCESSANDO", 0),
+            "concluidos": concluidos,
+            "falhos": falhos,
+            "percentual_concluido": round((concluidos + falhos) / total * 100, 2) if total else 100.0,
+            "criado_em": job[2],
+            "atualizado_em": job[3]
+        }
+
+    def resultados(self, id_job: str) -> Optional[dict]:
+        job = self._executar("SELECT status FROM investigacao_jobs WHERE id_job = ?", [id_job], fetch="one")
+        if not job:
+            return None
+
+        linhas = self._executar("""
+            SELECT posicao, id_duplicata, status, tentativas, resultado, erro
+            FROM investigacao_casos WHERE id_job = ? ORDER BY posicao
+        """, [id_job], fetch="all")
+
+        return {
+            "id_job": id_job,
+            "status": job[0],
+            "casos": [
+                {
+                    "posicao": posicao,
+                    "id_duplicata": id_duplicata,
+                    "status": status,
+                    "tentativas": tentativas,
+                    "resultado": json.loads(resultado) if resultado else None,
+                    "erro": erro
+                }
+                for posicao, id_duplicata, status, tentativas, resultado, erro in linhas
+            ]
+        }
+
+    # --------------------------------------
+    # WORKERS
+    # --------------------------------------
+    def _reservar_caso(self, dono: str):
+        """
+        Marca o próximo caso disponível como PROCESSANDO em nome de `dono` e o
+        retorna. Disponível: PENDENTE já liberado pelo backoff, ou PROCESSANDO
+        com o lease vencido (dono morto ou reiniciado).
+        """
+        agora = datetime.now()
+        with self._lock:
+            conn = self.db_manager.get_connection()
+            try:
+                caso = conn.execute("""
+                    SELECT id_job, posicao, evento, tentativas
+                    FROM investigacao_casos
+                    WHERE (status = 'PENDENTE' AND disponivel_em <= ?)
+                       OR (status = 'PROCESSANDO' AND lease_ate < ?)
+                    ORDER BY disponivel_em, posicao
+                    LIMIT 1
+                """, [agora, agora]).fetchone()
+                if not caso:
+                    return None
+
+                id_job, posicao = caso[0], caso[1]
+                conn.execute("""
+                    UPDATE investigacao_casos
+                    SET status = 'PROCESSANDO', tentativas = tentativas + 1, dono = ?, lease_ate = ?,
+                        atualizado_em = now()
+                    WHERE id_job = ? AND posicao = ?
+                """, [dono, agora + timedelta(seconds=self.lease_s), id_job, posicao])
+                conn.execute("""
+                    UPDATE investigacao_jobs SET status = 'PROCESSANDO', atualizado_em = now()
+                    WHERE id_job = ? AND status = 'PENDENTE'
+                """, [id_job])
+                conn.commit()
+                return {
+                    "id_job": id_job, "posicao": posicao, "evento": json.loads(caso[2]),
+                    "tentativas": caso[3] + 1, "dono": dono
+                }
+            finally:
+                conn.close()
+
+    def _finalizar_caso(self, caso: dict, resultado: dict = None, erro: str = None) -> bool:
+        """
+        Grava o resultado ou devolve o caso para a fila (retry com backoff).
+        Se o lease venceu e outro worker reservou o caso, nada é gravado.
+
+        Returns:
+            True quando este era o último caso em aberto do job
+        """
+        if erro is None:
+            status, disponivel_em = "CONCLUIDO", datetime.now()
+        elif caso["tentativas"] < self.max_tentativas:
+            status = "PENDENTE"
+            disponivel_em = datetime.now() + timedelta(seconds=2 ** caso["tentativas"])
+        else:
+            status, disponivel_em = "FALHOU", datetime.now()
+
+        with self._lock:
+            conn = self.db_manager.get_connection()
+            try:
+                # A reserva é identificada por dono + tentativas
+                gravados = conn.execute("""
+                    UPDATE investigacao_casos
+                    SET status = ?, resultado = ?, erro = ?, disponivel_em = ?, dono = NULL, lease_ate = NULL,
+                        atualizado_em = now()
+                    WHERE id_job = ? AND posicao = ? AND dono = ? AND tentativas = ?
+                """, [
+                    status,
+                    json.dumps(resultado, ensure_ascii=False) if resultado is not None else None,
+                    erro, disponivel_em, caso["id_job"], caso["posicao"], caso["dono"], caso["tentativas"]
+                ]).fetchone()[0]
+                if not gravados:
+                    print(f"⚠️ Lease do caso {caso['id_job']}:{caso['posicao']} venceu; resultado descartado")
+                    return False
+
+                restantes, falhos = conn.execute("""
+                    SELECT
+                        COUNT(*) FILTER (WHERE status IN ('PENDENTE', 'PROCESSANDO')),
+                        COUNT(*) FILTER (WHERE status = 'FALHOU')
+                    FROM investigacao_casos WHERE id_job = ?
+                """, [caso["id_job"]]).fetchone()
+
+                if restantes == 0:
+                    conn.execute("""
+                        UPDATE investigacao_jobs SET status = ?, atualizado_em = now() WHERE id_job = ?
+                    """, ["CONCLUIDO_COM_FALHAS" if falhos else "CONCLUIDO", caso["id_job"]])
+                else:
+                    conn.execute(
+                        "UPDATE investigacao_jobs SET atualizado_em = now() WHERE id_job = ?",
+                        [caso["id_job"]]
+                    )
+                conn.commit()
+            finally:
+                conn.close()
+
+        if status == "PENDENTE":
+            self._novo_trabalho.set()
+        return restantes == 0
+
+    def _precarregar_job(self, agente, id_job: str) -> List[str]:
+        """Carrega a base de verdade de todos os casos do job de uma vez"""
+        ids = [i[0] for i in self._executar(
+            "SELECT id_duplicata FROM investigacao_casos WHERE id_job = ?",
+            [id_job], fetch="all"
+        )]
+        agente.precarregar_verdades(ids)
+        return ids
+
+    def _loop_worker(self, dono: str):
+        agente = None
+        # id_job -> ids pré-carregados, do menos para o mais recente. Sai do
+        # cache (e da base de verdade do agente) quando o job termina ou
+        # quando passa de `jobs_em_cache` jobs
+        jobs_precarregados = OrderedDict()
+
+        while not self._parar.is_set():
+            try:
+                caso = self._reservar_caso(dono)
+            except Exception as e:
+                print(f"⚠️ Erro ao reservar caso da fila: {e}")
+                caso = None
+
+            if caso is None:
+                self._novo_trabalho.wait(timeout=1.0)
+                self._novo_trabalho.clear()
+                continue
+
+            try:
+                if agente is None:
+                    # Import tardio: o stack do agente só carrega quando há trabalho na fila
+                    from ..domain.agente import AntiFraudeAgente
+
+                    agente = AntiFraudeAgente()
+
+                if caso["id_job"] in jobs_precarregados:
+                    jobs_precarregados.move_to_end(caso["id_job"])
+                else:
+                    jobs_precarregados[caso["id_job"]] = self._precarregar_job(agente, caso["id_job"])
+                    while len(jobs_precarregados) > self.jobs_em_cache:
+                        agente.descartar_verdades(jobs_precarregados.popitem(last=False)[1])
+
+                resultado = agente.analisar_caso(caso["evento"], rota=ROTA_FILA)
+
+                if resultado.get("status") in ("ERRO_INTERNO", "PROVEDOR_INDISPONIVEL"):
+                    job_concluido = self._finalizar_caso(caso, resultado=resultado, erro=resultado.get("detail"))
+                else:
+                    job_concluido = self._finalizar_caso(caso, resultado=resultado)
+
+            except Exception as e:
+                job_concluido = self._finalizar_caso(caso, erro=str(e))
+
+            if job_concluido and caso["id_job"] in jobs_precarregados:
+                agente.descartar_verdades(jobs_precarregados.pop(caso["id_job"]))
+
+
+_fila: Optional[FilaInvestigacoes] = None
+
+
+def get_fila_investigacoes() -> FilaInvestigacoes:
+    """Instância única da fila por processo"""
+    global _fila
+    if _fila is None:
+        _fila = FilaInvestigacoes(get_db_manager())
+    return _fila
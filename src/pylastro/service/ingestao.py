@@ -0,0 +1,251 @@
+import asyncio
+import time
+from typing import List, Optional
+
+import pandas as pd
+
+from ..core.config import (
+    INGESTAO_LOTE_MAX, INGESTAO_JANELA_MS, INGESTAO_PENDENTES_MAX, INGESTAO_TTL_REFERENCIA_S,
+    ALERTAS_HABILITADO
+)
+from ..core.dependencies import get_db_manager
+from ..core.metricas import metricas
+from ..domain.detector_fraudes import DetectorFraudeRatios
+from .alertas import get_motor_alertas
+
+ETAPA = "pylastro_ingestao_etapa_segundos"
+
+COLUNAS_DUPLICATA = [
+    "id_duplicata", "chave_nfe", "data_emissao", "data_vencimento", "prazo_dias",
+    "id_cedente", "nome_cedente", "cnpj_cedente", "estado_cedente", "setor_cedente",
+    "id_sacado", "nome_sacado", "cnpj_sacado", "estado_sacado", "setor_sacado",
+    "produto", "valor", "aceite_sacado", "endossatario", "label_fraude", "tipo_fraude",
+]
+
+_FIM = object()
+
+
+class IngestaoSobrecarregada(Exception):
+    """Mais linhas aguardando gravação do que o limite: o cliente deve tentar de novo"""
+
+
+class PedidoGrandeDemais(Exception):
+    """O pedido sozinho passa de `pendentes_max` linhas: nunca seria aceito"""
+
+
+class PontuacaoFalhou(Exception):
+    """O micro-lote foi gravado, mas a pontuação depois do COMMIT falhou"""
+
+
+class _GravacaoFalhou(Exception):
+    """A transação do micro-lote falhou: nada foi gravado (o erro original fica em __cause__)"""
+
+
+class IngestorDuplicatas:
+    """
+    Ingestão em tempo real com micro-lotes e score na chegada.
+
+    - As requisições entram em uma fila do event loop; uma única tarefa
+      escritora junta os pedidos em micro-lotes (até `lote_max` linhas ou
+      `janela_ms` após o primeiro pedido) e grava cada micro-lote em uma
+      transação, numa thread (o DuckDB aceita um escritor por vez)
+    - Na mesma transação conta as ocorrências de cada chave_nfe do lote na
+      tabela; média/desvio por setor e p75 do valor vêm de estatísticas de
+      referência calculadas em SQL e renovadas a cada `ttl_referencia_s`
+    - Backpressure: com mais de `pendentes_max` linhas aguardando, `submeter`
+      levanta IngestaoSobrecarregada (a rota responde 429); um pedido maior que
+      `pendentes_max` é recusado na hora com PedidoGrandeDemais (413)
+    - Se a transação de um micro-lote falhar (ex: id_duplicata repetido),
+      cada pedido é regravado sozinho: só o pedido com problema recebe o erro.
+      Uma falha depois do COMMIT (pontuação) não é repetida: as linhas já
+      estão gravadas e os pedidos recebem PontuacaoFalhou
+    - Com `motor_alertas`, as regras de alerta rodam sobre as linhas pontuadas
+      de cada micro-lote gravado (ver MotorAlertas)
+    """
+
+    def __init__(
+        self,
+        db_manager,
+        lote_max: int = INGESTAO_LOTE_MAX,
+        janela_ms: float = INGESTAO_JANELA_MS,
+        pendentes_max: int = INGESTAO_PENDENTES_MAX,
+        ttl_referencia_s: float = INGESTAO_TTL_REFERENCIA_S,
+        motor_alertas=None
+    ):
+        self.db_manager = db_manager
+        self.motor_alertas = motor_alertas
+        self.lote_max = lote_max
+        self.janela_s = janela_ms / 1000
+        self.pendentes_max = pendentes_max
+        self.ttl_referencia_s = ttl_referencia_s
+
+        # Estado do event loop (sem lock: só a tarefa escritora e as rotas async mexem)
+        self._fila: Optional[asyncio.Queue] = None
+        self._tarefa: Optional[asyncio.Task] = None
+        self.pendentes = 0
+
+        # Estado da thread de gravação (um micro-lote por vez)
+        self._referencia: Optional[dict] = None
+        self._referencia_em = 0.0
+
+    # --------------------------------------
+    # CICLO DE VIDA
+    # --------------------------------------
+    async def iniciar(self):
+        # A tabela `duplicatas` é criada pela população do lifespan
+        self._fila = asyncio.Queue()
+        self._tarefa = asyncio.create_task(self._loop_escritor())
+        print(f"📥 Ingestão ativa (micro-lotes de até {self.lote_max} linhas / {self.janela_s * 1000:.0f} ms)")
+
+    async def parar(self):
+        """Grava o que já foi aceito e encerra a tarefa escritora"""
+        if self._tarefa is None:
+            return
+        self._fila.put_nowait(_FIM)
+        await self._tarefa
+        self._tarefa = None
+
+    @property
+    def ativo(self) -> bool:
+        return self._tarefa is not None and not self._tarefa.done()
+
+    # --------------------------------------
+    # SUBMISSÃO
+    # --------------------------------------
+    async def submeter(self, registros: List[dict]) -> tuple:
+        """
+        Enfileira os registros e aguarda a gravação do micro-lote.
+
+        Returns:
+            (DataFrame id_duplicata/risk_score/classificacao_risco/freq_chave_nfe
+             na ordem dos registros, tamanho do micro-lote)
+        """
+        if len(registros) > self.pendentes_max:
+            raise PedidoGrandeDemais(
+                f"{len(registros)} linhas no pedido; o máximo é {self.pendentes_max}"
+            )
+        if self.pendentes + len(registros) > self.pendentes_max:
+            raise IngestaoSobrecarregada(f"{self.pendentes} linhas aguardando gravação")
+
+        futuro = asyncio.get_running_loop().create_future()
+        self.pendentes += len(registros)
+        self._fila.put_nowait((registros, futuro))
+        return await futuro
+
+    # --------------------------------------
+    # ESCRITOR
+    # --------------------------------------
+    async def _loop_escritor(self):
+        loop = asyncio.get_running_loop()
+        encerrar = False
+
+        while not encerrar:
+            item = await self._fila.get()
+            if item is _FIM:
+                break
+
+            pedidos = [item]
+            linhas = len(item[0])
+            prazo = loop.time() + self.janela_s
+
+            while linhas < self.lote_max:
+                restante = prazo - loop.time()
+                if restante <= 0:
+                    break
+                try:
+                    proximo = await asyncio.wait_for(self._fila.get(), restante)
+                except asyncio.TimeoutError:
+                    break
+                if proximo is _FIM:
+                    encerrar = True
+                    break
+                pedidos.append(proximo)
+                linhas += len(proximo[0])
+
+            try:
+                await self._processar(pedidos)
+            finally:
+                self.pendentes -= linhas
+
+    async def _processar(self, pedidos: list):
+        try:
+            resultados = await asyncio.to_thread(self._gravar_e_pontuar, [registros for registros, _ in pedidos])
+        except _GravacaoFalhou as e:
+            if len(pedidos) > 1:
+                for pedido in pedidos:
+                    await self._processar([pedido])
+                return
+            if not pedidos[0][1].done():
+                pedidos[0][1].set_exception(e.__cause__)
+            return
+        except Exception as e:
+            for _, futuro in pedidos:
+                if not futuro.done():
+                    futuro.set_exception(PontuacaoFalhou(str(e)))
+            return
+
+        for (_, futuro), resultado in zip(pedidos, resultados):
+            # O cliente pode ter desistido (requisição cancelada)
+            if not futuro.done():
+                futuro.set_result(resultado)
+
+    def _gravar_e_pontuar(self, lotes: List[List[dict]]) -> list:
+        """Roda na thread: grava o micro-lote e pontua cada linha"""
+        with metricas.cronometrar(ETAPA, etapa="gravacao"):
+            try:
+                df = pd.DataFrame([registro for registros in lotes for registro in registros], columns=COLUNAS_DUPLICATA)
+                chaves = self.db_manager.inserir_e_contar_chaves(df)
+            except Exception as e:
+                # Antes ou durante a transação: nada foi gravado, pode repetir por pedido
+                raise _GravacaoFalhou() from e
+
+        with metricas.cronometrar(ETAPA, etapa="pontuacao"):
+            referencia = self._referencia_atual(df)
+            detector = DetectorFraudeRatios(df)
+            detector.calcular_ratios_financeiros(referencia={**referencia, "chaves": chaves})
+            # Perfis (já com o lote) só das entidades do lote: lookup por chave
+            detector.calcular_ratios_entidades(perfis=self.db_manager.perfis_entidades(df))
+            detector.calcular_risk_score()
+
+        if self.motor_alertas is not None and self.motor_alertas.ativo:
+            with metricas.cronometrar(ETAPA, etapa="alertas"):
+                try:
+                    self.motor_alertas.avaliar(detector)
+                except Exception as e:
+                    # O lote já está gravado: falha nos alertas não derruba a ingestão
+                    print(f"⚠️ Falha ao avaliar alertas do micro-lote: {e}")
+
+        pontuado = detector.df[["id_duplicata", "risk_score", "classificacao_risco", "freq_chave_nfe"]]
+        resultados = []
+        inicio = 0
+        for registros in lotes:
+            resultados.append((pontuado.iloc[inicio:inicio + len(registros)], len(df)))
+            inicio += len(registros)
+        return resultados
+
+    def _referencia_atual(self, df: pd.DataFrame) -> dict:
+        """Estatísticas de valor da base; renova no TTL ou quando chega um setor novo"""
+        expirada = time.monotonic() - self._referencia_em > self.ttl_referencia_s
+        setor_novo = (
+            self._referencia is not None
+            and not df["setor_cedente"].isin(self._referencia["setores"].index).all()
+        )
+        if self._referencia is None or expirada or setor_novo:
+            with metricas.cronometrar(ETAPA, etapa="referencia"):
+                self._referencia = self.db_manager.estatisticas_valor()
+            self._referencia_em = time.monotonic()
+        return self._referencia
+
+
+_ingestor: Optional[IngestorDuplicatas] = None
+
+
+def get_ingestor() -> IngestorDuplicatas:
+    """Instância única do ingestor por processo"""
+    global _ingestor
+    if _ingestor is None:
+        _ingestor = IngestorDuplicatas(
+            get_db_manager(),
+            motor_alertas=get_motor_alertas() if ALERTAS_HABILITADO else None
+        )
+    return _ingestor
@@ -1,23 +1,139 @@
 
-from typing import Optional, List, Dict
+import asyncio
+import threading
+import time
+from typing import Optional, List, Dict, AsyncIterator
 from fastapi.encoders import jsonable_encoder
 from ..service.detector_fraude import DetectorFraudeRatios
-from ..domain.agente import AntiFraudeAgente
 from ..models.duplicatas_fraudes import DuplicatasPayload
 
 class SimularAlertaService:
-    def __init__(self):
+    def __init__(self, rota: str = "/relatorios/simular_alerta_bi"):
+        # Import tardio: LangChain/LangGraph só carregam na primeira requisição ao agente
+        from ..domain.agente import AntiFraudeAgente
+
         self.antifraude = AntiFraudeAgente()
         self.resultados = []
+        # Rota de origem, usada na contabilização de tokens
+        self.rota = rota
 
     def alerta(self, payload: DuplicatasPayload):
         resultados = []
+
+        # Resolve a base de verdade de todo o lote em uma única consulta
+        self.antifraude.precarregar_verdades(
+            [str(item.id_duplicata) for item in payload.duplicatas]
+        )
         
         for item in payload.duplicatas:
             # item é um DuplicataItem
             resultados.append(
-                self.antifraude.analisar_caso(jsonable_encoder(item))
+                self.antifraude.analisar_caso(jsonable_encoder(item), rota=self.rota)
             )
         
         return resultados
 
+    async def alerta_stream(
+        self,
+        payload: DuplicatasPayload,
+        cancelamento: threading.Event,
+        max_concorrencia: int = 4,
+        intervalo_heartbeat: float = 10.0
+    ) -> AsyncIterator[Dict]:
+        """
+        Investiga as duplicatas em paralelo e emite cada veredito assim que fica pronto.
+
+        Eventos emitidos (dicts):
+        - inicio: total de casos
+        - resultado: veredito de um caso (com id_duplicata)
+        - progresso: concluídos/total após cada resultado
+        - heartbeat: nenhum caso terminou em `intervalo_heartbeat` segundos
+        - fim: resumo da execução
+
+        Ao encerrar o gerador (fim normal ou desconexão do cliente) o evento
+        `cancelamento` é sinalizado: casos ainda na fila não chegam a chamar o LLM
+        e os que estão em andamento param antes da próxima chamada.
+        """
+        itens = payload.duplicatas
+        total = len(itens)
+        inicio = time.perf_counter()
+
+        await asyncio.to_thread(
+            self.antifraude.precarregar_verdades,
+            [str(item.id_duplicata) for item in itens]
+        )
+
+        semaforo = asyncio.Semaphore(max_concorrencia)
+
+        async def investigar(item):
+            async with semaforo:
+                if cancelamento.is_set():
+                    return {"detail": "Investigação cancelada antes da conclusão", "status": "CANCELADO"}
+                return await asyncio.to_thread(
+                    self.antifraude.analisar_caso,
+                    jsonable_encoder(item),
+                    cancelamento,
+                    self.rota
+                )
+
+        tarefas = {
+            asyncio.create_task(investigar(item)): str(item.id_duplicata)
+            for item in itens
+        }
+        pendentes = set(tarefas)
+        concluidos = 0
+
+        try:
+            yield {"evento": "inicio", "total": total}
+
+            while pendentes:
+                prontas, pendentes = await asyncio.wait(
+                    pendentes,
+                    timeout=intervalo_heartbeat,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                decorrido = round(time.perf_counter() - inicio, 3)
+
+                if not prontas:
+                    yield {
+                        "evento": "heartbeat",
+                        "concluidos": concluidos,
+                        "total": total,
+                        "decorrido_s": decorrido
+                    }
+                    continue
+
+                for tarefa in prontas:
+                    concluidos += 1
+                    try:
+                        resultado = tarefa.result()
+                    except Exception as e:
+                        resultado = {
+                            "detail": f"Erro crítico na execução do agente: {str(e)}",
+                            "status": "ERRO_INTERNO"
+                        }
+
+                    yield {
+                        "evento": "resultado",
+                        "id_duplicata": tarefas[tarefa],
+                        "resultado": resultado
+                    }
+                    yield {
+                        "evento": "progresso",
+                        "concluidos": concluidos,
+                        "total": total,
+                        "decorrido_s": decorrido
+                    }
+
+            yield {
+                "evento": "fim",
+                "concluidos": concluidos,
+                "total": total,
+                "decorrido_s": round(time.perf_counter() - inicio, 3)
+            }
+
+        finally:
+            cancelamento.set()
+            for tarefa in pendentes:
+                tarefa.cancel()
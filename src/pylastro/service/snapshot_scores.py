@@ -0,0 +1,212 @@
+import threading
+import time
+from functools import cached_property
+import numpy as np
+import pandas as pd
+from ..core.dependencies import get_db_connection
+from ..domain.detector_fraudes import DetectorFraudeRatios
+from ..core.metricas import metricas
+
+ETAPA = "pylastro_detector_etapa_segundos"
+
+
+class ScoresCalculados:
+    """Resultado do pipeline de scoring sobre a tabela inteira (somente leitura)"""
+
+    def __init__(self, detector: DetectorFraudeRatios, versao: tuple):
+        self.detector = detector
+        self.versao = versao
+        self.calculado_em = time.monotonic()
+
+        # Agregados prontos: não mudam enquanto a versão da tabela for a mesma
+        self.resumo_risco = (
+            detector.df['classificacao_risco']
+            .value_counts()
+            .sort_index()
+            .to_dict()
+        )
+        self.metricas = None
+        if 'label_fraude' in detector.df.columns:
+            with metricas.cronometrar(ETAPA, etapa="metricas"):
+                self.metricas = detector.metricas_desempenho()
+
+    @property
+    def df(self) -> pd.DataFrame:
+        return self.detector.df
+
+    def top_suspeitos(self, top_n: int = 20) -> pd.DataFrame:
+        """Relatório dos `top_n` maiores scores (tabela de top_suspeitos)"""
+        with metricas.cronometrar(ETAPA, etapa="relatorio"):
+            return self.detector.gerar_relatorio(top_n=top_n)
+
+    def executar(self, top_n: int = 20) -> dict:
+        """Mesmo formato de DetectorFraudeService.executar, sem recalcular o score"""
+        return {
+            "resumo_risco": self.resumo_risco,
+            "top_suspeitos": self.top_suspeitos(top_n).to_dict(orient="records"),
+            "metricas": self.metricas
+        }
+
+    def selecionar(
+        self,
+        quantidade: int = 1,
+        classificacoes: list | None = None,
+        score_min: float | None = None,
+        score_max: float | None = None,
+        top_n: int = 10,
+        seed: int | None = None
+    ) -> pd.DataFrame:
+        """
+        Sorteia `quantidade` suspeitos já pontuados.
+
+        Sem filtros, sorteia entre os `top_n` maiores scores. Com filtros, sorteia
+        entre as duplicatas das classificações e/ou faixa de score informadas.
+        """
+        df = self.detector.df
+
+        if not classificacoes and score_min is None and score_max is None:
+            candidatos = df.nlargest(top_n, 'risk_score')
+        else:
+            mascara = pd.Series(True, index=df.index)
+            if classificacoes:
+                mascara &= df['classificacao_risco'].isin(classificacoes)
+            if score_min is not None:
+                mascara &= df['risk_score'] >= score_min
+            if score_max is not None:
+                mascara &= df['risk_score'] <= score_max
+            candidatos = df[mascara]
+
+        if candidatos.empty:
+            return self.detector.montar_relatorio(candidatos)
+
+        amostra = candidatos.sample(n=min(quantidade, len(candidatos)), random_state=seed)
+        return self.detector.montar_relatorio(amostra)
+
+
+    @cached_property
+    def _ranking(self) -> pd.DataFrame:
+        """Snapshot ordenado por (risk_score DESC, id_duplicata ASC), base da paginação"""
+        return (
+            self.detector.df
+            .sort_values(['risk_score', 'id_duplicata'], ascending=[False, True], kind='mergesort')
+            .reset_index(drop=True)
+        )
+
+    def _posicao_apos(self, score: float, id_duplicata: str) -> int:
+        """Índice da primeira linha depois da chave (score, id) via busca binária"""
+        ordenado = self._ranking
+        negativo = -ordenado['risk_score'].to_numpy()
+        esquerda = int(np.searchsorted(negativo, -score, side='left'))
+        direita = int(np.searchsorted(negativo, -score, side='right'))
+        ids_empatados = ordenado['id_duplicata'].to_numpy()[esquerda:direita]
+        return esquerda + int(np.searchsorted(ids_empatados, id_duplicata, side='right'))
+
+    def pagina_ranking(
+        self,
+        limite: int = 50,
+        apos: tuple | None = None,
+        classificacoes: list | None = None,
+        setor: str | None = None,
+        estado: str | None = None,
+        data_inicio=None,
+        data_fim=None,
+        valor_min: float | None = None,
+        valor_max: float | None = None
+    ) -> tuple:
+        """
+        Página do ranking de risco a partir da chave `apos` (score, id_duplicata).
+
+        A posição inicial é localizada por busca binária e os filtros são
+        aplicados em blocos a partir dela, parando assim que a página enche:
+        o custo depende do tamanho da página, não do total de duplicatas.
+
+        Returns:
+            (relatorio da página, há_mais_páginas)
+        """
+        ordenado = self._ranking
+        posicao = self._posicao_apos(*apos) if apos else 0
+        bloco = max(limite * 4, 1000)
+
+        def filtrar(fatia: pd.DataFrame) -> pd.DataFrame:
+            mascara = pd.Series(True, index=fatia.index)
+            if classificacoes:
+                mascara &= fatia['classificacao_risco'].isin(classificacoes)
+            if setor is not None:
+                mascara &= fatia['setor_cedente'] == setor
+            if estado is not None:
+                mascara &= fatia['estado_cedente'] == estado
+            if data_inicio is not None:
+                mascara &= fatia['data_emissao'] >= pd.Timestamp(data_inicio)
+            if data_fim is not None:
+                mascara &= fatia['data_emissao'] <= pd.Timestamp(data_fim)
+            if valor_min is not None:
+                mascara &= fatia['valor'] >= valor_min
+            if valor_max is not None:
+                mascara &= fatia['valor'] <= valor_max
+            return fatia[mascara]
+
+        selecionados = []
+        encontrados = 0
+        while posicao < len(ordenado) and encontrados <= limite:
+            fatia = filtrar(ordenado.iloc[posicao:posicao + bloco])
+            selecionados.append(fatia)
+            encontrados += len(fatia)
+            posicao += bloco
+
+        pagina = pd.concat(selecionados) if selecionados else ordenado.iloc[0:0]
+        ha_mais = len(pagina) > limite
+        return self.detector.montar_relatorio(pagina.head(limite)), ha_mais
+
+
+class SnapshotScores:
+    """
+    Cache do scoring completo da tabela `duplicatas`.
+
+    A versão da tabela (COUNT(*), MAX(data_insercao)) é verificada a cada acesso
+    com uma consulta barata; o scoring só é refeito quando a tabela muda ou
+    após `ttl_segundos` (o ratio de vencimento depende da data atual).
+    """
+
+    def __init__(self, ttl_segundos: float = 300):
+        self.ttl_segundos = ttl_segundos
+        self._atual: ScoresCalculados | None = None
+        self._lock = threading.Lock()
+
+    def obter(self) -> ScoresCalculados:
+        conn = get_db_connection()
+        try:
+            versao = tuple(conn.execute(
+                "SELECT COUNT(*), MAX(data_insercao) FROM duplicatas"
+            ).fetchone())
+
+            with self._lock:
+                atual = self._atual
+                if (
+                    atual is not None
+                    and atual.versao == versao
+                    and time.monotonic() - atual.calculado_em < self.ttl_segundos
+                ):
+                    return atual
+
+                with metricas.cronometrar(ETAPA, etapa="carga"):
+                    df = conn.execute("SELECT * FROM duplicatas").df()
+                    detector = DetectorFraudeRatios(df)
+                with metricas.cronometrar(ETAPA, etapa="ratios"):
+                    detector.calcular_ratios_financeiros()
+                with metricas.cronometrar(ETAPA, etapa="entidades"):
+                    detector.calcular_ratios_entidades()
+                with metricas.cronometrar(ETAPA, etapa="score"):
+                    detector.calcular_risk_score()
+
+                self._atual = ScoresCalculados(detector, versao)
+                return self._atual
+        finally:
+            conn.close()
+
+    def invalidar(self):
+        with self._lock:
+            self._atual = None
+
+
+# Instância compartilhada pelo processo
+snapshot_scores = SnapshotScores()
@@ -0,0 +1,18 @@
+import uuid
+from datetime import date
+
+
+def duplicata(**campos) -> dict:
+    """Registro completo no layout da tabela `duplicatas` (campos sobrescrevíveis)"""
+    registro = {
+        "id_duplicata": str(uuid.uuid4()), "chave_nfe": uuid.uuid4().hex,
+        "data_emissao": date(2026, 10, 1), "data_vencimento": date(2026, 12, 1), "prazo_dias": 61,
+        "id_cedente": "c-1", "nome_cedente": "Cedente", "cnpj_cedente": "12.345.678/0001-90",
+        "estado_cedente": "SP", "setor_cedente": "Tecnologia",
+        "id_sacado": "s-1", "nome_sacado": "Sacado", "cnpj_sacado": "98.765.432/0001-10",
+        "estado_sacado": "RJ", "setor_sacado": "Tecnologia",
+        "produto": "SSD", "valor": 1234.56, "aceite_sacado": True, "endossatario": "Banco do Brasil S.A.",
+        "label_fraude": None, "tipo_fraude": None,
+    }
+    registro.update(campos)
+    return registro
@@ -0,0 +1,81 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+from pylastro.db.duckdb import DuckDBManager
+from pylastro.domain.detector_fraudes import DetectorFraudeRatios
+from pylastro.service.alertas import MotorAlertas, SinkFila
+from pylastro.service.ingestao import IngestorDuplicatas
+
+from .fabrica import duplicata
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    gerenciador = DuckDBManager(tmp_path / "alertas.duckdb")
+    gerenciador.criar_tabela()
+    return gerenciador
+
+
+@pytest.fixture
+def motor(db_manager):
+    motor = MotorAlertas(db_manager, sinks=[SinkFila()], investigar=False)
+    motor.iniciar()
+    yield motor
+    motor.parar()
+
+
+def ingerir_lotes(db_manager, motor, lotes: list):
+    """Cada item de `lotes` vira um micro-lote próprio (submetido só depois do anterior gravar)"""
+    async def principal():
+        ingestor = IngestorDuplicatas(db_manager, janela_ms=1, motor_alertas=motor)
+        await ingestor.iniciar()
+        try:
+            for lote in lotes:
+                await ingestor.submeter(lote)
+        finally:
+            await ingestor.parar()
+    asyncio.run(principal())
+
+
+def alertas_da_regra(db_manager, regra: str) -> list:
+    return db_manager.listar_alertas(regra=regra, limite=1000)
+
+
+def test_chave_nfe_repetida_alerta_uma_vez_entre_lotes(db_manager, motor):
+    ingerir_lotes(db_manager, motor, [
+        [duplicata(chave_nfe="chave-x")],                                   # 1ª ocorrência: sem alerta
+        [duplicata(chave_nfe="chave-x")],                                   # 2ª: alerta
+        [duplicata(chave_nfe="chave-x"), duplicata(chave_nfe="chave-x")],   # 3ª e 4ª: já alertada
+    ])
+
+    alertas = alertas_da_regra(db_manager, "chave_nfe_repetida")
+    assert [a["id_alerta"] for a in alertas] == ["chave_nfe_repetida:chave-x"]
+
+    # Disparou nos lotes 2 e 3, mas só o primeiro disparo chega aos sinks
+    motor.parar()
+    enviados = [a for a in motor.sink("fila").consumir(1000) if a["regra"] == "chave_nfe_repetida"]
+    assert len(enviados) == 1
+
+
+def test_copias_no_mesmo_lote_geram_um_alerta(db_manager, motor):
+    ingerir_lotes(db_manager, motor, [[duplicata(chave_nfe="chave-y") for _ in range(3)]])
+    assert len(alertas_da_regra(db_manager, "chave_nfe_repetida")) == 1
+
+
+def test_reavaliar_o_mesmo_lote_nao_emite_de_novo(db_manager, motor):
+    df = pd.DataFrame([duplicata(valor=900_000.0, aceite_sacado=False, endossatario="Factoring Sul Ltda")
+                       for _ in range(3)])
+    db_manager.inserir_dataframe(df.copy())
+    detector = DetectorFraudeRatios(df)
+    detector.calcular_ratios_financeiros()
+    detector.calcular_risk_score()
+
+    primeira = motor.avaliar(detector)
+    assert primeira > 0
+    assert motor.avaliar(detector) == 0
+
+    # Só os alertas novos seguem para os sinks
+    motor.parar()
+    assert len(motor.sink("fila").consumir(1000)) == primeira
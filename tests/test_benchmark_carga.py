@@ -0,0 +1,19 @@
+from pylastro.scripts.benchmark_carga import imprimir_resumo
+
+
+def test_resumo_sem_requisicoes_concluidas(capsys):
+    imprimir_resumo({
+        "duracao_s": 1.0,
+        "total": {"requisicoes": 0, "erros": 0, "taxa_erro": 0.0, "rps": 0.0,
+                  "p50_ms": None, "p95_ms": None, "p99_ms": None},
+        "por_rota": {}
+    })
+    linha_total = capsys.readouterr().out.strip().splitlines()[-1]
+    assert linha_total.startswith("TOTAL") and "-" in linha_total
+
+
+def test_resumo_com_latencias(capsys):
+    rota = {"requisicoes": 10, "erros": 1, "taxa_erro": 0.1, "rps": 5.0, "p50_ms": 12.3, "p95_ms": 40.0, "p99_ms": 55.5}
+    imprimir_resumo({"duracao_s": 2.0, "total": rota, "por_rota": {"GET /view/kpis-gerais": rota}})
+    saida = capsys.readouterr().out
+    assert "12.3" in saida and "55.5" in saida and "10.0%" in saida
@@ -0,0 +1,156 @@
+import time
+
+import pytest
+
+from pylastro.core.controle_taxa import CircuitBreaker, ControladorLLM, ProvedorIndisponivel, TokenBucket
+
+
+class ErroProvedor(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"erro {status_code}")
+        self.status_code = status_code
+
+
+def controlador(**kwargs) -> ControladorLLM:
+    parametros = dict(
+        rpm=0, tpm=0, max_tentativas=1, limiar_falhas=1,
+        tempo_aberto_s=0.05, backoff_base_s=0, backoff_max_s=0
+    )
+    parametros.update(kwargs)
+    return ControladorLLM(**parametros)
+
+
+def falhar(erro):
+    def funcao():
+        raise erro
+    return funcao
+
+
+# --------------------------------------
+# CIRCUIT BREAKER
+# --------------------------------------
+def test_circuito_abre_apos_limiar_de_falhas():
+    circuito = CircuitBreaker(limiar_falhas=2, tempo_aberto_s=60)
+    circuito.registrar_falha()
+    assert circuito.estado == CircuitBreaker.FECHADO
+    circuito.registrar_falha()
+    assert circuito.estado == CircuitBreaker.ABERTO
+    assert not circuito.permitir()
+
+
+def test_sucesso_zera_falhas_consecutivas():
+    circuito = CircuitBreaker(limiar_falhas=2, tempo_aberto_s=60)
+    circuito.registrar_falha()
+    circuito.registrar_sucesso()
+    circuito.registrar_falha()
+    assert circuito.estado == CircuitBreaker.FECHADO
+
+
+def test_semi_aberto_libera_uma_unica_chamada_de_teste():
+    circuito = CircuitBreaker(limiar_falhas=1, tempo_aberto_s=0.01)
+    circuito.registrar_falha()
+    time.sleep(0.02)
+    assert circuito.permitir()
+    assert circuito.estado == CircuitBreaker.SEMI_ABERTO
+    assert not circuito.permitir()
+
+
+def test_teste_com_sucesso_fecha_e_com_falha_reabre():
+    circuito = CircuitBreaker(limiar_falhas=1, tempo_aberto_s=0.01)
+    circuito.registrar_falha()
+    time.sleep(0.02)
+    assert circuito.permitir()
+    circuito.registrar_falha()
+    assert circuito.estado == CircuitBreaker.ABERTO
+
+    time.sleep(0.02)
+    assert circuito.permitir()
+    circuito.registrar_sucesso()
+    assert circuito.estado == CircuitBreaker.FECHADO
+    assert circuito.permitir()
+
+
+def test_liberar_teste_permite_nova_chamada_de_teste():
+    circuito = CircuitBreaker(limiar_falhas=1, tempo_aberto_s=0.01)
+    circuito.registrar_falha()
+    time.sleep(0.02)
+    assert circuito.permitir()
+    circuito.liberar_teste()
+    assert circuito.estado == CircuitBreaker.SEMI_ABERTO
+    assert circuito.permitir()
+
+
+# --------------------------------------
+# CONTROLADOR
+# --------------------------------------
+def test_erro_definitivo_no_teste_nao_trava_o_circuito():
+    llm = controlador()
+
+    with pytest.raises(ErroProvedor):
+        llm.executar(falhar(ErroProvedor(503)))
+    assert llm.circuito.estado == CircuitBreaker.ABERTO
+
+    time.sleep(0.06)
+    with pytest.raises(ValueError):
+        llm.executar(falhar(ValueError("prompt inválido")))
+    assert llm.circuito.estado == CircuitBreaker.SEMI_ABERTO
+
+    assert llm.executar(lambda: "ok") == "ok"
+    assert llm.circuito.estado == CircuitBreaker.FECHADO
+
+
+def test_circuito_aberto_recusa_sem_chamar_o_provedor():
+    llm = controlador(tempo_aberto_s=60)
+    with pytest.raises(ErroProvedor):
+        llm.executar(falhar(ErroProvedor(503)))
+
+    chamadas = []
+    with pytest.raises(ProvedorIndisponivel):
+        llm.executar(lambda: chamadas.append(1))
+    assert chamadas == []
+    assert llm.metricas()["rejeitadas_circuito_aberto"] == 1
+
+
+def test_erro_transitorio_e_repetido_ate_o_sucesso():
+    llm = controlador(max_tentativas=3, limiar_falhas=5)
+    respostas = iter([ErroProvedor(429), ErroProvedor(503), "ok"])
+
+    def funcao():
+        resposta = next(respostas)
+        if isinstance(resposta, Exception):
+            raise resposta
+        return resposta
+
+    assert llm.executar(funcao) == "ok"
+    metricas = llm.metricas()
+    assert metricas["retries"] == 2
+    assert metricas["throttles_429"] == 1
+    assert metricas["estado_circuito"] == CircuitBreaker.FECHADO
+
+
+# --------------------------------------
+# TOKEN BUCKET
+# --------------------------------------
+def test_token_bucket_consome_e_espera_reabastecer():
+    balde = TokenBucket(capacidade=2, taxa=100)
+    assert balde.adquirir() == 0.0
+    assert balde.adquirir() == 0.0
+    assert balde.adquirir() > 0
+
+
+def test_token_bucket_debito_negativo_atrasa_proxima_aquisicao():
+    balde = TokenBucket(capacidade=10, taxa=1000)
+    balde.debitar(15)
+    assert balde.adquirir(1) > 0
+
+
+@pytest.mark.parametrize("capacidade, taxa", [(0, 0), (60, 0), (0, 1)])
+def test_token_bucket_sem_limite_quando_zerado(capacidade, taxa):
+    balde = TokenBucket(capacidade=capacidade, taxa=taxa)
+    balde.debitar(100)
+    assert balde.adquirir(50) == 0.0
+
+
+def test_controlador_com_rpm_e_tpm_zerados():
+    llm = controlador()
+    assert llm.executar(lambda: "ok", tokens_estimados=500) == "ok"
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from pylastro.domain.detector_fraudes import DetectorFraudeRatios
+
+from .fabrica import duplicata
+
+
+def referencia(setores: dict, chaves: dict) -> dict:
+    return {
+        "setores": pd.DataFrame.from_dict(setores, orient="index", columns=["mean", "std"]),
+        "valor_p75": 10_000.0,
+        "chaves": pd.Series(chaves),
+    }
+
+
+def pontuar(linhas: list, referencia: dict = None) -> pd.DataFrame:
+    detector = DetectorFraudeRatios(pd.DataFrame(linhas))
+    detector.calcular_ratios_financeiros(referencia=referencia)
+    detector.calcular_risk_score()
+    return detector.df
+
+
+def test_setor_com_uma_duplicata_na_referencia_nao_gera_score_nulo():
+    # STDDEV_SAMP de uma linha é NULL
+    df = pontuar([duplicata(chave_nfe="chave-1", setor_cedente="Novo")], referencia({"Novo": (1234.56, np.nan)}, {"chave-1": 1}))
+    assert df["risk_score"].notna().all()
+    assert str(df["classificacao_risco"].iloc[0]) == "BAIXO"
+
+
+def test_setor_ausente_da_referencia_tem_zscore_zero():
+    df = pontuar([duplicata(chave_nfe="chave-1", setor_cedente="Novo")], referencia({"Tecnologia": (10.0, 2.0)}, {"chave-1": 1}))
+    assert df["zscore_valor"].iloc[0] == 0
+    assert df["risk_score"].notna().all()
+
+
+def test_setor_unico_no_dataframe_sem_referencia():
+    df = pontuar([duplicata(), duplicata(setor_cedente="Moda")])
+    assert df["risk_score"].notna().all()
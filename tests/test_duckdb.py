@@ -0,0 +1,192 @@
+import random
+import threading
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from pylastro.db.duckdb import DuckDBManager
+from pylastro.domain.detector_fraudes import DetectorFraudeRatios
+
+from .fabrica import duplicata
+
+
+def test_escritas_simultaneas_no_mesmo_perfil(tmp_path):
+    db_manager = DuckDBManager(tmp_path / "concorrencia.duckdb")
+    db_manager.criar_tabela()
+    erros = []
+
+    def escrever(metodo):
+        try:
+            for _ in range(10):
+                # Mesmo cedente/sacado em todas as threads: todas fazem upsert nas mesmas linhas de perfil
+                metodo(pd.DataFrame([duplicata() for _ in range(5)]))
+        except Exception as e:
+            erros.append(e)
+
+    threads = [
+        threading.Thread(target=escrever, args=(metodo,))
+        for metodo in (db_manager.inserir_dataframe, db_manager.inserir_e_contar_chaves) * 2
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert erros == []
+    conn = db_manager.get_connection()
+    try:
+        assert conn.execute("SELECT qtd_duplicatas FROM perfil_par").fetchall() == [(200,)]
+        assert conn.execute("SELECT qtd_duplicatas FROM perfil_cedente").fetchall() == [(200,)]
+    finally:
+        conn.close()
+
+
+def historico(n: int = 120, semente: int = 7) -> pd.DataFrame:
+    """Duplicatas variadas entre poucos cedentes/sacados, com endossatários bancários e não bancários"""
+    gerador = random.Random(semente)
+    endossatarios = [None, "Banco Itaú S.A.", "BTG Pactual", "FIDC Scapa Ltda", "Factoring Sul Ltda"]
+    return pd.DataFrame([
+        duplicata(
+            id_cedente=f"c-{gerador.randint(1, 4)}", id_sacado=f"s-{gerador.randint(1, 5)}",
+            valor=round(gerador.uniform(100, 50_000), 2), aceite_sacado=gerador.random() > 0.3,
+            endossatario=gerador.choice(endossatarios),
+            data_emissao=date(2026, 1, 1) + timedelta(days=gerador.randint(0, 200))
+        )
+        for _ in range(n)
+    ])
+
+
+def ler_tabela(db_manager, tabela: str, chaves: list) -> pd.DataFrame:
+    conn = db_manager.get_connection()
+    try:
+        df = conn.execute(f"SELECT * EXCLUDE (atualizado_em) FROM {tabela} ORDER BY {', '.join(chaves)}").df()
+    finally:
+        conn.close()
+    return df.set_index(chaves)
+
+
+def test_perfis_incrementais_iguais_a_agregacao_completa(tmp_path):
+    df = historico()
+    incremental = DuckDBManager(tmp_path / "incremental.duckdb")
+    incremental.criar_tabela()
+    for i, inicio in enumerate(range(0, len(df), 30)):
+        lote = df.iloc[inicio:inicio + 30]
+        # Alterna os dois caminhos de escrita que atualizam os perfis
+        if i % 2:
+            incremental.inserir_e_contar_chaves(lote.copy())
+        else:
+            incremental.inserir_dataframe(lote.copy())
+
+    detector = DetectorFraudeRatios(df.copy())
+    detector.calcular_ratios_financeiros()
+    completo = detector.df
+
+    cedentes = ler_tabela(incremental, "perfil_cedente", ["id_cedente"])
+    esperado = completo.groupby("id_cedente").agg(
+        qtd_duplicatas=("id_duplicata", "size"),
+        valor_total=("valor", "sum"),
+        qtd_sem_aceite=("sem_aceite", "sum"),
+        qtd_endosso_nao_bancario=("endosso_suspeito", "sum"),
+        qtd_sacados=("id_sacado", "nunique"),
+        qtd_endossatarios=("endossatario", "nunique"),
+        primeira_emissao=("data_emissao", "min"),
+        ultima_emissao=("data_emissao", "max"),
+    )
+    for coluna in ["qtd_duplicatas", "qtd_sem_aceite", "qtd_endosso_nao_bancario", "qtd_sacados", "qtd_endossatarios"]:
+        assert cedentes[coluna].tolist() == esperado[coluna].tolist(), coluna
+    assert np.allclose(cedentes["valor_total"].astype(float), esperado["valor_total"])
+    assert pd.to_datetime(cedentes["primeira_emissao"]).tolist() == pd.to_datetime(esperado["primeira_emissao"]).tolist()
+    assert pd.to_datetime(cedentes["ultima_emissao"]).tolist() == pd.to_datetime(esperado["ultima_emissao"]).tolist()
+
+    sacados = ler_tabela(incremental, "perfil_sacado", ["id_sacado"])
+    esperado = completo.groupby("id_sacado").agg(
+        qtd_duplicatas=("id_duplicata", "size"),
+        qtd_sem_aceite=("sem_aceite", "sum"),
+        qtd_cedentes=("id_cedente", "nunique"),
+    )
+    for coluna in esperado.columns:
+        assert sacados[coluna].tolist() == esperado[coluna].tolist(), coluna
+
+    pares = ler_tabela(incremental, "perfil_par", ["id_cedente", "id_sacado"])
+    esperado = completo.groupby(["id_cedente", "id_sacado"]).agg(
+        qtd_duplicatas=("id_duplicata", "size"), qtd_sem_aceite=("sem_aceite", "sum")
+    )
+    assert pares.index.tolist() == esperado.index.tolist()
+    for coluna in esperado.columns:
+        assert pares[coluna].tolist() == esperado[coluna].tolist(), coluna
+
+
+def test_contagens_distintas_somam_so_pares_novos_do_lote(tmp_path):
+    db_manager = DuckDBManager(tmp_path / "pares.duckdb")
+    db_manager.criar_tabela()
+    # Tabela de pares grande antes do lote: um cedente com 20 mil sacados e 3 endossatários
+    n = 20_000
+    base = pd.DataFrame([duplicata(id_sacado=f"s-{i}") for i in range(n)])
+    base["endossatario"] = [None, "BTG Pactual", "FIDC Scapa Ltda", "Banco Itaú S.A."] * (n // 4)
+    db_manager.inserir_dataframe(base)
+
+    # Lote: 2 pares existentes, 2 novos (um repetido no lote), 2 endossatários novos
+    # (Factoring Sul e o padrão da fábrica, Banco do Brasil) e um cedente novo
+    lote = pd.DataFrame([
+        duplicata(id_sacado="s-0", endossatario="BTG Pactual"),
+        duplicata(id_sacado="s-1"),
+        duplicata(id_sacado="s-novo-1", endossatario="Factoring Sul Ltda"),
+        duplicata(id_sacado="s-novo-1", endossatario="Factoring Sul Ltda"),
+        duplicata(id_sacado="s-novo-2"),
+        duplicata(id_cedente="c-novo", id_sacado="s-0"),
+    ])
+    db_manager.inserir_e_contar_chaves(lote)
+
+    cedentes = ler_tabela(db_manager, "perfil_cedente", ["id_cedente"])
+    assert cedentes.loc["c-1", "qtd_sacados"] == n + 2
+    assert cedentes.loc["c-1", "qtd_endossatarios"] == 5
+    assert cedentes.loc["c-novo", "qtd_sacados"] == 1
+    assert cedentes.loc["c-novo", "qtd_endossatarios"] == 1
+
+    sacados = ler_tabela(db_manager, "perfil_sacado", ["id_sacado"])
+    assert sacados.loc["s-0", "qtd_cedentes"] == 2
+    assert sacados.loc["s-novo-1", "qtd_cedentes"] == 1
+    assert sacados.loc["s-1", "qtd_duplicatas"] == 2
+
+    conn = db_manager.get_connection()
+    try:
+        # Nenhuma tabela temporária do lote fica para trás na conexão
+        assert conn.execute(
+            "SELECT COUNT(*) FROM duckdb_tables() WHERE temporary"
+        ).fetchone()[0] == 0
+    finally:
+        conn.close()
+
+
+def test_features_de_entidade_iguais_com_perfis_do_banco(tmp_path):
+    df = historico()
+    db_manager = DuckDBManager(tmp_path / "entidades.duckdb")
+    db_manager.criar_tabela()
+    for inicio in range(0, len(df), 40):
+        db_manager.inserir_dataframe(df.iloc[inicio:inicio + 40].copy())
+
+    def features(perfis):
+        detector = DetectorFraudeRatios(df.copy())
+        detector.calcular_ratios_financeiros()
+        detector.calcular_ratios_entidades(perfis=perfis)
+        detector.calcular_risk_score()
+        return detector.df
+
+    do_banco = features(db_manager.perfis_entidades(df))
+    do_dataframe = features(None)
+    colunas = [
+        "cedente_qtd_duplicatas", "cedente_taxa_sem_aceite", "cedente_taxa_endosso_nao_bancario",
+        "cedente_qtd_sacados", "cedente_qtd_endossatarios", "sacado_qtd_cedentes", "par_concentracao",
+        "historico_cedente_suspeito", "par_concentrado", "risk_score",
+    ]
+    pd.testing.assert_frame_equal(do_banco[colunas], do_dataframe[colunas], check_dtype=False)
+
+
+def test_endosso_nao_bancario_compara_termos_literalmente():
+    # "S.A." como regex casaria "SCAP" em "FIDC Scapa"; no SQL, contains() é literal
+    detector = DetectorFraudeRatios(pd.DataFrame([
+        duplicata(endossatario="FIDC Scapa Ltda"), duplicata(endossatario="Banco Itaú S.A.")
+    ]))
+    detector.calcular_ratios_financeiros()
+    assert detector.df["endosso_suspeito"].tolist() == [1, 0]
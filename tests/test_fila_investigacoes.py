@@ -0,0 +1,99 @@
+import time
+import uuid
+
+import pytest
+
+from pylastro.db.duckdb import DuckDBManager
+from pylastro.domain import agente as modulo_agente
+from pylastro.models.duplicatas_fraudes import DuplicatasPayload, DuplicataItem
+from pylastro.service.fila_investigacoes import FilaInvestigacoes
+
+
+def payload(n: int) -> DuplicatasPayload:
+    return DuplicatasPayload(duplicatas=[
+        DuplicataItem(
+            id_duplicata=uuid.uuid4(), risk_score=0.8, classificacao="ALTO", valor=1000.0,
+            cedente="Cedente", sacado="Sacado", motivos=["valor atípico"],
+            cnpj_cedente="12.345.678/0001-90", estado_cedente="SP", setor_cedente="Tecnologia",
+            cnpj_sacado="98.765.432/0001-10", estado_sacado="RJ", setor_sacado="Tecnologia",
+            aceite_sacado=True, data_emissao="2026-10-01", data_vencimento="2026-12-01", prazo_dias=61
+        )
+        for _ in range(n)
+    ])
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    gerenciador = DuckDBManager(tmp_path / "fila.duckdb")
+    gerenciador.criar_tabelas_investigacao()
+    return gerenciador
+
+
+def test_processo_novo_nao_toma_caso_com_lease_valido(db_manager):
+    viva = FilaInvestigacoes(db_manager, lease_s=60)
+    viva.submeter(payload(1))
+    assert viva._reservar_caso("viva:0") is not None
+
+    # Outro worker subindo (ou este processo reiniciando) não rouba o caso em andamento
+    reiniciada = FilaInvestigacoes(db_manager, lease_s=60)
+    reiniciada.iniciar()
+    try:
+        assert reiniciada._reservar_caso("reiniciada:0") is None
+    finally:
+        reiniciada.parar()
+
+
+def test_caso_com_lease_vencido_volta_para_a_fila(db_manager):
+    morta = FilaInvestigacoes(db_manager, lease_s=-1)
+    id_job = morta.submeter(payload(1))["id_job"]
+    caso_antigo = morta._reservar_caso("morta:0")
+
+    viva = FilaInvestigacoes(db_manager, lease_s=60)
+    caso = viva._reservar_caso("viva:0")
+    assert caso is not None and caso["tentativas"] == 2
+
+    # O dono antigo não sobrescreve o resultado de quem retomou o caso
+    assert morta._finalizar_caso(caso_antigo, resultado={"veredito": "antigo"}) is False
+    assert viva._finalizar_caso(caso, resultado={"veredito": "novo"}) is True
+    assert viva.resultados(id_job)["casos"][0]["resultado"] == {"veredito": "novo"}
+    assert viva.status(id_job)["status"] == "CONCLUIDO"
+
+
+class AgenteFalso:
+    instancias = []
+
+    def __init__(self):
+        self._verdades = {}
+        self.maior_cache = 0
+        AgenteFalso.instancias.append(self)
+
+    def precarregar_verdades(self, ids):
+        self._verdades.update({i: (0, "Cedente") for i in ids})
+        self.maior_cache = max(self.maior_cache, len(self._verdades))
+
+    def descartar_verdades(self, ids):
+        for i in ids:
+            self._verdades.pop(i, None)
+
+    def analisar_caso(self, evento, rota=None):
+        return {"status": "OK", "id_duplicata": evento["id_duplicata"]}
+
+
+def test_worker_descarta_base_de_verdade_dos_jobs_concluidos(db_manager, monkeypatch):
+    AgenteFalso.instancias = []
+    monkeypatch.setattr(modulo_agente, "AntiFraudeAgente", AgenteFalso)
+    fila = FilaInvestigacoes(db_manager, n_workers=1, jobs_em_cache=2)
+    jobs = [fila.submeter(payload(3))["id_job"] for _ in range(4)]
+
+    fila.iniciar()
+    try:
+        limite = time.monotonic() + 10
+        while any(fila.status(j)["status"] != "CONCLUIDO" for j in jobs):
+            assert time.monotonic() < limite, "fila não terminou os jobs"
+            time.sleep(0.05)
+    finally:
+        fila.parar()
+
+    agente, = AgenteFalso.instancias
+    assert agente._verdades == {}
+    assert agente.maior_cache <= 2 * 3
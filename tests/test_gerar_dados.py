@@ -0,0 +1,24 @@
+from pylastro.scripts.gerar_dados import DuplicataFactory
+
+
+def carteira_atribuida() -> DuplicataFactory:
+    """Empresas atribuídas direto, sem passar por gerar_carteira_empresas"""
+    origem = DuplicataFactory(seed=1)
+    origem.gerar_carteira_empresas(qtd_cedentes=5, qtd_sacados=20)
+    fabrica = DuplicataFactory(seed=2)
+    fabrica.cedentes, fabrica.sacados = origem.cedentes, origem.sacados
+    return fabrica
+
+
+def test_transacao_com_carteira_atribuida_sem_indices():
+    fabrica = carteira_atribuida()
+    ids_sacados = {s["id"] for s in fabrica.sacados}
+    for _ in range(20):
+        assert fabrica.gerar_transacao_normal()["id_sacado"] in ids_sacados
+
+
+def test_lote_vetorizado_com_carteira_atribuida_sem_indices():
+    fabrica = carteira_atribuida()
+    df = fabrica.gerar_lote_vetorizado(50, seed=3)
+    assert len(df) == 50
+    assert set(df["id_sacado"]) <= {s["id"] for s in fabrica.sacados}
@@ -0,0 +1,132 @@
+import asyncio
+
+import duckdb
+import pytest
+
+from pylastro.db.duckdb import DuckDBManager
+from pylastro.routes.duplicatas import _id_repetido
+from pylastro.service.ingestao import IngestorDuplicatas, IngestaoSobrecarregada, PedidoGrandeDemais, PontuacaoFalhou
+
+from .fabrica import duplicata
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    gerenciador = DuckDBManager(tmp_path / "ingestao.duckdb")
+    gerenciador.criar_tabela()
+    return gerenciador
+
+
+def executar(db_manager, corpo, **parametros):
+    """Roda `corpo(ingestor)` com o ingestor ativo em um event loop novo"""
+    async def principal():
+        ingestor = IngestorDuplicatas(db_manager, **parametros)
+        await ingestor.iniciar()
+        try:
+            return await corpo(ingestor)
+        finally:
+            await ingestor.parar()
+    return asyncio.run(principal())
+
+
+def test_pedidos_simultaneos_sao_gravados_no_mesmo_microlote(db_manager):
+    async def corpo(ingestor):
+        return await asyncio.gather(*(ingestor.submeter([duplicata(), duplicata()]) for _ in range(5)))
+
+    resultados = executar(db_manager, corpo, janela_ms=200)
+
+    assert [tamanho for _, tamanho in resultados] == [10] * 5
+    assert all(len(pontuado) == 2 for pontuado, _ in resultados)
+    assert db_manager.contar_registros() == 10
+
+
+def test_microlote_fecha_ao_atingir_lote_max(db_manager):
+    async def corpo(ingestor):
+        return await asyncio.gather(*(ingestor.submeter([duplicata(), duplicata()]) for _ in range(3)))
+
+    resultados = executar(db_manager, corpo, janela_ms=200, lote_max=4)
+
+    assert [tamanho for _, tamanho in resultados] == [4, 4, 2]
+
+
+def test_resultado_na_ordem_dos_registros(db_manager):
+    registros = [duplicata(id_duplicata=f"id-{i}") for i in range(3)]
+
+    async def corpo(ingestor):
+        return await ingestor.submeter(registros)
+
+    pontuado, _ = executar(db_manager, corpo)
+    assert list(pontuado["id_duplicata"]) == ["id-0", "id-1", "id-2"]
+
+
+def test_backpressure_recusa_acima_de_pendentes_max(db_manager):
+    async def corpo(ingestor):
+        primeiro = asyncio.ensure_future(ingestor.submeter([duplicata(), duplicata()]))
+        await asyncio.sleep(0)
+        with pytest.raises(IngestaoSobrecarregada):
+            await ingestor.submeter([duplicata(), duplicata()])
+        await primeiro
+        # Depois da gravação as linhas deixam de contar como pendentes
+        return await ingestor.submeter([duplicata(), duplicata()])
+
+    pontuado, _ = executar(db_manager, corpo, janela_ms=50, pendentes_max=3)
+    assert len(pontuado) == 2
+
+
+def test_pedido_maior_que_o_limite_e_recusado_mesmo_sem_fila(db_manager):
+    async def corpo(ingestor):
+        with pytest.raises(PedidoGrandeDemais):
+            await ingestor.submeter([duplicata() for _ in range(4)])
+        assert ingestor.pendentes == 0
+        return await ingestor.submeter([duplicata() for _ in range(3)])
+
+    pontuado, _ = executar(db_manager, corpo, pendentes_max=3)
+    assert len(pontuado) == 3
+
+
+def test_id_repetido_so_falha_o_pedido_com_problema(db_manager):
+    db_manager.inserir_lote([duplicata(id_duplicata="ja-existe")])
+
+    async def corpo(ingestor):
+        return await asyncio.gather(
+            ingestor.submeter([duplicata(id_duplicata="novo-1")]),
+            ingestor.submeter([duplicata(id_duplicata="ja-existe")]),
+            ingestor.submeter([duplicata(id_duplicata="novo-2")]),
+            return_exceptions=True
+        )
+
+    novo_1, repetido, novo_2 = executar(db_manager, corpo, janela_ms=200)
+
+    assert isinstance(repetido, duckdb.ConstraintException) and _id_repetido(repetido)
+    assert list(novo_1[0]["id_duplicata"]) == ["novo-1"]
+    assert list(novo_2[0]["id_duplicata"]) == ["novo-2"]
+    assert db_manager.contar_registros() == 3
+
+
+def test_falha_depois_do_commit_nao_vira_duplicata_repetida(db_manager, monkeypatch):
+    def falhar():
+        raise RuntimeError("estatísticas indisponíveis")
+    monkeypatch.setattr(db_manager, "estatisticas_valor", falhar)
+
+    async def corpo(ingestor):
+        return await asyncio.gather(
+            ingestor.submeter([duplicata()]),
+            ingestor.submeter([duplicata()]),
+            return_exceptions=True
+        )
+
+    resultados = executar(db_manager, corpo, janela_ms=200)
+
+    assert all(isinstance(r, PontuacaoFalhou) for r in resultados)
+    assert db_manager.contar_registros() == 2
+
+
+def test_setor_novo_recebe_score(db_manager):
+    db_manager.inserir_lote([duplicata() for _ in range(5)])
+
+    async def corpo(ingestor):
+        return await ingestor.submeter([duplicata(setor_cedente="Setor Inédito")])
+
+    pontuado, _ = executar(db_manager, corpo)
+    assert pontuado["risk_score"].notna().all()
+    assert str(pontuado["classificacao_risco"].iloc[0]) != "nan"
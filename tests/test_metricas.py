@@ -0,0 +1,101 @@
+import re
+
+import duckdb
+
+from pylastro.core import metricas as modulo_metricas
+from pylastro.core.metricas import BUCKETS_PADRAO, HISTOGRAMAS, RegistroMetricas
+
+ETAPA = "pylastro_detector_etapa_segundos"
+HTTP = "pylastro_http_requisicao_segundos"
+
+LINHA_AMOSTRA = re.compile(r'^(\w+)\{(.*)\} (\S+)$')
+
+
+def amostras(texto: str, nome: str) -> list:
+    """(sufixo, labels, valor) das linhas de amostra de um histograma"""
+    resultado = []
+    for linha in texto.splitlines():
+        match = LINHA_AMOSTRA.match(linha)
+        if match and match.group(1).startswith(nome):
+            resultado.append((match.group(1)[len(nome):], match.group(2), float(match.group(3))))
+    return resultado
+
+
+# --------------------------------------
+# FORMATO DE EXPOSIÇÃO
+# --------------------------------------
+def test_buckets_acumulados_e_inf_igual_ao_count():
+    registro = RegistroMetricas()
+    for segundos in (0.001, 0.005, 0.2, 0.2, 3.0, 42.0):
+        registro.observar(ETAPA, segundos, etapa="score")
+
+    linhas = amostras(registro.exportar_prometheus(), ETAPA)
+    buckets = [(rotulos, valor) for sufixo, rotulos, valor in linhas if sufixo == "_bucket"]
+    limites = [re.search(r'le="([^"]+)"', rotulos).group(1) for rotulos, _ in buckets]
+    contagens = [valor for _, valor in buckets]
+
+    assert limites == [str(limite) for limite in BUCKETS_PADRAO] + ["+Inf"]
+    assert contagens == sorted(contagens)
+    # `le` é inclusivo: 0.005 entra no primeiro bucket
+    assert dict(zip(limites, contagens))["0.005"] == 2
+    assert dict(zip(limites, contagens))["0.25"] == 4
+    assert dict(zip(limites, contagens))["10.0"] == 5
+
+    count = next(valor for sufixo, _, valor in linhas if sufixo == "_count")
+    soma = next(valor for sufixo, _, valor in linhas if sufixo == "_sum")
+    assert contagens[-1] == count == 6
+    assert abs(soma - 45.406) < 1e-9
+
+
+def test_help_e_type_de_todos_os_histogramas_mesmo_sem_series():
+    texto = RegistroMetricas().exportar_prometheus()
+    for nome in HISTOGRAMAS:
+        assert f"# HELP {nome} " in texto
+        assert f"# TYPE {nome} histogram" in texto
+    assert texto.endswith("\n")
+
+
+def test_labels_na_ordem_declarada_e_escapados():
+    registro = RegistroMetricas()
+    registro.observar(HTTP, 0.01, status=200, rota='/view/"aspas"\\barra\nlinha', metodo="GET")
+
+    _, rotulos, _ = amostras(registro.exportar_prometheus(), HTTP)[0]
+    assert rotulos.startswith('metodo="GET",rota="/view/\\"aspas\\"\\\\barra\\nlinha",status="200",le=')
+
+
+def test_series_separadas_por_valor_de_label():
+    registro = RegistroMetricas()
+    registro.observar(ETAPA, 0.01, etapa="carga")
+    registro.observar(ETAPA, 0.01, etapa="score")
+    registro.observar(ETAPA, 0.01, etapa="score")
+
+    counts = {rotulos: valor for sufixo, rotulos, valor in amostras(registro.exportar_prometheus(), ETAPA)
+              if sufixo == "_count"}
+    assert counts == {'etapa="carga"': 1, 'etapa="score"': 2}
+
+
+# --------------------------------------
+# DESABILITADO
+# --------------------------------------
+def test_desabilitado_nao_registra_nada():
+    registro = RegistroMetricas(habilitado=False)
+    registro.observar(ETAPA, 0.5, etapa="score")
+    with registro.cronometrar(ETAPA, etapa="score"):
+        pass
+
+    assert amostras(registro.exportar_prometheus(), ETAPA) == []
+    assert registro.cronometrar(ETAPA) is registro.cronometrar(HTTP)
+
+
+def test_desabilitado_nao_envolve_funcoes_nem_conexoes(monkeypatch):
+    monkeypatch.setattr(modulo_metricas, "metricas", RegistroMetricas(habilitado=False))
+
+    def rota():
+        return 1
+
+    assert modulo_metricas.cronometrar_funcao(ETAPA, etapa="x")(rota) is rota
+    conn = duckdb.connect()
+    try:
+        assert modulo_metricas.instrumentar_conexao(conn) is conn
+    finally:
+        conn.close()
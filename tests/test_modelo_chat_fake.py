@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+
+from langchain_core.messages import HumanMessage
+
+from pylastro.domain.modelo_chat_fake import ErroModeloSimulado, ModeloChatFake
+
+
+def modelo(**kwargs) -> ModeloChatFake:
+    ferramentas = [SimpleNamespace(name="verificar_com_cliente")]
+    return ModeloChatFake(**kwargs).bind_tools(ferramentas)
+
+
+def investigar(chat: ModeloChatFake, id_duplicata: str, max_tentativas: int = 20) -> list:
+    """Primeiro turno com novas tentativas até responder: devolve o status de cada tentativa"""
+    mensagens = [HumanMessage(content=f'{{"id_duplicata": "{id_duplicata}"}}')]
+    resultados = []
+    for _ in range(max_tentativas):
+        try:
+            chat.invoke(mensagens)
+        except ErroModeloSimulado as e:
+            resultados.append(e.status_code)
+            continue
+        resultados.append(200)
+        break
+    return resultados
+
+
+def test_reinvestigar_o_mesmo_caso_repete_as_falhas():
+    chat = modelo(falhas={"throttle": 0.5, "erro": 0.2})
+    casos = [f"dup-{i}" for i in range(20)]
+
+    primeira = [investigar(chat, caso) for caso in casos]
+    segunda = [investigar(chat, caso) for caso in casos]
+
+    assert primeira == segunda
+    # Com falhas em 70% dos sorteios alguma tentativa precisa ter falhado
+    assert any(len(tentativas) > 1 for tentativas in primeira)
+    assert all(tentativas[-1] == 200 for tentativas in primeira)
+
+
+def test_contador_de_tentativas_nao_cresce_com_os_casos():
+    chat = modelo(falhas={"throttle": 0.5})
+    for i in range(50):
+        investigar(chat, f"dup-{i}")
+    assert len(chat._tentativas) == 0
@@ -0,0 +1,192 @@
+import io
+import json
+from datetime import date
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from pylastro.core import serializacao
+from pylastro.core.paginacao import codificar_cursor, decodificar_cursor, cursor_data, cursor_numero, cursor_texto
+from pylastro.db.duckdb import DuckDBManager
+from pylastro.routes import relatorios, view
+from pylastro.service import snapshot_scores
+
+from .fabrica import duplicata
+
+
+@pytest.mark.parametrize("valores", [["2026-10-01", "id-1"], [0.97, "5f0c"], ["2026-01-01", "açúcar/=+"]])
+def test_cursor_ida_e_volta(valores):
+    cursor = codificar_cursor(valores)
+    assert "=" not in cursor
+    assert decodificar_cursor(cursor) == valores
+
+
+@pytest.mark.parametrize("cursor", ["@@@", "bm9vcA", "eyJhIjogMX0"])
+def test_cursor_invalido(cursor):
+    # "bm9vcA" é base64 de "noop" (não é JSON); "eyJhIjogMX0" é {"a": 1}, JSON sem a lista da chave
+    with pytest.raises(ValueError):
+        decodificar_cursor(cursor)
+
+
+def test_cursor_com_tipos_converte_cada_posicao():
+    cursor = codificar_cursor(["2026-10-01", "id-1"])
+    assert decodificar_cursor(cursor, tipos=(cursor_data, cursor_texto)) == [date(2026, 10, 1), "id-1"]
+
+
+@pytest.mark.parametrize("valores", [[0.9], [0.9, "id", "extra"], ["0.9", "id"], [True, "id"], [0.9, 7]])
+def test_cursor_fora_do_formato(valores):
+    with pytest.raises(ValueError):
+        decodificar_cursor(codificar_cursor(valores), tipos=(cursor_numero, cursor_texto))
+
+
+@pytest.fixture
+def cliente(tmp_path, monkeypatch):
+    db_manager = DuckDBManager(tmp_path / "paginacao.duckdb")
+    db_manager.criar_tabela()
+    # 7 fraudes empatadas na mesma data de emissão + 2 mais antigas + 1 de outro tipo
+    linhas = [duplicata(id_duplicata=f"id-{i}", data_emissao=date(2026, 10, 1)) for i in range(7)]
+    linhas += [duplicata(id_duplicata=f"antiga-{i}", data_emissao=date(2026, 9, 1)) for i in range(2)]
+    for linha in linhas:
+        linha.update(label_fraude=1, tipo_fraude="DUPLICIDADE")
+    linhas.append(duplicata(id_duplicata="outra", label_fraude=1, tipo_fraude="ENDOSSO_INDEVIDO"))
+    db_manager.inserir_dataframe(pd.DataFrame(linhas))
+
+    conectar = lambda: duckdb.connect(str(db_manager.db_path), read_only=True)
+    monkeypatch.setattr(view, "get_db_connection", conectar)
+    monkeypatch.setattr(snapshot_scores, "get_db_connection", conectar)
+    monkeypatch.setattr(relatorios, "snapshot_scores", snapshot_scores.SnapshotScores())
+    app = FastAPI()
+    app.include_router(view.router)
+    app.include_router(relatorios.router)
+    return TestClient(app)
+
+
+def test_sem_limite_nem_cursor_mantem_lista_simples(cliente):
+    resposta = cliente.get("/view/exemplo_fraude", params={"tipo_fraude": "DUPLICIDADE"})
+    assert resposta.status_code == 200
+    corpo = resposta.json()
+    assert isinstance(corpo, list) and len(corpo) == 9
+
+
+def test_paginas_com_empate_na_data_nao_repetem_nem_pulam(cliente):
+    vistos, cursor = [], None
+    while True:
+        params = {"tipo_fraude": "DUPLICIDADE", "limite": 3}
+        if cursor:
+            params["cursor"] = cursor
+        pagina = cliente.get("/view/exemplo_fraude", params=params).json()
+        assert len(pagina["itens"]) <= 3
+        vistos += [item["id_duplicata"] for item in pagina["itens"]]
+        cursor = pagina["proximo_cursor"]
+        if cursor is None:
+            break
+
+    esperado = [f"id-{i}" for i in reversed(range(7))] + ["antiga-1", "antiga-0"]
+    assert vistos == esperado
+
+
+def test_cursor_sem_limite_usa_pagina_padrao(cliente):
+    cursor = codificar_cursor(["2026-10-01", "id-3"])
+    pagina = cliente.get("/view/exemplo_fraude", params={"tipo_fraude": "DUPLICIDADE", "cursor": cursor}).json()
+    assert pagina["limite"] == view.LIMITE_PADRAO_EXEMPLOS
+    assert [item["id_duplicata"] for item in pagina["itens"]] == ["id-2", "id-1", "id-0", "antiga-1", "antiga-0"]
+
+
+def test_cursor_malformado_responde_400(cliente):
+    resposta = cliente.get("/view/exemplo_fraude", params={"tipo_fraude": "DUPLICIDADE", "cursor": "@@@"})
+    assert resposta.status_code == 400
+
+
+@pytest.mark.parametrize("valores", [["ontem", "id-3"], ["2026-10-01"], ["2026-10-01", "id-3", "x"], ["2026-10-01", 3]])
+def test_cursor_fora_do_formato_em_exemplo_fraude_responde_400(cliente, valores):
+    params = {"tipo_fraude": "DUPLICIDADE", "cursor": codificar_cursor(valores)}
+    resposta = cliente.get("/view/exemplo_fraude", params=params)
+    assert resposta.status_code == 400
+    assert resposta.json()["detail"].startswith("Cursor inválido")
+
+
+@pytest.mark.parametrize("valores", [["id-3", 0.5], [0.5], [0.5, "id-3", "x"], [{"a": 1}, "id-3"]])
+def test_cursor_fora_do_formato_no_ranking_responde_400(cliente, valores):
+    resposta = cliente.get("/relatorios/fraudes/ranking", params={"cursor": codificar_cursor(valores)})
+    assert resposta.status_code == 400
+    assert resposta.json()["detail"].startswith("Cursor inválido")
+
+
+# --------------------------------------
+# FORMATOS COLUNARES E NEGOCIAÇÃO
+# --------------------------------------
+def test_arrow_traz_a_pagina_e_o_cursor_no_header(cliente):
+    params = {"tipo_fraude": "DUPLICIDADE", "limite": 3, "formato": "arrow"}
+    resposta = cliente.get("/view/exemplo_fraude", params=params)
+
+    assert resposta.status_code == 200
+    assert resposta.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    tabela = pa.ipc.open_stream(resposta.content).read_all()
+    assert tabela.column("id_duplicata").to_pylist() == ["id-6", "id-5", "id-4"]
+
+    cursor = resposta.headers["X-Proximo-Cursor"]
+    seguinte = cliente.get("/view/exemplo_fraude", params={**params, "cursor": cursor})
+    assert pa.ipc.open_stream(seguinte.content).read_all().column("id_duplicata").to_pylist() == ["id-3", "id-2", "id-1"]
+
+
+def test_ultima_pagina_colunar_sem_header_de_cursor(cliente):
+    params = {"tipo_fraude": "DUPLICIDADE", "limite": 20, "formato": "parquet"}
+    resposta = cliente.get("/view/exemplo_fraude", params=params)
+
+    assert resposta.headers["content-type"] == "application/vnd.apache.parquet"
+    assert "X-Proximo-Cursor" not in resposta.headers
+    assert pq.read_table(io.BytesIO(resposta.content)).num_rows == 9
+
+
+@pytest.mark.parametrize("accept, media_type", [
+    ("application/vnd.apache.arrow.stream", "application/vnd.apache.arrow.stream"),
+    ("application/vnd.apache.parquet, application/json;q=0.5", "application/vnd.apache.parquet"),
+    ("application/json;q=0.9, application/vnd.apache.arrow.stream", "application/vnd.apache.arrow.stream"),
+    ("application/vnd.apache.arrow.stream;q=0", "application/json"),
+    ("text/html, */*", "application/json"),
+])
+def test_accept_escolhe_o_formato(cliente, accept, media_type):
+    resposta = cliente.get("/view/exemplo_fraude", params={"tipo_fraude": "DUPLICIDADE"}, headers={"Accept": accept})
+    assert resposta.status_code == 200
+    assert resposta.headers["content-type"] == media_type
+
+
+def test_parametro_formato_tem_prioridade_sobre_accept(cliente):
+    resposta = cliente.get(
+        "/view/exemplo_fraude",
+        params={"tipo_fraude": "DUPLICIDADE", "formato": "json"},
+        headers={"Accept": "application/vnd.apache.parquet"}
+    )
+    assert resposta.headers["content-type"] == "application/json"
+    assert len(resposta.json()) == 9
+
+
+def test_formato_desconhecido_responde_400(cliente):
+    resposta = cliente.get("/view/exemplo_fraude", params={"tipo_fraude": "DUPLICIDADE", "formato": "xml"})
+    assert resposta.status_code == 400
+
+
+def test_json_do_orjson_igual_ao_da_biblioteca_padrao(cliente, monkeypatch):
+    params = {"tipo_fraude": "DUPLICIDADE", "limite": 4}
+    rapido = cliente.get("/view/exemplo_fraude", params=params).content
+
+    monkeypatch.setattr(serializacao, "orjson", None)
+    padrao = cliente.get("/view/exemplo_fraude", params=params).content
+
+    assert json.loads(rapido) == json.loads(padrao)
+    assert json.loads(rapido)["itens"][0]["data_emissao"] == "2026-10-01"
+
+
+def test_ranking_em_arrow_com_cursor_no_header(cliente):
+    json_ = cliente.get("/relatorios/fraudes/ranking", params={"limite": 4}).json()
+    resposta = cliente.get("/relatorios/fraudes/ranking", params={"limite": 4}, headers={"Accept": "application/vnd.apache.arrow.stream"})
+
+    assert resposta.status_code == 200
+    tabela = pa.ipc.open_stream(resposta.content).read_all()
+    assert tabela.column("id_duplicata").to_pylist() == [item["id_duplicata"] for item in json_["itens"]]
+    assert resposta.headers["X-Proximo-Cursor"] == json_["proximo_cursor"]
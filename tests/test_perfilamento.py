@@ -0,0 +1,118 @@
+import cProfile
+import json
+import threading
+
+import duckdb
+import pytest
+
+from pylastro.core import perfilamento
+from pylastro.core.perfilamento import GerenciadorPerfis, SessaoPerfil
+
+
+@pytest.fixture
+def perfis_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(perfilamento, "PERFIS_PATH", tmp_path)
+    return tmp_path
+
+
+@pytest.mark.parametrize("rota", ["/metrics", "/populacao/pronto", "/populacao/status", "/openapi.json"])
+def test_rotas_de_observabilidade_nao_consomem_perfis_armados(rota):
+    gerenciador = GerenciadorPerfis()
+    gerenciador.armar(1)
+
+    assert gerenciador.consumir(rota) is None
+    assert gerenciador.consumir("/relatorios/fraudes") == "amostragem"
+    assert gerenciador.consumir("/relatorios/fraudes") is None
+
+
+def test_retencao_mantem_so_os_perfis_mais_recentes(perfis_path):
+    gerenciador = GerenciadorPerfis()
+    ids = []
+    for _ in range(4):
+        sessao = SessaoPerfil("deterministico", "GET", "/view/kpis-gerais", "header")
+        ids.append(sessao.id)
+        sessao.finalizar(200)
+    em_andamento = SessaoPerfil("deterministico", "GET", "/view/kpis-gerais", "header")
+
+    gerenciador.aplicar_retencao(maximo=2)
+
+    restantes = sorted(p.name for p in perfis_path.iterdir())
+    # Sessão sem meta.json ainda está gravando: não entra na retenção
+    assert restantes == sorted(ids[2:] + [em_andamento.id])
+
+
+def test_finalizar_sessao_registra_no_log_do_uvicorn(perfis_path, caplog):
+    sessao = SessaoPerfil("deterministico", "GET", "/view/kpis-gerais", "header")
+    with caplog.at_level("INFO", logger="uvicorn.error"):
+        meta = GerenciadorPerfis().finalizar_sessao(sessao, 200)
+
+    assert (perfis_path / meta["id"] / "meta.json").exists()
+    assert any(meta["id"] in registro.getMessage() for registro in caplog.records)
+
+
+def test_plano_com_erro_grava_json_valido(perfis_path):
+    sessao = SessaoPerfil("deterministico", "GET", "/view/kpis-gerais", "header")
+    conn = perfilamento.ConexaoPerfilada(duckdb.connect(), sessao)
+
+    with pytest.raises(duckdb.CatalogException):
+        conn.execute("SELECT * FROM tabela_inexistente")
+
+    plano = json.loads((sessao.diretorio_duckdb / "consulta-001.json").read_text(encoding="utf-8"))
+    assert "tabela_inexistente" in plano["erro"]
+
+
+def _rota_perfilavel(monkeypatch, corpo):
+    monkeypatch.setattr(perfilamento, "PERFILAMENTO_HABILITADO", True)
+    return perfilamento.perfilavel(corpo)
+
+
+def _em_sessao(gerenciador, funcao, metas):
+    sessao, token = gerenciador.iniciar_sessao("deterministico", "GET", "/view/kpis-gerais", "header")
+    try:
+        funcao()
+    finally:
+        gerenciador.encerrar_sessao(token)
+    metas.append(sessao.finalizar(200))
+
+
+def test_deterministicos_simultaneos_usam_um_cprofile_so(perfis_path, monkeypatch):
+    primeira_dentro, liberar = threading.Event(), threading.Event()
+
+    def lenta():
+        primeira_dentro.set()
+        liberar.wait(timeout=5)
+
+    def rapida():
+        sum(range(1000))
+
+    gerenciador, metas = GerenciadorPerfis(), []
+    thread = threading.Thread(target=_em_sessao, args=(gerenciador, _rota_perfilavel(monkeypatch, lenta), metas))
+    thread.start()
+    assert primeira_dentro.wait(timeout=5)
+    try:
+        _em_sessao(gerenciador, _rota_perfilavel(monkeypatch, rapida), metas)
+    finally:
+        liberar.set()
+        thread.join()
+
+    sobreposta, primeira = metas
+    assert "python.prof" in primeira["arquivos"] and primeira["avisos"] == []
+    assert "python.prof" not in sobreposta["arquivos"] and "amostras.folded" in sobreposta["arquivos"]
+    assert "outro cProfile ativo" in sobreposta["avisos"][0]
+    # O lock foi liberado: a próxima sessão volta a usar o cProfile
+    _em_sessao(gerenciador, _rota_perfilavel(monkeypatch, rapida), metas)
+    assert "python.prof" in metas[-1]["arquivos"]
+
+
+def test_enable_recusado_cai_para_amostragem(perfis_path, monkeypatch):
+    class ProfileOcupado(cProfile.Profile):
+        def enable(self, *args, **kwargs):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(perfilamento.cProfile, "Profile", ProfileOcupado)
+    gerenciador, metas = GerenciadorPerfis(), []
+    _em_sessao(gerenciador, _rota_perfilavel(monkeypatch, lambda: None), metas)
+
+    assert "cProfile.enable() falhou" in metas[0]["avisos"][0]
+    assert "amostras.folded" in metas[0]["arquivos"]
+    assert not perfilamento._lock_cprofile.locked()
@@ -0,0 +1,65 @@
+import hashlib
+
+import pytest
+
+from pylastro.core.progresso_populacao import ProgressoPopulacao
+from pylastro.db.duckdb import DuckDBManager
+from pylastro.scripts import popular_escala
+
+PERFIL_MINI = {"qtd_cedentes": 10, "qtd_sacados": 30, "qtd_duplicatas": 3_000, "tamanho_lote": 1_000, "taxa_fraude": 0.1}
+
+
+class CargaInterrompida(Exception):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def perfil_mini(monkeypatch):
+    monkeypatch.setitem(popular_escala.PERFIS_ESCALA, "mini", PERFIL_MINI)
+
+
+def hash_conteudo(db_manager) -> str:
+    """Hash das duplicatas e dos perfis (sem os carimbos de horário da carga)"""
+    conn = db_manager.get_connection()
+    try:
+        partes = [
+            conn.execute("SELECT * EXCLUDE (data_insercao) FROM duplicatas ORDER BY id_duplicata").df(),
+            conn.execute("SELECT * EXCLUDE (atualizado_em) FROM perfil_cedente ORDER BY id_cedente").df(),
+            conn.execute("SELECT * EXCLUDE (atualizado_em) FROM perfil_par ORDER BY id_cedente, id_sacado").df(),
+        ]
+    finally:
+        conn.close()
+    return hashlib.sha256("".join(df.to_csv(index=False) for df in partes).encode()).hexdigest()
+
+
+def test_carga_retomada_igual_a_carga_sem_interrupcao(tmp_path, monkeypatch):
+    continua = DuckDBManager(tmp_path / "continua.duckdb")
+    popular_escala.popular_perfil("mini", continua, seed=7, progresso=ProgressoPopulacao())
+
+    retomada = DuckDBManager(tmp_path / "retomada.duckdb")
+    inserir = retomada._inserir_dataframe
+    chamadas = []
+
+    def falhar_no_lote_2(conn, df):
+        # Falha dentro da transação do lote 2, depois das linhas já inseridas
+        inserir(conn, df)
+        chamadas.append(len(df))
+        if len(chamadas) == 2:
+            raise CargaInterrompida()
+
+    monkeypatch.setattr(retomada, "_inserir_dataframe", falhar_no_lote_2)
+    with pytest.raises(CargaInterrompida):
+        popular_escala.popular_perfil("mini", retomada, seed=7, progresso=ProgressoPopulacao())
+    monkeypatch.undo()
+    monkeypatch.setitem(popular_escala.PERFIS_ESCALA, "mini", PERFIL_MINI)
+
+    # O lote 2 foi desfeito junto com o checkpoint
+    assert retomada.ler_checkpoint("mini:7")[0] == 1
+    registros_lote_1 = retomada.contar_registros()
+
+    resultado = popular_escala.popular_perfil("mini", retomada, seed=7, progresso=ProgressoPopulacao())
+
+    assert resultado["lotes_retomados"] == 1 and resultado["lotes_executados"] == 2
+    assert resultado["registros_inseridos"] == continua.contar_registros()
+    assert registros_lote_1 < continua.contar_registros()
+    assert hash_conteudo(retomada) == hash_conteudo(continua)
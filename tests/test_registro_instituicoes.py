@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from pylastro.domain.registro_instituicoes import (
+    ENTIDADES_PADRAO, RegistroInstituicoes, normalizar_nome, trigramas
+)
+
+
+def dice(a: str, b: str) -> float:
+    ga, gb = trigramas(normalizar_nome(a)), trigramas(normalizar_nome(b))
+    return 2 * len(ga & gb) / (len(ga) + len(gb))
+
+
+def test_nome_normalizado_identico_tem_similaridade_um():
+    registro = RegistroInstituicoes(ENTIDADES_PADRAO)
+    resultado = registro.buscar("ITAU UNIBANCO SA")
+    assert resultado == [{**ENTIDADES_PADRAO[11], "similaridade": 1.0}]
+
+
+@pytest.mark.parametrize("consulta", ["Banco do Brasil", "Bradesco SA Ltda", "Santander Brasi S.A."])
+def test_limiar_de_similaridade_e_inclusivo(consulta):
+    registro = RegistroInstituicoes(ENTIDADES_PADRAO)
+    melhor = registro.buscar(consulta, similaridade_minima=0.3)[0]
+    similaridade = dice(consulta, melhor["nome_exato"])
+
+    no_limiar = registro.buscar(consulta, similaridade_minima=similaridade)
+    assert no_limiar and no_limiar[0]["nome_exato"] == melhor["nome_exato"]
+    acima = registro.buscar(consulta, similaridade_minima=similaridade + 0.001)
+    assert melhor["nome_exato"] not in [r["nome_exato"] for r in acima]
+
+
+def test_abaixo_do_limiar_padrao_nao_retorna_nada():
+    registro = RegistroInstituicoes(ENTIDADES_PADRAO)
+    assert registro.buscar("Oficina Mecânica Zé") == []
+
+
+def cadastro_sintetico(n: int, semente: int = 3) -> list:
+    gerador = random.Random(semente)
+    prefixos = ["Banco", "Cooperativa", "Factoring", "Distribuidora", "Comercial", "Securitizadora"]
+    nomes = ["Alfa", "Beta", "Gama", "Delta", "Horizonte", "Atlântico", "Serra", "Vale", "Norte", "Paulista"]
+    sufixos = ["S.A.", "Ltda", "ME", "EIRELI", "Fomento", "Investimentos"]
+    return [
+        {"nome_exato": f"{gerador.choice(prefixos)} {gerador.choice(nomes)} {gerador.choice(nomes)} "
+                       f"{gerador.randint(1, 999)} {gerador.choice(sufixos)}",
+         "tipo_instituicao": "sintético"}
+        for _ in range(n)
+    ]
+
+
+@pytest.mark.parametrize("similaridade_minima", [0.5, 0.6, 0.8])
+def test_busca_indexada_igual_a_forca_bruta(similaridade_minima):
+    # O índice (length filtering + contagem das coincidências) não pode perder nem inventar candidatos
+    registro = RegistroInstituicoes(cadastro_sintetico(2000))
+    grams = [trigramas(normalizar_nome(e["nome_exato"])) for e in registro.entidades]
+    gerador = random.Random(11)
+
+    for entidade in gerador.sample(registro.entidades, 40):
+        nome = entidade["nome_exato"]
+        # Erro de digitação: troca, remove ou duplica um caractere
+        i = gerador.randrange(len(nome))
+        consulta = gerador.choice([nome[:i] + "x" + nome[i + 1:], nome[:i] + nome[i + 1:], nome[:i] + nome[i] + nome[i:]])
+        if normalizar_nome(consulta) in registro._por_nome:
+            continue
+
+        g = trigramas(normalizar_nome(consulta))
+        esperado = sorted(
+            (round(similaridade, 3), e["nome_exato"])
+            for e, ge in zip(registro.entidades, grams)
+            if (similaridade := 2 * len(g & ge) / (len(g) + len(ge))) >= similaridade_minima
+        )
+        obtido = sorted(
+            (r["similaridade"], r["nome_exato"])
+            for r in registro.buscar(consulta, similaridade_minima, max_resultados=len(registro))
+        )
+        assert obtido == esperado, consulta